@@ -0,0 +1 @@
+"""Performance benchmarks for the twin's hot paths; run with `python -m benchmarks.run`."""
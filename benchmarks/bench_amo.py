@@ -0,0 +1,63 @@
+"""amo hot paths: Jones chains, recipe timing, the DDS model and the twin log."""
+import tempfile
+
+import numpy as np
+
+from benchmarks.harness import case, timeit
+
+CHAIN = [
+    {"type": "waveplate", "theta": 22.5, "retard": 180.0},
+    {"type": "waveplate", "theta": 45.0, "retard": 90.0},
+    {"type": "pbs", "theta": 0.0, "branch": "T"},
+    {"type": "waveplate", "theta": 10.0, "retard": 90.0},
+    {"type": "polarizer", "theta": 0.0},
+]
+E0 = np.array([1.0, 0.0], dtype=complex)
+
+
+@case("run_chain")
+def run_chain(quick: bool) -> float:
+    from amo.run.chain_exec import run_chain
+    return timeit(lambda: run_chain(CHAIN, E0), min_time=0.02 if quick else 0.1)
+
+
+@case("trace_stokes")
+def trace_stokes(quick: bool) -> float:
+    from amo.optics.polarimetry import trace_stokes
+    nodes = [n for n in CHAIN if n["type"] != "pbs"]
+    return timeit(lambda: trace_stokes(nodes, E0), min_time=0.02 if quick else 0.1)
+
+
+@case("execute_recipe.lateness_p99", unit="us", tolerance=2.0)
+def recipe_jitter(quick: bool) -> float:
+    """p99 lateness of set ops planned 2 ms apart (scheduler noise: loose tolerance)."""
+    from amo.control import interlocks
+    from amo.devices.simulators import SimLaser
+    from amo.run.runner import execute_recipe
+    n = 25 if quick else 200
+    steps = [{"at_ms": 2 * i, "set": {"laser.power": 0.1 + 0.001 * (i % 50)}} for i in range(n)]
+    report = execute_recipe(steps, {"laser": SimLaser()}, interlocks.check)
+    return report.summary()["lateness_p99_us"]
+
+
+@case("simdds.read_state")
+def simdds_read_state(quick: bool) -> float:
+    from amo.hw.dds_sim import SimDDS
+    d = SimDDS(seed=0)
+    d.set_many(slice(None), np.linspace(1e6, 4e6, 4), 0.0, 0.5)
+    d.apply_update()
+    return timeit(d.read_state, min_time=0.02 if quick else 0.1)
+
+
+@case("twin_logger.record")
+def twin_logger_record(quick: bool) -> float:
+    """Seconds per pol_step-sized event."""
+    from amo.twin.logger import TwinLogger
+    ev = {"evt": "pol_step", "node": 2, "type": "polarizer", "S": [1.0, 0.5, 0.25, 0.0],
+          "meta": {"theta": 0.0}}
+    batch = 1000
+    with tempfile.TemporaryDirectory() as root, TwinLogger(root) as log:
+        def op():
+            for _ in range(batch):
+                log.record(ev)
+        return timeit(op, per=batch, min_time=0.02 if quick else 0.1)
@@ -0,0 +1,52 @@
+"""amo_digital_twin hot paths: block pipelines and the fitter."""
+import numpy as np
+
+from benchmarks.harness import case, timeit
+
+
+@case("pipeline.run_per_block")
+def pipeline_run(quick: bool) -> float:
+    from amo_digital_twin.core.backend import PolarizationBackend
+    from amo_digital_twin.core.light import LightState
+    from amo_digital_twin.examples.simple_pipeline import build_demo_pipeline
+    pipe, backend, light = build_demo_pipeline(), PolarizationBackend(), LightState()
+    return timeit(lambda: pipe.run(light, backend), per=len(pipe.blocks), min_time=0.02 if quick else 0.1)
+
+
+def _mirror_chain(n: int):
+    from amo_digital_twin.blocks.multi_optics import MirrorMP, PowerDetectorMP, Source
+    from amo_digital_twin.core.graph_pipeline import GraphPipeline
+    gp = GraphPipeline()
+    gp.add_block(Source("src", power_mw=10.0))
+    prev = "src"
+    for i in range(n):
+        gp.add_block(MirrorMP(f"m{i}", reflectivity=0.99))
+        gp.connect(prev, 0, f"m{i}", 0)
+        prev = f"m{i}"
+    gp.add_block(PowerDetectorMP("pd"))
+    gp.connect(prev, 0, "pd", 0)
+    return gp
+
+
+@case("graph_pipeline.run")
+def graph_pipeline_run(quick: bool) -> dict:
+    """Whole-graph run time for Source -> n mirrors -> detector."""
+    from amo_digital_twin.core.light import LightState
+    out = {}
+    for n in ((4, 16) if quick else (4, 16, 64)):
+        gp = _mirror_chain(n)
+        inputs = {"src": {0: LightState()}}
+        out[f"n={n}"] = timeit(lambda: gp.run(inputs), min_time=0.02 if quick else 0.1)
+    return out
+
+
+@case("fit_single_param_least_squares")
+def fit(quick: bool) -> float:
+    """One 500-iteration fit of the HWP offset to a 91-point scan."""
+    from amo_digital_twin.experiments.hwp_fit import hwp_model
+    from amo_digital_twin.ml.fitters import fit_single_param_least_squares
+    x = np.linspace(0, 90, 91)
+    y = hwp_model(x, {"P0": 9.9, "offset_deg": 1.5})
+    return timeit(lambda: fit_single_param_least_squares(x, y, hwp_model, {"P0": 9.9, "offset_deg": 0.0},
+                                                         "offset_deg", iters=500),
+                  min_time=0.02 if quick else 0.1)
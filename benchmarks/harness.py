@@ -0,0 +1,182 @@
+"""
+Case registry, timing and baseline comparison for benchmarks/run.py.
+
+Every case returns numbers where lower is better (seconds per call,
+microseconds of lateness, ...). A case may return one value or a dict of
+named values (e.g. one per graph size), stored as 'case[key]'.
+"""
+from __future__ import annotations
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+
+@dataclass
+class Case:
+    name: str
+    fn: Callable[[bool], Any]     # fn(quick) -> float | Dict[str, float]
+    unit: str = "s"
+    tolerance: Optional[float] = None   # overrides the run's threshold (noisy cases)
+
+
+CASES: Dict[str, Case] = {}
+
+
+def case(name: str, unit: str = "s", tolerance: Optional[float] = None):
+    """Register fn(quick) as a benchmark case."""
+    def deco(fn):
+        CASES[name] = Case(name, fn, unit, tolerance)
+        return fn
+    return deco
+
+
+def timeit(op: Callable[[], Any], *, repeat: int = 7, min_time: float = 0.05, per: int = 1) -> float:
+    """
+    Best time of op() in seconds, divided by per (ops per call). Each repeat
+    loops op() enough times to last at least min_time; the minimum over
+    repeats is the least noisy estimate of the cost.
+    """
+    op()  # warm-up: imports, caches, first-call allocations
+    number = 1
+    while True:
+        t = time.perf_counter()
+        for _ in range(number):
+            op()
+        dt = time.perf_counter() - t
+        if dt >= min_time or number >= 1 << 20:
+            break
+        number *= max(2, min(10, int(min_time / max(dt, 1e-9))))
+    best = dt
+    for _ in range(repeat - 1):
+        t = time.perf_counter()
+        for _ in range(number):
+            op()
+        best = min(best, time.perf_counter() - t)
+    return best / number / per
+
+
+def run_cases(names: Optional[List[str]] = None, quick: bool = False,
+              log: Callable[[str], None] = lambda s: None, exact: bool = False) -> Dict[str, Dict[str, Any]]:
+    """
+    {result name: {"value", "unit"}} for the cases whose name contains one
+    of names (exact=True: equals one), all cases by default.
+    """
+    out: Dict[str, Dict[str, Any]] = {}
+    for name, c in CASES.items():
+        if names and not any(n == name if exact else n in name for n in names):
+            continue
+        res = c.fn(quick)
+        items = res.items() if isinstance(res, dict) else [(None, res)]
+        for key, value in items:
+            full = name if key is None else f"{name}[{key}]"
+            out[full] = {"value": float(value), "unit": c.unit}
+            if c.tolerance is not None:
+                out[full]["tolerance"] = c.tolerance
+            log(f"{full:44s} {_fmt(value, c.unit):>12s}")
+    return out
+
+
+def metadata() -> Dict[str, Any]:
+    import numpy as np
+    meta = {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+    try:
+        meta["commit"] = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                        text=True, check=True, cwd=Path(__file__).parent).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        pass
+    return meta
+
+
+def write_results(path: str | Path, results: Dict[str, Dict[str, Any]], quick: bool = False) -> Path:
+    path = Path(path)
+    path.write_text(json.dumps({"meta": {**metadata(), "quick": quick}, "results": results}, indent=2) + "\n")
+    return path
+
+
+def load_results(path: str | Path) -> Dict[str, Dict[str, Any]]:
+    return json.loads(Path(path).read_text())["results"]
+
+
+def load_meta(path: str | Path) -> Dict[str, Any]:
+    return json.loads(Path(path).read_text()).get("meta", {})
+
+
+@dataclass
+class Comparison:
+    name: str
+    baseline: Optional[float]
+    value: Optional[float]
+    limit: float           # allowed relative slowdown
+    unit: str = "s"
+
+    @property
+    def ratio(self) -> Optional[float]:
+        if self.baseline is None or self.value is None or self.baseline <= 0:
+            return None
+        return self.value / self.baseline
+
+    @property
+    def status(self) -> str:
+        if self.baseline is None:
+            return "new"
+        if self.value is None:
+            return "missing"
+        r = self.ratio
+        if r is not None and r > 1 + self.limit:
+            return "REGRESSED"
+        if r is not None and r < 1 / (1 + self.limit):
+            return "improved"
+        return "ok"
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]],
+            threshold: float = 0.25) -> List[Comparison]:
+    """One Comparison per result, then a "missing" one per baseline entry not run; cases' own tolerance wins."""
+    rows = []
+    for name, r in results.items():
+        b = baseline.get(name)
+        limit = r.get("tolerance", b.get("tolerance", threshold) if b else threshold)
+        rows.append(Comparison(name, b["value"] if b else None, r["value"], limit, r.get("unit", "s")))
+    for name, b in baseline.items():
+        if name not in results:
+            rows.append(Comparison(name, b["value"], None, b.get("tolerance", threshold), b.get("unit", "s")))
+    return rows
+
+
+def report(rows: List[Comparison]) -> str:
+    lines = [f"{'case':44s} {'baseline':>12s} {'now':>12s} {'ratio':>7s}  status"]
+    for c in rows:
+        base = "-" if c.baseline is None else _fmt(c.baseline, c.unit)
+        now = "-" if c.value is None else _fmt(c.value, c.unit)
+        ratio = "-" if c.ratio is None else f"{c.ratio:.2f}"
+        lines.append(f"{c.name:44s} {base:>12s} {now:>12s} {ratio:>7s}  {c.status}")
+    return "\n".join(lines)
+
+
+def _fmt(v: float, unit: str) -> str:
+    if unit != "s":
+        return f"{v:.3g} {unit}"
+    for scale, u in ((1, "s"), (1e-3, "ms"), (1e-6, "us")):
+        if v >= scale:
+            return f"{v / scale:.3g} {u}"
+    return f"{v * 1e9:.3g} ns"
+
+
+def use_source_tree() -> None:
+    """Make `src/` importable when the suite runs from a plain checkout."""
+    src = Path(__file__).resolve().parents[1] / "src"
+    if src.is_dir() and str(src) not in sys.path:
+        sys.path.insert(0, str(src))
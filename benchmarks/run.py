@@ -0,0 +1,85 @@
+"""
+Run the benchmark suite, write JSON results and compare against a baseline.
+
+    python -m benchmarks.run                       # run all, compare to benchmarks/baseline.json
+    python -m benchmarks.run --check               # exit 1 on any regression beyond --threshold
+    python -m benchmarks.run -k graph --quick      # a subset, shorter runs
+    python -m benchmarks.run --save-baseline       # record this machine's numbers as the baseline
+
+Baselines are machine-specific: record one on the lab machine (or CI
+runner) the checks will run on. --quick runs smaller workloads, so they are
+only compared against a baseline saved with --quick.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+from benchmarks import harness
+
+HERE = Path(__file__).resolve().parent
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    p.add_argument("-k", dest="select", action="append", help="run cases whose name contains this (repeatable)")
+    p.add_argument("--quick", action="store_true", help="shorter timing loops and smaller sizes")
+    p.add_argument("--out", default="bench_results.json", help="results JSON (default: %(default)s)")
+    p.add_argument("--baseline", default=str(HERE / "baseline.json"), help="baseline JSON (default: %(default)s)")
+    p.add_argument("--threshold", type=float, default=0.25,
+                   help="allowed slowdown vs baseline, as a fraction (default: %(default)s)")
+    p.add_argument("--check", action="store_true", help="exit with status 1 if any case regressed")
+    p.add_argument("--retries", type=int, default=2,
+                   help="re-run regressed cases up to this many times, keeping the best value (default: %(default)s)")
+    p.add_argument("--save-baseline", action="store_true", help="write the results to --baseline as well")
+    args = p.parse_args(argv)
+
+    harness.use_source_tree()
+    from benchmarks import bench_amo, bench_twin  # noqa: F401  (register cases)
+
+    results = harness.run_cases(args.select, quick=args.quick, log=print)
+    if args.save_baseline:
+        harness.write_results(args.out, results, quick=args.quick)
+        harness.write_results(args.baseline, results, quick=args.quick)
+        print(f"\nwrote {args.out} and baseline {args.baseline}")
+        return 0
+    if not Path(args.baseline).exists():
+        harness.write_results(args.out, results, quick=args.quick)
+        print(f"\nwrote {args.out}; no baseline at {args.baseline} (create one with --save-baseline)")
+        return 1 if args.check else 0
+
+    base_quick = bool(harness.load_meta(args.baseline).get("quick", False))
+    if base_quick != args.quick:
+        harness.write_results(args.out, results, quick=args.quick)
+        mode = {True: "--quick", False: "full"}
+        print(f"\nwrote {args.out}; not compared: {mode[args.quick]} results against the "
+              f"{mode[base_quick]} baseline {args.baseline} (workloads differ)")
+        return 1 if args.check else 0
+
+    baseline = harness.load_results(args.baseline)
+    if args.select:
+        # only the selected cases are expected to be present
+        baseline = {k: v for k, v in baseline.items() if any(n in k.split("[")[0] for n in args.select)}
+    rows = harness.compare(results, baseline, args.threshold)
+    for attempt in range(args.retries):
+        # timing noise is one-sided (never faster than the code allows): confirm slow cases
+        slow = sorted({r.name.split("[")[0] for r in rows if r.status == "REGRESSED"})
+        if not slow:
+            break
+        print(f"\nre-running {', '.join(slow)}")
+        for name, r in harness.run_cases(slow, quick=args.quick, log=print, exact=True).items():
+            results[name]["value"] = min(results[name]["value"], r["value"])
+        rows = harness.compare(results, baseline, args.threshold)
+    harness.write_results(args.out, results, quick=args.quick)
+    print(f"\nwrote {args.out}")
+    print("\n" + harness.report(rows))
+    regressed = [r.name for r in rows if r.status == "REGRESSED"]
+    missing = [r.name for r in rows if r.status == "missing"]
+    if regressed:
+        print(f"\n{len(regressed)} regression(s): {', '.join(regressed)}")
+    if missing:
+        print(f"\n{len(missing)} baseline case(s) not run: {', '.join(missing)} (re-save the baseline if removed on purpose)")
+    return 1 if args.check and (regressed or missing) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -30,6 +30,7 @@ def main():
             "caps": ["TunableFrequency","PhaseAdjustable","AmplitudeAdjustable","CommitRequired"]
         })
     finally:
+        log.close()
         dds.close()
 
 if __name__ == "__main__":
@@ -1,5 +1,15 @@
 __all__ = ["hw", "twin", "__version__"]
 
-from . import hw, twin
-
 __version__ = "0.1.0"
+
+
+def __getattr__(name):
+    # subpackages load on first use (PEP 562), so `import amo` and the CLIs stay cheap
+    if name in ("hw", "twin"):
+        import importlib
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(__all__)
@@ -1,23 +1,276 @@
-from typing import Tuple
+import hashlib
+import json
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
 
 LIMITS: dict[str, Tuple[float, float]] = globals().get("LIMITS", {})
 
+def limits_version() -> str:
+    """Content hash of LIMITS, for caches of check() results."""
+    blob = json.dumps(sorted((k, list(v)) for k, v in LIMITS.items()))
+    return hashlib.sha256(blob.encode()).hexdigest()[:16]
+
 def check(cmd: dict) -> tuple[bool, str]:
-    dev = cmd.get("device")
-    action = cmd.get("action")
+    """Stateless range check of a 'set' command against LIMITS (any device)."""
+    if cmd.get("action") != "set":
+        return True, "ok"
+    key = f"{cmd.get('device')}.{cmd.get('param')}"
+    lim = LIMITS.get(key)
+    if lim is None:
+        return True, "ok"
+    value = cmd.get("value")
+    lo, hi = lim
+    try:
+        v = float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return False, f"Bad value for {key}: {value!r}"
+    if v is None or not (lo <= v <= hi):
+        return False, f"{key} must be within {lo}..{hi}, got {v}"
+    return True, "ok"
 
-    if dev == "laser" and action == "set":
-        param = cmd.get("param")
-        value = cmd.get("value")
+
+@dataclass(frozen=True)
+class Condition:
+    """
+    Cross-device guard: when `key` is set above `when_above` (always, if None),
+    the last value commanded to `requires` must lie within lo..hi.
+    """
+    key: str
+    requires: str
+    lo: float
+    hi: float
+    when_above: Optional[float] = None
+
+
+@dataclass
+class InterlockEngine:
+    """
+    Compiled interlock rules, indexed by 'device.param'.
+
+    - ranges:     key -> (lo, hi)
+    - rates:      key -> max |change| between consecutive sets
+    - conditions: cross-device guards (see Condition)
+
+    Calling the engine (or .check) decides one command with a few dict
+    lookups and records accepted values, which rate limits and conditions
+    compare against; the decision and the update happen under one lock, so
+    concurrent callers see a consistent state. check_ops() validates a whole
+    recipe's set-ops in one vectorized pass without touching that runtime
+    state.
+    """
+    ranges: Dict[str, Tuple[float, float]] = field(default_factory=dict)
+    rates: Dict[str, float] = field(default_factory=dict)
+    conditions: List[Condition] = field(default_factory=list)
+
+    def __post_init__(self) -> None:
+        self._conds: Dict[str, List[Condition]] = {}
+        for c in self.conditions:
+            self._conds.setdefault(c.key, []).append(c)
+        self._guarded = set(self.ranges) | set(self.rates) | set(self._conds)
+        self._watched = self._guarded | {c.requires for c in self.conditions}
+        # (device, param) index so unguarded commands never build a key string
+        self._watched_t = {tuple(k.split(".", 1)) for k in self._watched}
+        self.state: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "InterlockEngine":
+        """
+        {"ranges": {"laser.power": [0, 0.8]},
+         "rates": {"laser.detune_mhz": 5.0},
+         "conditions": [{"key": "laser.power", "when_above": 0.5,
+                         "requires": "shutter.open", "range": [1, 1]}]}
+        """
+        conds = [
+            Condition(c["key"], c["requires"], float(c["range"][0]), float(c["range"][1]), c.get("when_above"))
+            for c in data.get("conditions", [])
+        ]
+        return cls(
+            ranges={k: (float(lo), float(hi)) for k, (lo, hi) in data.get("ranges", {}).items()},
+            rates={k: float(v) for k, v in data.get("rates", {}).items()},
+            conditions=conds,
+        )
+
+    @property
+    def version(self) -> str:
+        """Content hash of the rules (stable across processes)."""
+        blob = json.dumps(
+            [sorted(self.ranges.items()), sorted(self.rates.items()),
+             [(c.key, c.requires, c.lo, c.hi, c.when_above) for c in self.conditions]],
+            default=str,
+        )
+        return hashlib.sha256(blob.encode()).hexdigest()[:16]
+
+    def reset(self) -> None:
+        with self._lock:
+            self.state.clear()
+
+    def copy(self) -> "InterlockEngine":
+        """Same rules, fresh runtime state."""
+        return InterlockEngine(dict(self.ranges), dict(self.rates), list(self.conditions))
+
+    def check(self, cmd: dict) -> tuple[bool, str]:
+        if cmd.get("action") != "set":
+            return True, "ok"
+        dev, param = cmd.get("device"), cmd.get("param")
+        if (dev, param) not in self._watched_t:
+            return True, "ok"
         key = f"{dev}.{param}"
+        value = cmd.get("value")
+        try:
+            v = float(value)
+        except (TypeError, ValueError):
+            return False, f"Bad value for {key}: {value!r}"
+        with self._lock:
+            if key in self._guarded:
+                why = self._violation(key, v, self.state.get(key), self.state.get)
+                if why is not None:
+                    return False, why
+            self.state[key] = v
+        return True, "ok"
 
-        if key in LIMITS:
-            lo, hi = LIMITS[key]
+    __call__ = check
+
+    def _violation(self, key: str, v: float, prev: Optional[float], lookup) -> Optional[str]:
+        lim = self.ranges.get(key)
+        if lim is not None and not (lim[0] <= v <= lim[1]):
+            return f"{key} must be within {lim[0]}..{lim[1]}, got {v}"
+        rate = self.rates.get(key)
+        if rate is not None and prev is not None and abs(v - prev) > rate:
+            return f"{key} change {prev}->{v} exceeds {rate} per step"
+        for c in self._conds.get(key, ()):
+            if c.when_above is not None and v <= c.when_above:
+                continue
+            other = lookup(c.requires)
+            if other is None or not (c.lo <= other <= c.hi):
+                return f"{key}={v} requires {c.requires} within {c.lo}..{c.hi}, got {other}"
+        return None
+
+    def check_ops(self, keys: Sequence[str], values: Sequence[Any]) -> List[Tuple[int, str]]:
+        """
+        Validate a sequence of set-ops (in execution order) without running them.
+
+        Returns [(op_index, reason), ...] sorted by index, at most one reason
+        per op (same precedence as check()); empty if all pass. As at
+        runtime, rate limits and conditions see only the preceding *accepted*
+        values, starting from an empty state. They are checked vectorized
+        first; from the first op they reject on, the rest is replayed one op
+        at a time, since a rejection changes what later ops compare against
+        (NaN values, which check() judges rule by rule, go the same way).
+        """
+        n = len(keys)
+        if n == 0:
+            return []
+        karr = np.asarray(keys, dtype=object)
+        vals = _to_float(values)
+        issues: Dict[int, str] = {}
+
+        first_nan = n
+        for i in np.flatnonzero(np.isnan(vals)):
+            if karr[i] not in self._watched:
+                continue
+            if not _is_nan_value(values[i]):
+                issues.setdefault(int(i), f"Bad value for {karr[i]}: {values[i]!r}")
+            else:
+                first_nan = min(first_nan, int(i))  # a real NaN: decided one op at a time below
+
+        # positions of each watched key in the op sequence
+        pos: Dict[str, np.ndarray] = {}
+        for k in self._watched:
+            idx = np.flatnonzero(karr == k)
+            idx = idx[~np.isnan(vals[idx])]
+            if idx.size:
+                pos[k] = idx
+
+        for k, (lo, hi) in self.ranges.items():
+            idx = pos.get(k)
+            if idx is None:
+                continue
+            v = vals[idx]
+            for i in idx[(v < lo) | (v > hi)]:
+                issues.setdefault(int(i), f"{k} must be within {lo}..{hi}, got {vals[i]}")
+
+        # range and value failures never reach the state: drop them first
+        if issues:
+            rejected = np.fromiter(issues, dtype=np.intp)
+            pos = {k: idx[~np.isin(idx, rejected)] for k, idx in pos.items()}
+        first = min(self._first_stateful_issue(pos, vals) + [first_nan])
+        if first == n:
+            return sorted(issues.items())
+
+        state = {k: float(vals[idx[idx < first][-1]]) for k, idx in pos.items() if idx.size and idx[0] < first}
+        for i in range(first, n):
+            k = karr[i]
+            if i in issues or k not in self._watched:
+                continue
+            v = float(vals[i])
+            why = self._violation(k, v, state.get(k), state.get) if k in self._guarded else None
+            if why is not None:
+                issues[i] = why
+            else:
+                state[k] = v
+        return sorted(issues.items())
+
+    def _first_stateful_issue(self, pos: Dict[str, np.ndarray], vals: np.ndarray) -> List[int]:
+        """Indices of the first rate/condition violation per rule, assuming every op in pos is accepted."""
+        firsts: List[int] = []
+        for k, rate in self.rates.items():
+            idx = pos.get(k)
+            if idx is None or idx.size < 2:
+                continue
+            bad = np.flatnonzero(np.abs(np.diff(vals[idx])) > rate)
+            if bad.size:
+                firsts.append(int(idx[bad[0] + 1]))
+
+        for c in self.conditions:
+            idx = pos.get(c.key)
+            if idx is None or idx.size == 0:
+                continue
+            if c.when_above is not None:
+                idx = idx[vals[idx] > c.when_above]
+            if idx.size == 0:
+                continue
+            ridx = pos.get(c.requires)
+            if ridx is None or ridx.size == 0:
+                other = np.full(idx.size, np.nan)
+            else:
+                j = np.searchsorted(ridx, idx) - 1
+                other = np.where(j >= 0, vals[ridx[np.maximum(j, 0)]], np.nan)
+            bad = np.flatnonzero(~((other >= c.lo) & (other <= c.hi)))
+            if bad.size:
+                firsts.append(int(idx[bad[0]]))
+        return firsts
+
+
+def _to_float(values: Sequence[Any]) -> np.ndarray:
+    try:
+        return np.asarray(values, dtype=float)
+    except (TypeError, ValueError):
+        out = np.empty(len(values))
+        for i, v in enumerate(values):
             try:
-                v = float(value) if value is not None else None
+                out[i] = float(v)
             except (TypeError, ValueError):
-                return False, f"Bad value for {key}: {value!r}"
-            if v is None or not (lo <= v <= hi):
-                return False, f"{key} must be within {lo}..{hi}, got {v}"
+                out[i] = np.nan
+        return out
 
-    return True, "ok"
+
+def _is_nan_value(v: Any) -> bool:
+    try:
+        return bool(np.isnan(float(v)))
+    except (TypeError, ValueError):
+        return False
+
+
+def load_engine(path: str) -> InterlockEngine:
+    """Load an InterlockEngine from a YAML or JSON rules file."""
+    with open(path, "r") as f:
+        if path.endswith((".yaml", ".yml")):
+            import yaml
+            data = yaml.safe_load(f) or {}
+        else:
+            data = json.load(f)
+    return InterlockEngine.from_dict(data)
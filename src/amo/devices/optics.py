@@ -51,6 +51,10 @@ class PBS:
         self._PT = R @ P0  @ Rm     # transmit projector
         self._PR = R @ P90 @ Rm     # reflect projector
 
+    def jones(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (J_T, J_R); J_R includes the reflection phase."""
+        return self._PT, self._phiR * self._PR
+
     def route(self, E: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
         """Return (E_T, E_R)."""
         ET = self._PT @ E
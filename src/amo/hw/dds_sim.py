@@ -1,17 +1,135 @@
 import time
-import random
-from typing import Dict, Any, Iterable
+from dataclasses import dataclass
+from typing import Dict, Any, Iterable, Mapping, Optional, Sequence
+import numpy as np
+from amo_digital_twin.core.noise import NoiseStream, RINNoise
+from .dds_synth import DDSSynth
 from .interfaces import (Device, Channels, ClockConsumer, TunableFrequency,
-                         PhaseAdjustable, AmplitudeAdjustable, CommitRequired, ReadbackState)
+                         PhaseAdjustable, AmplitudeAdjustable, CommitRequired, ReadbackState,
+                         Sweepable, Triggerable, Sequenceable)
+
+# per-channel register set; pending and active buffers share this layout
+REG_DTYPE = np.dtype([("f_Hz", "f8"), ("phase_deg", "f8"), ("amp", "f8")])
+STATE_DTYPE = np.dtype([("ch", "i4"), ("f_Hz", "f8"), ("phase_deg", "f8"), ("amp", "f8"), ("power_est", "f8")])
+
+
+@dataclass
+class CompiledSequence:
+    """
+    Run-length encoded profile table: rows[i] (full register set) holds for
+    trigger steps ends[i-1] .. ends[i]-1.
+    """
+    rows: np.ndarray        # (runs, n_ch) REG_DTYPE
+    ends: np.ndarray        # (runs,) cumulative step count
+    repeat: bool = False
+
+    @property
+    def n_steps(self) -> int:
+        return int(self.ends[-1])
+
+    def expand(self) -> np.ndarray:
+        """(n_steps, n_ch) registers, one row per step."""
+        return np.repeat(self.rows, np.diff(self.ends, prepend=0), axis=0)
+
+
+def compile_sequence(table: Mapping[str, Any], base: np.ndarray, channels: Optional[Sequence[int]],
+                     nyquist_hz: float, repeat: bool = False) -> CompiledSequence:
+    """
+    Validate a {'f_Hz', 'phase_deg', 'amp'} table (each (steps,) or
+    (steps, len(channels))) against the register limits and RLE-compress
+    it. Channels and registers not in the table hold their base values.
+    """
+    unknown = set(table) - set(REG_DTYPE.names)
+    if unknown:
+        raise ValueError(f"unknown sequence columns: {sorted(unknown)}")
+    if not table:
+        raise ValueError("empty sequence table")
+    n_ch = base.shape[0]
+    chans = np.arange(n_ch) if channels is None else np.asarray(channels, dtype=int)
+    if chans.size and (chans.min() < 0 or chans.max() >= n_ch):
+        raise ValueError(f"sequence channels out of range 0..{n_ch - 1}")
+    cols = {}
+    for name, v in table.items():
+        a = np.asarray(v, dtype=float)
+        if a.ndim == 1:
+            a = a[:, None]
+        if a.ndim != 2 or a.shape[1] not in (1, chans.size):
+            raise ValueError(f"{name}: expected shape (steps,) or (steps, {chans.size}), got {np.shape(v)}")
+        if not np.all(np.isfinite(a)):
+            raise ValueError(f"{name}: non-finite value at step {int(np.argmin(np.isfinite(a).all(axis=1)))}")
+        cols[name] = a
+    steps = {a.shape[0] for a in cols.values()}
+    if len(steps) != 1 or 0 in steps:
+        raise ValueError(f"sequence columns differ in length or are empty: {sorted(steps)}")
+    n = steps.pop()
+    _check_range(cols.get("f_Hz"), 0.0, nyquist_hz, "f_Hz", open_hi=True)
+    _check_range(cols.get("amp"), 0.0, 1.0, "amp")
+    full = np.repeat(base[None, :], n, axis=0)
+    for name, a in cols.items():
+        v = np.mod(a, 360.0) if name == "phase_deg" else a
+        full[name][:, chans] = v
+    change = np.zeros(n, dtype=bool)
+    change[0] = True
+    for name in REG_DTYPE.names:
+        change[1:] |= np.any(full[name][1:] != full[name][:-1], axis=1)
+    starts = np.flatnonzero(change)
+    ends = np.append(starts[1:], n)
+    return CompiledSequence(full[starts].copy(), ends, repeat)
+
+
+def _check_range(a: Optional[np.ndarray], lo: float, hi: float, name: str, open_hi: bool = False) -> None:
+    if a is None:
+        return
+    bad = (a < lo) | ((a >= hi) if open_hi else (a > hi))
+    if bad.any():
+        step = int(np.flatnonzero(bad.any(axis=1))[0])
+        raise ValueError(f"{name} out of range [{lo:g}, {hi:g}{')' if open_hi else ']'} at step {step}")
 
 class SimDDS(Device, Channels, ClockConsumer, TunableFrequency,
-             PhaseAdjustable, AmplitudeAdjustable, CommitRequired, ReadbackState):
-    def __init__(self, ref_clk_hz: float = 25e6, pll_mult: int = 20, n_ch: int = 4):
+             PhaseAdjustable, AmplitudeAdjustable, CommitRequired, ReadbackState,
+             Sweepable, Triggerable, Sequenceable):
+    """
+    Simulated n-channel DDS.
+
+    Setters write a pending register buffer (get_* read it back);
+    apply_update() latches it into the active buffer that read_state()
+    reports, like the I/O update pin on real parts. Registers are NumPy
+    arrays, so set_many()/read_state_array() handle hundreds of channels
+    without per-channel Python work.
+
+    render(n) synthesizes the RF output with a DDSSynth clocked at sysclk
+    (or synth(fs_hz=...)), fed from the active registers. Sweeps run in the
+    synth: start_sweep() starts one now, or arm() then trigger() starts all
+    configured sweeps on the same sample.
+
+    upload_sequence() loads a whole profile table (validated, RLE-compressed);
+    after arm() every trigger() latches the next step into the active
+    registers (and the synth) and records its time in sequence_times.
+    run_sequence() plays a table against given trigger times in one call.
+    """
+    def __init__(self, ref_clk_hz: float = 25e6, pll_mult: int = 20, n_ch: int = 4,
+                 seed: int | None = None, noise: NoiseStream | None = None):
         self._ref = ref_clk_hz
         self._sys = ref_clk_hz * pll_mult
-        self._f = [0.0] * n_ch
-        self._p = [0.0] * n_ch
-        self._a = [0.0] * n_ch
+        self._pending = np.zeros(n_ch, dtype=REG_DTYPE)
+        self._active = np.zeros(n_ch, dtype=REG_DTYPE)
+        # field views, so scalar setters stay cheap
+        self._f = self._pending["f_Hz"]
+        self._p = self._pending["phase_deg"]
+        self._a = self._pending["amp"]
+        self._state = np.zeros(n_ch, dtype=STATE_DTYPE)
+        self._state["ch"] = np.arange(n_ch)
+        self._last_update = None
+        self._synth: DDSSynth | None = None
+        self._loaded: np.ndarray | None = None           # registers last pushed to the synth
+        self._armed = False
+        self.triggers: list = []                          # wall time of each trigger()
+        self._seq: CompiledSequence | None = None
+        self._seq_pos = 0
+        self._seq_run = 0
+        self.sequence_times = np.zeros(0, dtype=np.int64)  # time_ns of each step's trigger
+        # ~1% amplitude jitter on power_est; seed for reproducible readback
+        self._noise = noise or NoiseStream([RINNoise(rel_sigma=0.006)], seed=seed, device_id=self.id())
 
     # Device
     def id(self) -> str: return "sim:dds"
@@ -30,32 +148,203 @@ class SimDDS(Device, Channels, ClockConsumer, TunableFrequency,
 
     # TunableFrequency
     def set_freq(self, ch: int, hz: float) -> None: self._f[ch] = float(hz)
-    def get_freq(self, ch: int) -> float: return self._f[ch]
+    def get_freq(self, ch: int) -> float: return float(self._f[ch])
 
     # PhaseAdjustable
     def set_phase_deg(self, ch: int, deg: float) -> None: self._p[ch] = float(deg) % 360.0
-    def get_phase_deg(self, ch: int) -> float: return self._p[ch]
+    def get_phase_deg(self, ch: int) -> float: return float(self._p[ch])
 
     # AmplitudeAdjustable
     def set_amplitude(self, ch: int, frac: float) -> None:
         self._a[ch] = max(0.0, min(1.0, float(frac)))
-    def get_amplitude(self, ch: int) -> float: return self._a[ch]
+    def get_amplitude(self, ch: int) -> float: return float(self._a[ch])
+
+    def set_many(self, ch, f_hz=None, phase_deg=None, amp=None) -> None:
+        """
+        Batch setter: ch is an index array (or slice), the others scalars or
+        arrays broadcast against it; None leaves that register alone.
+        Phases wrap to [0, 360), amplitudes clip to [0, 1].
+        """
+        if f_hz is not None:
+            self._f[ch] = f_hz
+        if phase_deg is not None:
+            self._p[ch] = np.mod(phase_deg, 360.0)
+        if amp is not None:
+            self._a[ch] = np.clip(amp, 0.0, 1.0)
 
     # CommitRequired
-    def apply_update(self) -> None: self._last_update = time.time()
+    def apply_update(self) -> None:
+        if self._synth is not None:
+            self._load_synth(self._pending)   # may raise: registers stay as they were
+        self._active[...] = self._pending
+        self._last_update = time.time()
+
+    # waveform output
+    def synth(self, fs_hz: float | None = None) -> DDSSynth:
+        """
+        The synthesis engine (created on first use; fs_hz defaults to sysclk).
+        Raises ValueError if a register or uploaded sequence frequency is at
+        or above the Nyquist frequency of fs_hz.
+        """
+        if self._synth is None or (fs_hz is not None and fs_hz != self._synth.fs):
+            fs = float(fs_hz or self._sys)
+            f = [self._active["f_Hz"], self._pending["f_Hz"]]
+            if self._seq is not None:
+                f.append(self._seq.rows["f_Hz"].ravel())
+            top = max(float(x.max(initial=0.0)) for x in f)
+            if top >= fs / 2:
+                raise ValueError(f"fs_hz={fs:g} must exceed twice the highest register frequency ({top:g} Hz)")
+            self._synth = DDSSynth(len(self._f), fs)
+            self._loaded = None
+            self._load_synth(self._active)
+        return self._synth
+
+    def _load_synth(self, a: np.ndarray) -> None:
+        """
+        Push the registers in a that changed since the last load; running
+        sweeps keep their frequency. Frequencies go first, so a rejected one
+        leaves the synth unchanged.
+        """
+        if self._loaded is None:
+            self._loaded = np.zeros_like(a)
+            for name in REG_DTYPE.names:
+                self._loaded[name] = np.nan                 # nothing loaded yet
+        sweeping = self._synth.sweeping()
+        for name, arg in (("f_Hz", "f_hz"), ("phase_deg", "phase_deg"), ("amp", "amp")):
+            changed = a[name] != self._loaded[name]
+            if name == "f_Hz":
+                changed &= ~sweeping
+            ch = np.flatnonzero(changed)
+            if ch.size:
+                self._synth.set_tone(ch, **{arg: a[name][ch]})
+                self._loaded[name][ch] = a[name][ch]
+
+    def render(self, n: int) -> np.ndarray:
+        """Next n RF output samples of every channel, (n_ch, n) float32."""
+        return self.synth().render(n)
+
+    # Sweepable
+    def config_freq_sweep(self, ch: int, start_hz: float, stop_hz: float, rate_hz_per_s: float) -> None:
+        self.synth().config_sweep(ch, start_hz, stop_hz, rate_hz_per_s)
+
+    def start_sweep(self, ch: int) -> None:
+        self.synth().start_sweep(ch)
+
+    def stop_sweep(self, ch: int) -> None:
+        """Stop and hold; the reached frequency becomes the channel's register value."""
+        s = self.synth()
+        s.stop_sweep(ch)
+        self._f[ch] = self._active["f_Hz"][ch] = s.frequency(ch)
+        if self._loaded is not None:
+            self._loaded["f_Hz"][ch] = self._active["f_Hz"][ch]
+
+    # Triggerable
+    def arm(self) -> None:
+        """Arm the next trigger; with a sequence loaded, rewind it to step 0."""
+        self._armed = True
+        if self._seq is not None:
+            self._seq_pos = self._seq_run = 0
+
+    def trigger(self) -> None:
+        if not self._armed:
+            raise RuntimeError("trigger() before arm()")
+        t = time.time_ns()
+        if self._seq is not None:
+            self._step_sequence(t)
+            self.triggers.append(t / 1e9)
+            return
+        self.triggers.append(t / 1e9)
+        self._armed = False
+        if self._synth is not None:
+            for ch in self._synth.configured_sweeps():
+                self._synth.start_sweep(ch)
+
+    # Sequenceable
+    def upload_sequence(self, table: Mapping[str, Any], channels: Optional[Sequence[int]] = None,
+                        repeat: bool = False) -> Dict[str, Any]:
+        """
+        Load a profile table, one row per trigger step (see compile_sequence),
+        checked against the Nyquist limit of sysclk and of the synth, if one
+        is running. Unlisted channels/registers hold their current pending values. With
+        repeat the table wraps around instead of disarming after the last step.
+        """
+        fs = self._sys if self._synth is None else min(self._sys, self._synth.fs)
+        seq = compile_sequence(table, self._pending.copy(), channels, fs / 2, repeat)
+        self._seq = seq
+        self._seq_pos = self._seq_run = 0
+        self.sequence_times = np.zeros(seq.n_steps, dtype=np.int64)
+        return {"steps": seq.n_steps, "runs": len(seq.ends),
+                "compression": seq.n_steps / len(seq.ends)}
+
+    def clear_sequence(self) -> None:
+        self._seq = None
+
+    def sequence_position(self) -> int:
+        """Index of the step the next trigger() plays."""
+        return self._seq_pos
+
+    def _step_sequence(self, t_ns: int) -> None:
+        seq = self._seq
+        i = self._seq_pos
+        if i == 0 or i == seq.ends[self._seq_run]:
+            self._seq_run = 0 if i == 0 else self._seq_run + 1
+            self._latch(seq.rows[self._seq_run])
+        self.sequence_times[i] = t_ns
+        self._seq_pos = i + 1
+        if self._seq_pos == seq.n_steps:
+            self._seq_pos = self._seq_run = 0
+            self._armed = seq.repeat
+
+    def _latch(self, regs: np.ndarray) -> None:
+        if self._synth is not None:
+            self._load_synth(regs)
+        self._active[...] = regs
+        self._pending[...] = regs
+        self._last_update = time.time()
+
+    def run_sequence(self, trigger_times_ns) -> np.ndarray:
+        """
+        Play the uploaded sequence offline: step k fires at trigger_times_ns[k].
+        Returns the active registers after each trigger, (len(times), n_ch)
+        REG_DTYPE, and leaves the device in the final state.
+        """
+        if self._seq is None:
+            raise RuntimeError("no sequence uploaded")
+        t = np.asarray(trigger_times_ns, dtype=np.int64)
+        seq = self._seq
+        if t.size > seq.n_steps and not seq.repeat:
+            raise ValueError(f"{t.size} triggers for a {seq.n_steps}-step sequence")
+        steps = np.arange(t.size) % seq.n_steps
+        history = seq.rows[np.searchsorted(seq.ends, steps, side="right")]
+        if t.size:
+            self.sequence_times[steps] = t
+            self._latch(history[-1])
+            self.triggers.extend((t / 1e9).tolist())
+        self._seq_pos = t.size % seq.n_steps
+        self._seq_run = int(np.searchsorted(seq.ends, self._seq_pos - 1, side="right")) if self._seq_pos else 0
+        return history
 
     # ReadbackState
+    def read_state_array(self) -> np.ndarray:
+        """Active registers as a structured array (fields of STATE_DTYPE), one row per channel."""
+        st = self._state
+        st["f_Hz"] = self._active["f_Hz"]
+        st["phase_deg"] = self._active["phase_deg"]
+        st["amp"] = self._active["amp"]
+        st["power_est"] = self._noise.apply(self._active["amp"] ** 2)
+        return st.copy()
+
     def read_state(self) -> Dict[str, Any]:
-        power = [self._a[i]**2 * (1.0 + 0.01*random.uniform(-1,1)) for i in range(len(self._a))]
+        st = self.read_state_array()
         return {"t": self._last_update, "sysclk_Hz": self._sys,
-                "ch":[{"f_Hz":self._f[i],"phase_deg":self._p[i],"amp":self._a[i],"power_est":power[i]}
-                      for i in range(len(self._f))]}
+                "ch":[{"f_Hz": f, "phase_deg": p, "amp": a, "power_est": pw}
+                      for _, f, p, a, pw in st.tolist()]}
 
     def set_frequency(self, ch: int, hz: float) -> None:
         self._f[ch] = float(hz)
     def get_frequency(self, ch: int) -> float:
-        return self._f[ch]
+        return float(self._f[ch])
     def set_phase(self, ch: int, deg: float) -> None:
         self._p[ch] = float(deg)
     def get_phase(self, ch: int) -> float:
-        return self._p[ch]
+        return float(self._p[ch])
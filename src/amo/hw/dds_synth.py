@@ -0,0 +1,240 @@
+from __future__ import annotations
+import threading
+from typing import Optional, Tuple
+
+import numpy as np
+
+FTW_BITS = 32          # frequency tuning word width (AD99xx style)
+POW_BITS = 16          # phase offset word width
+_ONE = 1 << 64         # one cycle in accumulator units
+_FTW_SHIFT = 64 - FTW_BITS
+
+
+def _wrap(x: int) -> int:
+    """Python int -> the int64 with the same value mod 2**64."""
+    return (x + (1 << 63)) % _ONE - (1 << 63)
+
+
+def ftw(f_hz, fs_hz: float) -> np.ndarray:
+    """Tuning words (uint32) for f_hz at sample rate fs_hz."""
+    return np.round(np.asarray(f_hz, dtype=float) / fs_hz * (1 << FTW_BITS)).astype(np.int64) & 0xFFFFFFFF
+
+
+def ftw_to_hz(words, fs_hz: float) -> np.ndarray:
+    return np.asarray(words, dtype=float) * fs_hz / (1 << FTW_BITS)
+
+
+class DDSSynth:
+    """
+    Sample-accurate model of n DDS cores sharing one sample clock fs_hz.
+
+    Each channel has a phase accumulator; frequencies are quantized to
+    32-bit tuning words as on the hardware, phase offsets to 16 bits, and
+    the output is a sine LUT of 2**lut_bits entries scaled by amplitude.
+    The accumulator is kept as a 64-bit fraction of a cycle (tuning word in
+    the top 32 bits) so sweep rates below one FTW LSB per sample still
+    accumulate exactly. Frequency changes are phase-continuous.
+
+    render(n) returns an (n_ch, n) float32 block. Per-sample work is
+    in-place NumPy on cache-sized pieces (a multiply, or a cumsum for
+    sweeping channels, then a shift and one LUT gather), a few 10^8
+    samples/s on one core in total: channels render one after another, so
+    each of n_ch channels gets about 1/n_ch of that.
+    """
+
+    def __init__(self, n_ch: int, fs_hz: float, lut_bits: int = 14, block: int = 1 << 16):
+        self.n_ch = int(n_ch)
+        self.fs = float(fs_hz)
+        self.lut_bits = int(lut_bits)
+        self._lut = np.sin(2 * np.pi * np.arange(1 << self.lut_bits) / (1 << self.lut_bits)).astype(np.float32)
+        self._acc = np.zeros(n_ch, dtype=np.int64)        # phase, 2**64 per cycle (wrapping)
+        self._step = np.zeros(n_ch, dtype=np.int64)       # per-sample phase increment
+        self._pow = np.zeros(n_ch, dtype=np.int64)        # phase offset, accumulator units
+        self._amp = np.ones(n_ch, dtype=np.float32)
+        # sweeps: increment of the step per sample and the bounds it is clamped to
+        self._dstep = np.zeros(n_ch, dtype=np.int64)
+        self._lo = np.zeros(n_ch, dtype=np.int64)
+        self._hi = np.zeros(n_ch, dtype=np.int64)
+        self._sweep_cfg: dict = {}
+        self._sweeping = np.zeros(n_ch, dtype=bool)
+        # amplitude profiles: (t_s, amp) knots, played relative to their start sample
+        self._profiles: dict = {}
+        self.sample = 0                                   # samples rendered so far
+        self.block = int(block)
+        self._k = np.arange(self.block, dtype=np.int64)
+        self._kf = self._k.astype(float)
+        self._phase = np.empty(self.block, dtype=np.int64)
+        self._steps = np.empty(self.block, dtype=np.int64)
+        self._shift = np.uint64(64 - self.lut_bits)
+
+    # -- registers --------------------------------------------------------------
+    def _check_freq(self, f_hz) -> None:
+        f = np.asarray(f_hz, dtype=float)
+        if np.any(f < 0) or np.any(f >= self.fs / 2):
+            raise ValueError(f"frequency must be in [0, {self.fs / 2:g}) Hz (Nyquist of fs={self.fs:g})")
+
+    def set_tone(self, ch, f_hz=None, phase_deg=None, amp=None) -> None:
+        """Set frequency / phase offset / amplitude of one channel or an index array."""
+        if f_hz is not None:
+            self._check_freq(f_hz)
+            self._step[ch] = ftw(f_hz, self.fs) << _FTW_SHIFT
+        if phase_deg is not None:
+            words = np.round(np.mod(phase_deg, 360.0) / 360.0 * (1 << POW_BITS)).astype(np.int64)
+            self._pow[ch] = (words & ((1 << POW_BITS) - 1)) << (64 - POW_BITS)
+        if amp is not None:
+            self._amp[ch] = np.clip(amp, 0.0, 1.0)
+
+    def frequency(self, ch: int) -> float:
+        """Current output frequency (Hz) of ch, including sweep progress."""
+        return float((int(self._step[ch]) % _ONE) / _ONE * self.fs)
+
+    # -- sweeps -----------------------------------------------------------------
+    def config_sweep(self, ch: int, start_hz: float, stop_hz: float, rate_hz_per_s: float) -> None:
+        self._check_freq([start_hz, stop_hz])
+        self._sweep_cfg[ch] = (float(start_hz), float(stop_hz), abs(float(rate_hz_per_s)))
+
+    def start_sweep(self, ch: int) -> None:
+        start, stop, rate = self._sweep_cfg[ch]
+        begin = int(ftw(start, self.fs)) << _FTW_SHIFT
+        end = int(ftw(stop, self.fs)) << _FTW_SHIFT
+        # Hz/s -> accumulator units per sample per sample
+        d = int(round(rate / self.fs / self.fs * _ONE))
+        self._step[ch] = begin
+        self._dstep[ch] = d if end >= begin else -d
+        self._lo[ch], self._hi[ch] = min(begin, end), max(begin, end)
+        self._sweeping[ch] = d != 0 and begin != end
+
+    def configured_sweeps(self) -> list:
+        return sorted(self._sweep_cfg)
+
+    def sweeping(self) -> np.ndarray:
+        """Boolean mask of channels whose sweep is still running."""
+        return self._sweeping.copy()
+
+    def stop_sweep(self, ch: int) -> None:
+        """Hold the frequency reached so far."""
+        self._sweeping[ch] = False
+
+    # -- amplitude profiles -------------------------------------------------------
+    def set_amplitude_profile(self, ch: int, t_s, amp) -> None:
+        """Piecewise-linear amplitude vs time from the next rendered sample; holds the last value."""
+        t = np.asarray(t_s, dtype=float)
+        a = np.clip(np.asarray(amp, dtype=float), 0.0, 1.0)
+        if t.ndim != 1 or t.shape != a.shape or t.size == 0 or np.any(np.diff(t) < 0):
+            raise ValueError("profile needs matching 1-D, non-decreasing t_s and amp")
+        self._profiles[ch] = (self.sample, t * self.fs, a)
+
+    def clear_amplitude_profile(self, ch: int) -> None:
+        prof = self._profiles.pop(ch, None)
+        if prof is not None:
+            start, ks, a = prof
+            self._amp[ch] = np.interp(self.sample - start, ks, a)
+
+    # -- rendering --------------------------------------------------------------
+    def render(self, n: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """The next n output samples of every channel as (n_ch, n) float32."""
+        n = int(n)
+        if out is None:
+            out = np.empty((self.n_ch, n), dtype=np.float32)
+        # work in cache-sized pieces with reused scratch arrays
+        for j in range(0, n, self.block):
+            m = min(self.block, n - j)
+            for ch in range(self.n_ch):
+                self._render_channel(ch, out[ch, j:j + m])
+            self.sample += m
+        return out
+
+    def _render_channel(self, ch: int, row: np.ndarray) -> None:
+        m = row.shape[0]
+        k = self._k[:m]
+        phase = self._phase[:m]
+        if self._sweeping[ch]:
+            lo, hi, d = self._lo[ch], self._hi[ch], self._dstep[ch]
+            steps = self._steps[:m]
+            np.multiply(k, d, out=steps)
+            steps += self._step[ch]
+            np.clip(steps, lo, hi, out=steps)
+            np.cumsum(steps, out=phase)
+            total = int(phase[-1])
+            phase -= steps                                  # phase before each sample's increment
+            nxt = min(max(int(self._step[ch]) + int(d) * m, int(lo)), int(hi))
+            self._step[ch] = nxt
+            self._sweeping[ch] = d != 0 and nxt != (hi if d > 0 else lo)
+        else:
+            np.multiply(k, self._step[ch], out=phase)
+            total = m * int(self._step[ch])
+        phase += np.int64(_wrap(int(self._acc[ch]) + int(self._pow[ch])))
+        u = phase.view(np.uint64)
+        np.right_shift(u, self._shift, out=u)               # top lut_bits -> LUT index
+        np.take(self._lut, phase, out=row)
+        prof = self._profiles.get(ch)
+        if prof is not None:
+            start, ks, a = prof
+            row *= np.interp(self._kf[:m] + (self.sample - start), ks, a).astype(np.float32)
+            if self.sample - start + m > ks[-1]:
+                # profile finished: hold its last value as a plain amplitude
+                self._amp[ch] = a[-1]
+                del self._profiles[ch]
+        elif self._amp[ch] != 1.0:
+            row *= self._amp[ch]
+        self._acc[ch] = _wrap(int(self._acc[ch]) + total)
+
+    def stream_into(self, ring: "RingBuffer", n: int, block: int = 1 << 16) -> None:
+        """Render n samples in blocks straight into ring."""
+        while n > 0:
+            m = min(block, n)
+            ring.write(self.render(m))
+            n -= m
+
+
+class RingBuffer:
+    """
+    Fixed-capacity (n_ch, capacity) float32 sample ring for a producer
+    (DDSSynth.stream_into) and consumer (a twin block). When the writer
+    laps the reader the oldest samples are overwritten and counted in
+    overruns.
+    """
+
+    def __init__(self, n_ch: int, capacity: int):
+        self.buf = np.zeros((n_ch, int(capacity)), dtype=np.float32)
+        self.capacity = int(capacity)
+        self._w = 0           # total samples written
+        self._r = 0           # total samples read
+        self.overruns = 0
+        self._lock = threading.Lock()
+        self._readable = threading.Condition(self._lock)
+
+    def __len__(self) -> int:
+        return self._w - self._r
+
+    def write(self, block: np.ndarray) -> None:
+        n = block.shape[1]
+        if n > self.capacity:
+            block, n = block[:, -self.capacity:], self.capacity
+        with self._lock:
+            i = self._w % self.capacity
+            first = min(n, self.capacity - i)
+            self.buf[:, i:i + first] = block[:, :first]
+            self.buf[:, :n - first] = block[:, first:]
+            self._w += n
+            lost = self._w - self._r - self.capacity
+            if lost > 0:
+                self.overruns += lost
+                self._r += lost
+            self._readable.notify_all()
+
+    def read(self, n: int, timeout: Optional[float] = None) -> np.ndarray:
+        """Up to n oldest unread samples as (n_ch, m); waits up to timeout for any."""
+        with self._lock:
+            if self._w == self._r and timeout:
+                self._readable.wait(timeout)
+            m = min(int(n), self._w - self._r)
+            i = self._r % self.capacity
+            first = min(m, self.capacity - i)
+            out = np.concatenate([self.buf[:, i:i + first], self.buf[:, :m - first]], axis=1)
+            self._r += m
+            return out
+
+    def positions(self) -> Tuple[int, int]:
+        """(samples written, samples read) since creation."""
+        return self._w, self._r
@@ -1,4 +1,4 @@
-from typing import Protocol, Dict, Any, Iterable, Optional
+from typing import Protocol, Dict, Any, Iterable, Mapping, Optional, Sequence
 
 
 class Device(Protocol):
@@ -71,6 +71,15 @@ class Sweepable(Protocol):
         ...
 
 
+class Sequenceable(Protocol):
+    def upload_sequence(self, table: Mapping[str, Any], channels: Optional[Sequence[int]] = None,
+                        repeat: bool = False) -> Dict[str, Any]:  # one row per trigger
+        ...
+
+    def sequence_position(self) -> int:
+        ...
+
+
 class ReadbackState(Protocol):
     def read_state(self) -> Dict[str, Any]:
         ...
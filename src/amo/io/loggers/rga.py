@@ -1,57 +1,186 @@
 import csv
-from typing import Any, Sequence, Iterable, Optional, Dict, Tuple
+import io
+import os
+import threading
+from typing import Any, Sequence, Iterable, List, Optional, Dict, Tuple
 from amo.io.sinks.influx import InfluxSink
+from amo.io.watch import FileWatcher
 import time
 import pathlib
 
+import numpy as np
+
+RGA_TAGS = {"device": "rga_01", "station": "bake"}
+RGA_SCALARS = ("pressure_total", "temperature", "humidity")
+
 # typing helpers
 def _coerce_headers(h: Optional[Sequence[str]]) -> Sequence[str]:
     return list(h) if h is not None else []
 def _coerce_values(v: Iterable[Any] | Sequence[Any]) -> Iterable[Any]:
     return list(v)
 
+def _is_rga_field(name: str) -> bool:
+    return name.startswith("amu_") or name in RGA_SCALARS
+
 def parse_rga_csv_row(row: Dict[str, str]) -> Tuple[Dict[str, float], Dict[str, str]]:
     """Extract numeric RGA fields + static tags from one CSV row."""
     fields = {}
     for k, v in row.items():
         if not v:
             continue
-        if k.startswith("amu_") or k in ("pressure_total", "temperature", "humidity"):
+        if _is_rga_field(k):
             try:
                 fields[k] = float(v)
             except ValueError:
                 pass
-    tags = {"device": "rga_01", "station": "bake"}
-    return fields, tags
-
-def stream_rga_csv_to_influx(csv_path: str, sink: InfluxSink, follow: bool = True, sleep_s: float = 1.0):
-    """Continuously stream a CSV file (like tail -f) into InfluxDB."""
-    path = pathlib.Path(csv_path)
-    with path.open() as f:
-        reader = csv.DictReader(f)
-        # stream existing rows
-        for row in reader:
-            fields, tags = parse_rga_csv_row(row)
-            if fields:
-                sink.write("rga", fields, tags)
-        # follow mode
-        if follow:
+    return fields, dict(RGA_TAGS)
+
+def _float_column(values: List[str]) -> np.ndarray:
+    try:
+        return np.asarray(values, dtype=float)
+    except ValueError:  # '' or junk somewhere: convert cell by cell
+        out = np.full(len(values), np.nan)
+        for i, v in enumerate(values):
+            try:
+                out[i] = float(v)
+            except ValueError:
+                pass
+        return out
+
+def parse_rga_csv_rows(rows: List[List[str]], fieldnames: Sequence[str]) -> Dict[str, np.ndarray]:
+    """
+    Bulk version of parse_rga_csv_row: rows of split CSV values -> field columns.
+
+    Empty or non-numeric cells become NaN (encode_columns leaves them out).
+    """
+    if not rows:
+        return {}
+    cols = {}
+    width = len(fieldnames)
+    rows = [r if len(r) == width else (r + [""] * width)[:width] for r in rows]
+    for j, values in enumerate(zip(*rows)):
+        name = fieldnames[j]
+        if _is_rga_field(name):
+            cols[name] = _float_column(list(values))
+    return cols
+
+def parse_rga_csv_text(text: str, fieldnames: Sequence[str]) -> Dict[str, np.ndarray]:
+    """Parse complete CSV lines (no header; quoting handled by csv)."""
+    return parse_rga_csv_rows([r for r in csv.reader(io.StringIO(text)) if r], fieldnames)
+
+def write_rga_columns(sink: InfluxSink, cols: Dict[str, np.ndarray], t_ns: Optional[int] = None) -> int:
+    """One batched write; rows get distinct timestamps ending at t_ns (default now)."""
+    if not cols:
+        return 0
+    n = len(next(iter(cols.values())))
+    end = time.time_ns() if t_ns is None else t_ns
+    ts = end - (n - 1) + np.arange(n, dtype=np.int64)
+    return sink.write_columns("rga", cols, ts, RGA_TAGS)
+
+
+class _Tail:
+    """Byte-level tail of one CSV file that survives rotation and truncation."""
+
+    def __init__(self, path: pathlib.Path, chunk_bytes: int = 8 << 20):
+        self.path = path
+        self.chunk_bytes = chunk_bytes
+        self.f = None
+        self.ino = None
+        self.fieldnames: List[str] = []
+        self.partial = b""
+
+    def open(self) -> bool:
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            return False
+        if self.f is not None:
+            self.f.close()
+        self.f, self.ino = f, os.fstat(f.fileno()).st_ino
+        self.fieldnames, self.partial = [], b""
+        return True
+
+    def read(self) -> bytes:
+        """All complete lines appended since the last call (header consumed)."""
+        if self.f is None and not self.open():
+            return b""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            st = None
+        if st is not None and st.st_ino == self.ino and st.st_size < self.f.tell():
+            self.f.seek(0)  # truncated in place
+            self.fieldnames, self.partial = [], b""
+        chunk = self.f.read(self.chunk_bytes)
+        data = self.partial + chunk
+        if len(chunk) < self.chunk_bytes and st is not None and st.st_ino != self.ino:
+            # rotated: finish the old file (parsed with its header); the next
+            # read() opens the new one
+            out = self._complete(data if data.endswith(b"\n") or not data else data + b"\n")
+            self.f.close()
+            self.f = None
+            return out or self.read()
+        return self._complete(data)
+
+    def _complete(self, data: bytes) -> bytes:
+        cut = data.rfind(b"\n") + 1
+        self.partial = data[cut:]
+        data = data[:cut]
+        if not self.fieldnames and data:
+            nl = data.index(b"\n") + 1
+            header = data[:nl].decode("utf-8-sig")
+            self.fieldnames = next(csv.reader([header]), [])
+            data = data[nl:]
+        return data
+
+    def finish(self) -> bytes:
+        """The unterminated last line as a complete one; for a file nobody is still writing."""
+        data, self.partial = self.partial, b""
+        return self._complete(data + b"\n") if data.strip() else b""
+
+    def close(self) -> None:
+        if self.f is not None:
+            self.f.close()
+
+
+def stream_rga_csv_to_influx(csv_path: str, sink: InfluxSink, follow: bool = True, sleep_s: float = 1.0,
+                             *, stop: Optional[threading.Event] = None, use_inotify: bool = True):
+    """
+    Continuously stream a CSV file (like tail -f) into InfluxDB.
+
+    Appended bytes are read in one go, parsed into columns and sent as one
+    batched write per chunk. In follow mode the loop sleeps on inotify (or
+    polls every sleep_s where unavailable) and follows rotation (a new file
+    under the same name) and truncation (detected when the file shrinks below
+    the read position). Set `stop` to end follow mode.
+    """
+    tail = _Tail(pathlib.Path(csv_path))
+    stop = stop or threading.Event()
+    with FileWatcher(csv_path, poll_s=sleep_s, use_inotify=use_inotify) as watcher:
+        try:
             while True:
-                line = f.readline()
-                if not line:
-                    time.sleep(sleep_s)
+                data = tail.read()
+                if data:
+                    cols = parse_rga_csv_text(data.decode("utf-8", "replace"), tail.fieldnames)
+                    write_rga_columns(sink, cols)
                     continue
-                row = dict(zip(reader.fieldnames, line.strip().split(reader.dialect.delimiter)))
-                fields, tags = parse_rga_csv_row(row)
-                if fields:
-                    sink.write("rga", fields, tags)
-
-def upload_rga_folder(folder: str, sink: InfluxSink):
-    """Upload all *.csv files in folder to InfluxDB."""
-    for p in pathlib.Path(folder).glob("*.csv"):
-        with p.open() as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                fields, tags = parse_rga_csv_row(row)
-                if fields:
-                    sink.write("rga", fields, tags)
+                if tail.f is None and tail.path.exists():
+                    continue  # rotated: pick up the new file right away
+                if not follow:
+                    # no writer to finish the last line: parse it as it is
+                    data = tail.finish()
+                    if data:
+                        write_rga_columns(sink, parse_rga_csv_text(data.decode("utf-8", "replace"), tail.fieldnames))
+                    return
+                if stop.is_set():
+                    return
+                # short timeout so `stop` and missed events are still noticed
+                watcher.wait(timeout=min(sleep_s, 1.0) if watcher.uses_inotify else sleep_s)
+        finally:
+            tail.close()
+
+def upload_rga_folder(folder: str, sink: InfluxSink, *, workers: Optional[int] = None,
+                      manifest: Optional[str] = None):
+    """Upload all *.csv files in folder to InfluxDB (see backfill_rga_folder)."""
+    from amo.io.loggers.rga_backfill import backfill_rga_folder
+    return backfill_rga_folder(folder, sink, workers=workers, manifest=manifest)
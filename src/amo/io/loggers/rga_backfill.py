@@ -0,0 +1,223 @@
+import csv
+import json
+import os
+import pathlib
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from amo.io.loggers.rga import RGA_TAGS, parse_rga_csv_rows
+from amo.io.sinks.spool import SpooledSink
+
+Range = Tuple[int, int]
+
+
+@dataclass
+class _Chunk:
+    path: str
+    start: int
+    end: int
+    fieldnames: List[str]
+    t_end_ns: int      # timestamp of the file's last byte (see _assign_ends)
+    size: int
+
+
+def _header(path: pathlib.Path) -> Tuple[List[str], int]:
+    with open(path, "rb") as f:
+        line = f.readline()
+    return next(csv.reader([line.decode("utf-8-sig")]), []), len(line)
+
+
+def _split(path: pathlib.Path, start: int, size: int, chunk_bytes: int) -> List[Range]:
+    """Byte ranges of ~chunk_bytes, each ending just after a newline."""
+    ranges: List[Range] = []
+    with open(path, "rb") as f:
+        pos = start
+        while pos < size:
+            f.seek(min(pos + chunk_bytes, size))
+            f.readline()
+            end = min(f.tell(), size)
+            ranges.append((pos, end))
+            pos = end
+    return ranges
+
+
+def _parse_chunk(c: _Chunk) -> Tuple[str, Range, Dict[str, np.ndarray], np.ndarray]:
+    """Worker: parse one byte range into field columns and per-row timestamps."""
+    with open(c.path, "rb") as f:
+        f.seek(c.start)
+        data = f.read(c.end - c.start)
+    lines = data.split(b"\n")
+    starts = np.cumsum([0] + [len(ln) + 1 for ln in lines[:-1]]) + c.start
+    keep = [i for i, ln in enumerate(lines) if ln.strip()]
+    rows = list(csv.reader(lines[i].decode("utf-8", "replace") for i in keep))
+    cols = parse_rga_csv_rows(rows, c.fieldnames)
+    # deterministic, unique stamps: rows closer to EOF are closer to t_end_ns
+    ts = c.t_end_ns - (c.size - starts[keep]).astype(np.int64)
+    return c.path, (c.start, c.end), cols, ts
+
+
+class Manifest:
+    """
+    Which byte ranges of which files are already written.
+
+    Stored as JSON next to the data ({name: {size, mtime_ns, t_end_ns,
+    done: [[a, b], ...]}}) and replaced atomically; a file whose size or
+    mtime changed starts over.
+    """
+
+    def __init__(self, path: Optional[pathlib.Path]):
+        self.path = path
+        self.files: Dict[str, Dict[str, Any]] = {}
+        if path is not None and path.exists():
+            self.files = json.loads(path.read_text())
+
+    def entry(self, p: pathlib.Path, st: os.stat_result) -> Dict[str, Any]:
+        e = self.files.get(p.name)
+        if e is None or e["size"] != st.st_size or e["mtime_ns"] != st.st_mtime_ns:
+            e = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "done": []}
+            self.files[p.name] = e
+        return e
+
+    def mark(self, name: str, r: Range) -> None:
+        done = sorted(self.files[name]["done"] + [list(r)])
+        merged: List[List[int]] = []
+        for a, b in done:
+            if merged and a <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], b)
+            else:
+                merged.append([a, b])
+        self.files[name]["done"] = merged
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps(self.files))
+        os.replace(tmp, self.path)
+
+
+def _todo(ranges: List[Range], done: List[List[int]]) -> Iterator[Range]:
+    for a, b in ranges:
+        if not any(x <= a and b <= y for x, y in done):
+            yield a, b
+
+
+def _assign_ends(files: List[Tuple[pathlib.Path, os.stat_result, Dict[str, Any]]]) -> None:
+    """
+    Timestamp of each file's last byte (entry['t_end_ns']), kept in the manifest.
+
+    Normally the file mtime. Files sharing an mtime are laid end to end
+    before it, in name order, so their byte-offset stamps never collide.
+    A file added to such a group later goes before the ones already stamped.
+    """
+    groups: Dict[int, List[Tuple[pathlib.Path, os.stat_result, Dict[str, Any]]]] = {}
+    for f in files:
+        groups.setdefault(f[1].st_mtime_ns, []).append(f)
+    for mtime, group in groups.items():
+        end = min([mtime] + [e["t_end_ns"] - st.st_size for _, st, e in group if "t_end_ns" in e])
+        for p, st, e in sorted(group, key=lambda f: f[0].name, reverse=True):
+            if "t_end_ns" not in e:
+                e["t_end_ns"] = end
+                end -= st.st_size
+
+
+def _merge(parts: List[Tuple[Dict[str, np.ndarray], np.ndarray]]) -> Tuple[Dict[str, np.ndarray], np.ndarray]:
+    names = sorted({k for cols, _ in parts for k in cols})
+    ts = np.concatenate([t for _, t in parts])
+    out = {}
+    for k in names:
+        out[k] = np.concatenate([cols[k] if k in cols else np.full(len(t), np.nan) for cols, t in parts])
+    return out, ts
+
+
+def _bounded_map(pool: ProcessPoolExecutor, chunks: List[_Chunk], window: int) -> Iterator[Any]:
+    """pool.map(_parse_chunk, chunks) in order, with at most `window` chunks submitted ahead."""
+    inflight: Deque[Future] = deque()
+    for c in chunks:
+        inflight.append(pool.submit(_parse_chunk, c))
+        if len(inflight) >= window:
+            yield inflight.popleft().result()
+    while inflight:
+        yield inflight.popleft().result()
+
+
+def backfill_rga_folder(folder: str, sink: Any, *, workers: Optional[int] = None,
+                        manifest: str | pathlib.Path | None = "auto",
+                        chunk_bytes: int = 8 << 20, batch_lines: int = 200_000,
+                        flush_timeout: float = 60.0) -> Dict[str, int]:
+    """
+    Bulk-load every *.csv in folder.
+
+    Files are cut into newline-aligned byte ranges parsed in a process pool
+    (workers=1 parses inline); columns are merged across ranges into
+    batches of about batch_lines lines, each written in one call with the
+    live stream's tags. At most two chunks per worker are in flight, so a
+    slow sink holds back parsing instead of piling up parsed rows. Row
+    timestamps are derived from the file mtime and the row's byte offset
+    (see _assign_ends for files with equal mtimes), so re-sent rows
+    overwrite rather than duplicate. After each write the covered ranges are
+    recorded in the manifest (default: <folder>/.rga_backfill.json; None
+    disables), so an interrupted backfill resumes where it stopped. A
+    SpooledSink has the rows on disk once written; other sinks are flushed
+    first, and a flush that takes longer than flush_timeout raises
+    TimeoutError without recording the batch.
+    """
+    root = pathlib.Path(folder)
+    man = Manifest(root / ".rga_backfill.json" if manifest == "auto" else
+                   (pathlib.Path(manifest) if manifest is not None else None))
+    files = []
+    for p in sorted(root.glob("*.csv")):
+        st = p.stat()
+        files.append((p, st, man.entry(p, st)))
+    _assign_ends(files)
+    chunks: List[_Chunk] = []
+    for p, st, entry in files:
+        fieldnames, hdr_len = _header(p)
+        for a, b in _todo(_split(p, hdr_len, st.st_size, chunk_bytes), entry["done"]):
+            chunks.append(_Chunk(str(p), a, b, fieldnames, entry["t_end_ns"], st.st_size))
+
+    stats = {"files": len({c.path for c in chunks}), "chunks": len(chunks), "lines": 0, "writes": 0}
+    pending: List[Tuple[Dict[str, np.ndarray], np.ndarray]] = []
+    pending_ranges: List[Tuple[str, Range]] = []
+    n_pending = 0
+
+    def flush() -> None:
+        nonlocal n_pending
+        if pending:
+            cols, ts = _merge(pending)
+            if cols and len(ts):
+                sink.write_columns("rga", cols, ts, RGA_TAGS)
+                stats["writes"] += 1
+            stats["lines"] += len(ts)
+            if hasattr(sink, "flush") and not isinstance(sink, SpooledSink):
+                if sink.flush(flush_timeout) is False:
+                    raise TimeoutError(f"sink did not flush within {flush_timeout:g} s")
+        for name, r in pending_ranges:
+            man.mark(name, r)
+        man.save()
+        pending.clear()
+        pending_ranges.clear()
+        n_pending = 0
+
+    pool = None
+    if workers == 1 or len(chunks) <= 1:
+        results: Iterator[Tuple[str, Range, Dict[str, np.ndarray], np.ndarray]] = map(_parse_chunk, chunks)
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        results = _bounded_map(pool, chunks, 2 * (workers or os.cpu_count() or 1))
+    try:
+        for path, r, cols, ts in results:
+            pending.append((cols, ts))
+            pending_ranges.append((pathlib.Path(path).name, r))
+            n_pending += len(ts)
+            if n_pending >= batch_lines:
+                flush()
+        flush()
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+    return stats
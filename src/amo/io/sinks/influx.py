@@ -1,14 +1,75 @@
-from influxdb_client import InfluxDBClient, Point
+from influxdb_client import InfluxDBClient
 from influxdb_client.client.write_api import SYNCHRONOUS, WriteOptions
 from contextlib import AbstractContextManager
-from typing import Mapping, Optional
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+import collections
+import threading
 import time
 
+import numpy as np
+
+def _esc_measurement(s: str) -> str:
+    return s.replace("\\", "\\\\").replace(",", "\\,").replace(" ", "\\ ")
+
+def _esc_key(s: str) -> str:
+    return _esc_measurement(s).replace("=", "\\=")
+
+def encode_columns(measurement: str, fields: Mapping[str, Sequence[float]],
+                   timestamps_ns: Sequence[int], tags: Optional[Mapping[str, str]] = None) -> bytes:
+    """
+    Serialize columnar samples straight to line protocol (one line per timestamp).
+
+    fields maps field name -> array of floats aligned with timestamps_ns.
+    NaN and ±inf entries (not valid line protocol) are left out of their
+    line; lines with no fields are dropped. Tags with an empty or None value
+    are skipped, as InfluxDB has no empty tag values.
+    """
+    ts = [str(int(t)) for t in np.asarray(timestamps_ns, dtype=np.int64).tolist()]
+    prefix = _esc_measurement(measurement)
+    if tags:
+        prefix += "".join(f",{_esc_key(k)}={_esc_key(str(v))}" for k, v in sorted(tags.items())
+                          if v is not None and str(v) != "")
+    prefix += " "
+    cols: List[List[str]] = []
+    masks: List[np.ndarray] = []
+    for k, v in fields.items():
+        arr = np.asarray(v, dtype=float)
+        if arr.shape != (len(ts),):
+            raise ValueError(f"field '{k}' has shape {arr.shape}, expected ({len(ts)},)")
+        key = _esc_key(k) + "="
+        cols.append([key + r for r in map(repr, arr.tolist())])
+        masks.append(~np.isfinite(arr))
+    if not cols:
+        return b""
+    if not any(m.any() for m in masks):
+        lines = [prefix + ",".join(row) + " " + t for row, t in zip(zip(*cols), ts)]
+    else:
+        keep = [~m for m in masks]
+        lines = []
+        for i, t in enumerate(ts):
+            row = [c[i] for c, k in zip(cols, keep) if k[i]]
+            if row:
+                lines.append(prefix + ",".join(row) + " " + t)
+    return ("\n".join(lines) + "\n").encode() if lines else b""
+
+
 class InfluxSink(AbstractContextManager):
-    """Reusable context manager for writing points to InfluxDB."""
+    """
+    Reusable context manager for writing points to InfluxDB.
+
+    Writes are encoded to line protocol directly. With background=True they
+    go through a bounded queue (queue_max batches) drained by a flusher
+    thread that coalesces up to max_batch_lines per request; when the queue
+    is full, overflow="block" waits and overflow="drop_oldest" discards the
+    oldest queued batch. stats() reports throughput and queue depth.
+    """
     def __init__(self, url: str, token: str, org: str, bucket: str,
                  synchronous: bool = True, batch_size: int = 5000,
-                 flush_interval_ms: int = 1000):
+                 flush_interval_ms: int = 1000, *, background: bool = False,
+                 queue_max: int = 256, overflow: str = "block",
+                 max_batch_lines: int = 50_000):
+        if overflow not in ("block", "drop_oldest"):
+            raise ValueError(f"overflow must be 'block' or 'drop_oldest', got {overflow!r}")
         self._client = InfluxDBClient(url=url, token=token, org=org)
         wo = SYNCHRONOUS if synchronous else WriteOptions(
             batch_size=batch_size, flush_interval=flush_interval_ms,
@@ -17,20 +78,137 @@ class InfluxSink(AbstractContextManager):
         self._write = self._client.write_api(write_options=wo)
         self._org, self._bucket = org, bucket
 
+        self._overflow = overflow
+        self._queue_max = int(queue_max)
+        self._max_batch_lines = int(max_batch_lines)
+        self._q: "collections.deque[tuple[bytes, int]]" = collections.deque()
+        self._cv = threading.Condition()
+        self._closing = False
+        self._busy = False
+        self._t0 = time.monotonic()
+        self._stats: Dict[str, Any] = {
+            "lines_enqueued": 0, "lines_sent": 0, "bytes_sent": 0, "batches_sent": 0,
+            "lines_dropped": 0, "lines_failed": 0, "send_errors": 0, "queue_depth_max": 0, "send_s": 0.0,
+            "last_error": None,
+        }
+        self._flusher: Optional[threading.Thread] = None
+        if background:
+            self._flusher = threading.Thread(target=self._flush_loop, name="influx-flusher", daemon=True)
+            self._flusher.start()
+
+    # -- encoding entry points -------------------------------------------
     def write(self, measurement: str, fields: Mapping[str, float],
               tags: Optional[Mapping[str, str]] = None,
               timestamp_ns: Optional[int] = None):
-        p = Point(measurement)
-        if tags:
-            for k, v in tags.items():
-                p = p.tag(k, v)
-        for k, v in fields.items():
-            p = p.field(k, float(v))
-        p = p.time(timestamp_ns or time.time_ns())
-        self._write.write(bucket=self._bucket, org=self._org, record=p)
+        self.write_columns(measurement, {k: [float(v)] for k, v in fields.items()},
+                           [timestamp_ns or time.time_ns()], tags)
+
+    def write_columns(self, measurement: str, fields: Mapping[str, Sequence[float]],
+                      timestamps_ns: Optional[Sequence[int]] = None,
+                      tags: Optional[Mapping[str, str]] = None) -> int:
+        """Write aligned field arrays; returns the number of lines produced."""
+        if timestamps_ns is None:
+            n = len(next(iter(fields.values()))) if fields else 0
+            timestamps_ns = np.full(n, time.time_ns(), dtype=np.int64)
+        data = encode_columns(measurement, fields, timestamps_ns, tags)
+        if not data:
+            return 0
+        n = data.count(b"\n")
+        self.submit_lines(data, n)
+        return n
+
+    def submit_lines(self, data: bytes, n_lines: Optional[int] = None) -> None:
+        """Queue encoded line protocol (or send it now without a flusher)."""
+        n = data.count(b"\n") if n_lines is None else n_lines
+        if self._flusher is None:
+            self._stats["lines_enqueued"] += n
+            self._send(data, n)
+            return
+        with self._cv:
+            if self._closing:
+                raise RuntimeError("InfluxSink is closed")
+            while len(self._q) >= self._queue_max:
+                if self._overflow == "drop_oldest":
+                    _, dropped = self._q.popleft()
+                    self._stats["lines_dropped"] += dropped
+                else:
+                    self._cv.wait()
+            self._q.append((data, n))
+            self._stats["lines_enqueued"] += n
+            self._stats["queue_depth_max"] = max(self._stats["queue_depth_max"], len(self._q))
+            self._cv.notify_all()
+
+    # -- network ----------------------------------------------------------
+    def send_lines(self, data: bytes) -> None:
+        """POST line protocol synchronously; raises on failure."""
+        self._write.write(bucket=self._bucket, org=self._org, record=data)
+
+    def _send(self, data: bytes, n: int) -> bool:
+        t = time.monotonic()
+        try:
+            self.send_lines(data)
+        except Exception as e:
+            self._stats["send_errors"] += 1
+            self._stats["lines_failed"] += n
+            self._stats["last_error"] = repr(e)
+            if self._flusher is None:
+                raise
+            return False
+        finally:
+            self._stats["send_s"] += time.monotonic() - t
+        self._stats["lines_sent"] += n
+        self._stats["bytes_sent"] += len(data)
+        self._stats["batches_sent"] += 1
+        return True
+
+    def _flush_loop(self) -> None:
+        while True:
+            with self._cv:
+                while not self._q and not self._closing:
+                    self._cv.wait()
+                if not self._q:
+                    return
+                parts, n = [], 0
+                while self._q and (n == 0 or n + self._q[0][1] <= self._max_batch_lines):
+                    data, k = self._q.popleft()
+                    parts.append(data)
+                    n += k
+                self._busy = True
+                self._cv.notify_all()
+            try:
+                self._send(b"".join(parts), n)
+            finally:
+                with self._cv:
+                    self._busy = False
+                    self._cv.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until queued batches have been sent (or failed)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cv:
+            while self._q or self._busy:
+                left = None if deadline is None else deadline - time.monotonic()
+                if left is not None and left <= 0:
+                    return False
+                self._cv.wait(left)
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cv:
+            s = dict(self._stats)
+            s["queue_depth"] = len(self._q)
+        elapsed = max(time.monotonic() - self._t0, 1e-9)
+        s["lines_per_s"] = s["lines_sent"] / elapsed
+        s["send_lines_per_s"] = s["lines_sent"] / s["send_s"] if s["send_s"] > 0 else 0.0
+        return s
 
     def close(self):
         try:
+            if self._flusher is not None:
+                with self._cv:
+                    self._closing = True
+                    self._cv.notify_all()
+                self._flusher.join()
             self._write.flush()
         finally:
             self._client.close()
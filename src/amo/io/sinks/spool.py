@@ -0,0 +1,308 @@
+import json
+import os
+import pathlib
+import struct
+import threading
+import time
+import zlib
+from contextlib import AbstractContextManager
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from amo.io.sinks.influx import InfluxSink, encode_columns
+
+_HDR = struct.Struct("<II")  # payload length, crc32(payload)
+_SEG_PREFIX, _SEG_SUFFIX = "seg-", ".lp"
+
+Offset = Tuple[int, int]  # (segment number, byte position)
+
+# Statuses for a batch the server will never take as sent (bad line protocol,
+# too large, outside retention); every other error is retried.
+_REJECTED = frozenset({400, 413, 422})
+
+
+class Spool:
+    """
+    Append-only, segmented on-disk queue of line-protocol batches.
+
+    Each record is [len u32][crc32 u32][payload]; a torn or corrupt record at
+    the tail (crash mid-append) is ignored on read and truncated on reopen.
+    The consumer offset lives in offset.json, replaced atomically after each
+    commit, so a crash replays at most the last uncommitted batch.
+
+    Segments roll at segment_bytes. When the spool exceeds max_bytes the
+    oldest segments are deleted (counted in dropped_bytes) so an endless
+    outage cannot fill the disk.
+    """
+
+    def __init__(self, root: str | pathlib.Path, *, segment_bytes: int = 64 << 20,
+                 max_bytes: int = 2 << 30, fsync: bool = False):
+        self.root = pathlib.Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.segment_bytes = int(segment_bytes)
+        self.max_bytes = int(max_bytes)
+        self.fsync = fsync
+        self.dropped_bytes = 0
+        self._lock = threading.Lock()
+        self._offset = self._load_offset()
+        segs = self._segments()
+        self._head = segs[-1] if segs else self._offset[0]
+        self._recover_tail(self._head)
+        self._fh = open(self._seg_path(self._head), "ab")
+        self._sizes = {n: self._seg_path(n).stat().st_size for n in self._segments()}
+
+    # -- layout -------------------------------------------------------------
+    def _seg_path(self, n: int) -> pathlib.Path:
+        return self.root / f"{_SEG_PREFIX}{n:012d}{_SEG_SUFFIX}"
+
+    def _segments(self) -> List[int]:
+        return sorted(int(p.name[len(_SEG_PREFIX):-len(_SEG_SUFFIX)])
+                      for p in self.root.glob(f"{_SEG_PREFIX}*{_SEG_SUFFIX}"))
+
+    def _load_offset(self) -> Offset:
+        p = self.root / "offset.json"
+        if p.exists():
+            d = json.loads(p.read_text())
+            return int(d["segment"]), int(d["pos"])
+        segs = self._segments()
+        return (segs[0] if segs else 0), 0
+
+    def _store_offset(self, off: Offset) -> None:
+        tmp = self.root / "offset.json.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"segment": off[0], "pos": off[1]}, f)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        os.replace(tmp, self.root / "offset.json")
+
+    def _recover_tail(self, n: int) -> None:
+        p = self._seg_path(n)
+        if not p.exists():
+            return
+        good = 0
+        with open(p, "rb") as f:
+            for pos, _ in _records(f, 0):
+                good = pos
+        if good != p.stat().st_size:
+            with open(p, "r+b") as f:
+                f.truncate(good)
+
+    # -- producer -----------------------------------------------------------
+    def append(self, payload: bytes) -> None:
+        if not payload:
+            return
+        rec = _HDR.pack(len(payload), zlib.crc32(payload)) + payload
+        with self._lock:
+            if self._sizes.get(self._head, 0) and self._sizes[self._head] + len(rec) > self.segment_bytes:
+                self._fh.close()
+                self._head += 1
+                self._fh = open(self._seg_path(self._head), "ab")
+            self._fh.write(rec)
+            self._fh.flush()
+            if self.fsync:
+                os.fsync(self._fh.fileno())
+            self._sizes[self._head] = self._sizes.get(self._head, 0) + len(rec)
+            self._enforce_cap()
+
+    def _enforce_cap(self) -> None:
+        while sum(self._sizes.values()) > self.max_bytes and len(self._sizes) > 1:
+            oldest = min(self._sizes)
+            size = self._sizes.pop(oldest)
+            seg, pos = self._offset
+            if seg <= oldest:
+                self.dropped_bytes += size - (pos if seg == oldest else 0)
+                self._offset = (oldest + 1, 0)
+                self._store_offset(self._offset)
+            self._seg_path(oldest).unlink(missing_ok=True)
+
+    # -- consumer -----------------------------------------------------------
+    def pending_bytes(self) -> int:
+        with self._lock:
+            seg, pos = self._offset
+            return sum(s for n, s in self._sizes.items() if n >= seg) - pos
+
+    def read_batch(self, max_bytes: int = 8 << 20) -> Tuple[bytes, Offset]:
+        """
+        Concatenated payloads from the committed offset, and the offset after them.
+
+        Reads run outside the lock; a segment the size cap deleted in the
+        meantime is skipped (its bytes are already counted as dropped).
+        """
+        with self._lock:
+            seg, pos = self._offset
+            head = self._head
+        parts: List[bytes] = []
+        total = 0
+        while seg <= head:
+            try:
+                f = open(self._seg_path(seg), "rb")
+            except FileNotFoundError:
+                f = None
+            if f is not None:
+                with f:
+                    for end, payload in _records(f, pos):
+                        if parts and total + len(payload) > max_bytes:
+                            return b"".join(parts), (seg, pos)
+                        parts.append(payload)
+                        total += len(payload)
+                        pos = end
+            if seg == head:
+                break
+            seg, pos = seg + 1, 0
+        return b"".join(parts), (seg, pos)
+
+    def commit(self, off: Offset) -> None:
+        """Mark everything before off as delivered; drop finished segments."""
+        with self._lock:
+            if off <= self._offset:
+                return
+            self._offset = off
+            self._store_offset(off)
+            for n in [n for n in self._sizes if n < off[0]]:
+                del self._sizes[n]
+                self._seg_path(n).unlink(missing_ok=True)
+
+    def quarantine(self, payload: bytes, reason: str) -> None:
+        """Append an undeliverable batch to rejected.lp, after a '#' comment line saying why."""
+        note = " ".join(f"# {time.time_ns()} {reason}".splitlines()).encode() + b"\n"
+        with self._lock, open(self.root / "rejected.lp", "ab") as f:
+            f.write(note + payload)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+
+    def close(self) -> None:
+        with self._lock:
+            self._fh.close()
+
+
+def _records(f, pos: int):
+    """Yield (end_pos, payload) for complete, valid records starting at pos."""
+    f.seek(pos)
+    while True:
+        hdr = f.read(_HDR.size)
+        if len(hdr) < _HDR.size:
+            return
+        n, crc = _HDR.unpack(hdr)
+        payload = f.read(n)
+        if len(payload) < n or zlib.crc32(payload) != crc:
+            return
+        pos += _HDR.size + n
+        yield pos, payload
+
+
+class SpooledSink(AbstractContextManager):
+    """
+    InfluxSink front end that never waits on the network.
+
+    write()/write_columns() only append to a local Spool; a replayer thread
+    drains it through sink.send_lines() in batches of up to max_batch_bytes,
+    committing the offset after each accepted batch and backing off
+    (up to max_backoff_s) while the endpoint is down. A batch the server
+    rejects outright (HTTP 400/413/422, e.g. bad line protocol) is moved to
+    the spool's rejected.lp and counted in batches_rejected instead of
+    blocking everything behind it. Spool errors (e.g. a full disk) are
+    counted in spool_errors and backed off like send errors, so the replayer
+    never dies.
+    """
+
+    def __init__(self, sink: InfluxSink, spool_dir: str | pathlib.Path, *,
+                 max_batch_bytes: int = 8 << 20, max_backoff_s: float = 5.0, **spool_kw: Any):
+        self.sink = sink
+        self.spool = Spool(spool_dir, **spool_kw)
+        self.max_batch_bytes = int(max_batch_bytes)
+        self.max_backoff_s = float(max_backoff_s)
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._stats: Dict[str, Any] = {"batches_sent": 0, "bytes_sent": 0, "send_errors": 0,
+                                       "batches_rejected": 0, "bytes_rejected": 0,
+                                       "spool_errors": 0, "last_error": None}
+        self._thread = threading.Thread(target=self._replay, name="spool-replayer", daemon=True)
+        self._thread.start()
+
+    def write(self, measurement: str, fields: Mapping[str, float],
+              tags: Optional[Mapping[str, str]] = None, timestamp_ns: Optional[int] = None):
+        self.write_columns(measurement, {k: [float(v)] for k, v in fields.items()},
+                           [timestamp_ns or time.time_ns()], tags)
+
+    def write_columns(self, measurement: str, fields: Mapping[str, Sequence[float]],
+                      timestamps_ns: Optional[Sequence[int]] = None,
+                      tags: Optional[Mapping[str, str]] = None) -> int:
+        if timestamps_ns is None:
+            n = len(next(iter(fields.values()))) if fields else 0
+            timestamps_ns = np.full(n, time.time_ns(), dtype=np.int64)
+        data = encode_columns(measurement, fields, timestamps_ns, tags)
+        self.submit_lines(data)
+        return data.count(b"\n")
+
+    def submit_lines(self, data: bytes, n_lines: Optional[int] = None) -> None:
+        self.spool.append(data)
+        self._wake.set()
+
+    def _replay(self) -> None:
+        backoff = 0.05
+        while not self._stop.is_set():
+            stage = "spool_errors"
+            try:
+                data, off = self.spool.read_batch(self.max_batch_bytes)
+                if not data:
+                    self._wake.wait(0.5)
+                    self._wake.clear()
+                    continue
+                stage = "send_errors"
+                rejected = None
+                try:
+                    self.sink.send_lines(data)
+                except Exception as e:
+                    if getattr(e, "status", None) not in _REJECTED:
+                        raise
+                    rejected = e
+                stage = "spool_errors"
+                if rejected is not None:
+                    self.spool.quarantine(data, f"HTTP {rejected.status}: {rejected!r}")
+                self.spool.commit(off)
+            except Exception as e:
+                self._stats[stage] += 1
+                self._stats["last_error"] = repr(e)
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, self.max_backoff_s)
+                continue
+            backoff = 0.05
+            if rejected is not None:
+                self._stats["batches_rejected"] += 1
+                self._stats["bytes_rejected"] += len(data)
+                self._stats["last_error"] = repr(rejected)
+            else:
+                self._stats["batches_sent"] += 1
+                self._stats["bytes_sent"] += len(data)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until the spool is drained (False on timeout)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.spool.pending_bytes() > 0:
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            self._wake.set()
+            time.sleep(0.01)
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        s = dict(self._stats)
+        s["pending_bytes"] = self.spool.pending_bytes()
+        s["dropped_bytes"] = self.spool.dropped_bytes
+        return s
+
+    def close(self, drain_timeout: float = 5.0):
+        try:
+            self.flush(drain_timeout)
+        finally:
+            self._stop.set()
+            self._wake.set()
+            self._thread.join()
+            self.spool.close()
+            self.sink.close()
+
+    def __exit__(self, *exc):
+        self.close()
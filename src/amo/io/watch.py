@@ -0,0 +1,99 @@
+import ctypes
+import ctypes.util
+import os
+import pathlib
+import select
+import struct
+import time
+from typing import Optional
+
+# inotify(7) constants
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len
+
+_libc = None
+
+def _inotify_libc():
+    global _libc
+    if _libc is None:
+        name = ctypes.util.find_library("c")
+        lib = ctypes.CDLL(name, use_errno=True) if name else None
+        _libc = lib if lib is not None and hasattr(lib, "inotify_init1") else False
+    return _libc or None
+
+
+class FileWatcher:
+    """
+    Wait for changes to one file.
+
+    On Linux this blocks on inotify for the file's directory (so rotation,
+    i.e. a new file moved or created under the same name, is seen too) and
+    costs no CPU while idle. Elsewhere, or with use_inotify=False, wait()
+    just sleeps poll_s and reports a possible change.
+    """
+
+    def __init__(self, path: str | pathlib.Path, poll_s: float = 1.0, use_inotify: bool = True):
+        self.path = pathlib.Path(path)
+        self.poll_s = poll_s
+        self._fd: Optional[int] = None
+        libc = _inotify_libc() if use_inotify else None
+        if libc is not None:
+            fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+            if fd >= 0:
+                mask = IN_MODIFY | IN_CLOSE_WRITE | IN_CREATE | IN_MOVED_TO | IN_MOVED_FROM | IN_DELETE
+                parent = str(self.path.parent.resolve()).encode()
+                if libc.inotify_add_watch(fd, parent, mask) >= 0:
+                    self._fd = fd
+                else:
+                    os.close(fd)
+
+    @property
+    def uses_inotify(self) -> bool:
+        return self._fd is not None
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the file may have changed; False on timeout."""
+        if self._fd is None:
+            time.sleep(self.poll_s if timeout is None else min(self.poll_s, timeout))
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        name = self.path.name.encode()
+        while True:
+            left = None if deadline is None else max(0.0, deadline - time.monotonic())
+            ready, _, _ = select.select([self._fd], [], [], left)
+            if not ready:
+                return False
+            if self._drain(name):
+                return True
+
+    def _drain(self, name: bytes) -> bool:
+        hit = False
+        while True:
+            try:
+                buf = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                return hit
+            pos = 0
+            while pos + _EVENT.size <= len(buf):
+                _, _, _, n = _EVENT.unpack_from(buf, pos)
+                ev_name = buf[pos + _EVENT.size:pos + _EVENT.size + n].rstrip(b"\0")
+                hit = hit or ev_name == name
+                pos += _EVENT.size + n
+
+    def close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self) -> "FileWatcher":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -18,6 +18,24 @@ def jones_polarizer(theta_deg: float) -> np.ndarray:
     P = np.array([[1.0, 0.0], [0.0, 0.0]], dtype=complex)
     return R @ P @ Rm
 
+def jones_waveplate_many(theta_deg, retard_deg) -> np.ndarray:
+    """jones_waveplate() broadcast over arrays; R @ diag(1, e^{i phi}) @ R^T written out."""
+    t = np.deg2rad(np.asarray(theta_deg, dtype=float))
+    e = np.exp(1j * np.deg2rad(np.asarray(retard_deg, dtype=float)))
+    c, s = np.cos(t), np.sin(t)
+    cs = c * s * (1.0 - e)
+    J = np.empty(np.broadcast(t, e).shape + (2, 2), dtype=complex)
+    J[..., 0, 0] = c**2 + e * s**2
+    J[..., 0, 1] = cs
+    J[..., 1, 0] = cs
+    J[..., 1, 1] = s**2 + e * c**2
+    return J
+
+def jones_polarizer_many(theta_deg) -> np.ndarray:
+    t = np.deg2rad(np.asarray(theta_deg, dtype=float))
+    a = np.stack([np.cos(t), np.sin(t)], axis=-1).astype(complex)
+    return a[..., :, None] * a[..., None, :]
+
 def apply_chain(jones_chain, E0: np.ndarray) -> np.ndarray:
     E = E0.astype(complex)
     for J in jones_chain:
@@ -32,6 +50,13 @@ def stokes(E: np.ndarray) -> np.ndarray:
     S3 = (-2 * np.imag(Ex * np.conj(Ey))).real
     return np.array([S0, S1, S2, S3], dtype=float)
 
+def stokes_many(E: np.ndarray) -> np.ndarray:
+    """Stokes vectors for a stack of Jones vectors, shape (..., 2) -> (..., 4)."""
+    Ex, Ey = E[..., 0], E[..., 1]
+    Ix, Iy = np.abs(Ex)**2, np.abs(Ey)**2
+    C = Ex * np.conj(Ey)
+    return np.stack([Ix + Iy, Ix - Iy, 2 * C.real, -2 * C.imag], axis=-1)
+
 def trace_stokes(nodes, E0: np.ndarray):
     out, E = [], E0.astype(complex)
     for i, n in enumerate(nodes):
@@ -1,7 +1,9 @@
 from __future__ import annotations
+from dataclasses import dataclass
 from typing import Dict, Any, List
 import numpy as np
-from amo.optics.polarimetry import jones_waveplate, jones_polarizer, stokes
+from amo.optics.polarimetry import (jones_waveplate, jones_polarizer, stokes, stokes_many,
+                                   jones_waveplate_many, jones_polarizer_many)
 from amo.devices.optics import PBS
 
 def run_chain(nodes: List[Dict[str, Any]], E0: np.ndarray, cli_branch: str | None = None) -> List[Dict[str, Any]]:
@@ -33,3 +35,107 @@ def run_chain(nodes: List[Dict[str, Any]], E0: np.ndarray, cli_branch: str | Non
         else:
             raise ValueError(f"Unknown node type: {t}")
     return out
+
+@dataclass(frozen=True)
+class ChainTree:
+    """
+    Every PBS branch of a chain, evaluated in one pass.
+    branches: leaf labels, one 'T'/'R' per PBS in chain order ('' if no PBS)
+    S:        (L,4) Stokes vector of each leaf after the last node
+    pbs_nodes: node index of each PBS, i.e. label position -> node
+    """
+    branches: List[str]
+    S: np.ndarray
+    pbs_nodes: List[int]
+
+    @property
+    def power(self) -> np.ndarray:
+        return self.S[:, 0]
+
+    def leaves(self) -> List[Dict[str, Any]]:
+        return [{"branch": b, "P": float(S[0]), "S": S.tolist()}
+                for b, S in zip(self.branches, self.S)]
+
+    def as_tree(self) -> Dict[str, Any]:
+        """Nested {'node', 'P', 'T', 'R'} dicts down to the leaf records."""
+        leaves = {lf["branch"]: lf for lf in self.leaves()}
+
+        def build(prefix: str) -> Dict[str, Any]:
+            depth = len(prefix)
+            if depth == len(self.pbs_nodes):
+                return leaves[prefix]
+            T, R = build(prefix + "T"), build(prefix + "R")
+            return {"node": self.pbs_nodes[depth], "P": T["P"] + R["P"], "T": T, "R": R}
+
+        return build("")
+
+def run_chain_tree(nodes: List[Dict[str, Any]], E0: np.ndarray) -> ChainTree:
+    """
+    Follow both ports of every PBS (any 'branch' in the JSON is ignored).
+    Leaves are kept as one (L,2) Jones stack, so each node is a single matmul
+    shared by all branches below it; a PBS doubles the stack.
+    """
+    E = E0.astype(complex)[None, :]
+    branches = [""]
+    pbs_nodes: List[int] = []
+    for i, n in enumerate(nodes):
+        t = n["type"]
+        if t == "waveplate":
+            E = E @ jones_waveplate(n["theta"], n["retard"]).T
+        elif t == "polarizer":
+            E = E @ jones_polarizer(n["theta"]).T
+        elif t == "pbs":
+            JT, JR = PBS(theta_deg=n.get("theta", 0.0)).jones()
+            E = np.concatenate([E @ JT.T, E @ JR.T])
+            branches = [b + "T" for b in branches] + [b + "R" for b in branches]
+            pbs_nodes.append(i)
+        else:
+            raise ValueError(f"Unknown node type: {t}")
+    return ChainTree(branches=branches, S=stokes_many(E), pbs_nodes=pbs_nodes)
+
+def node_jones(n: Dict[str, Any], i: int, cli_branch: str | None, theta=None) -> np.ndarray:
+    """
+    Jones matrix of one node; an array `theta` gives a (F,2,2) stack.
+    A PBS uses its own 'branch', else cli_branch.
+    """
+    t = n["type"]
+    th = n.get("theta", 0.0) if theta is None else theta
+    if t == "waveplate":
+        return jones_waveplate_many(th, n["retard"])
+    if t == "polarizer":
+        return jones_polarizer_many(th)
+    if t == "pbs":
+        branch = n.get("branch") or cli_branch
+        if branch not in {"T","R"}:
+            raise ValueError(f"PBS at node {i} needs a branch ('T' or 'R'). Pass --branch T|R or set in JSON.")
+        # same projectors and +i reflection phase as devices.optics.PBS
+        if branch == "T":
+            return jones_polarizer_many(th)
+        return 1j * jones_polarizer_many(np.asarray(th, dtype=float) + 90.0)
+    raise ValueError(f"Unknown node type: {t}")
+
+def sweep_theta(nodes: List[Dict[str, Any]], E0: np.ndarray, node: int, thetas,
+                after: int = -1, cli_branch: str | None = None) -> np.ndarray:
+    """
+    Stokes vector after node `after` (-1 = last) for every theta of `node`, as (F,4).
+    Fixed nodes before the swept one fold into a single Jones vector and those
+    between it and `after` into a single 2x2, so only one (F,2,2) stack is built.
+    """
+    last = len(nodes) - 1 if after == -1 else after
+    if not (0 <= last < len(nodes)):
+        raise ValueError(f"after={after} out of range for chain length {len(nodes)}")
+    if not (0 <= node < len(nodes)):
+        raise ValueError(f"node index {node} out of range (0..{len(nodes)-1})")
+    thetas = np.asarray(thetas, dtype=float)
+
+    E = E0.astype(complex)
+    for i in range(min(node, last + 1)):
+        E = node_jones(nodes[i], i, cli_branch) @ E
+    if last < node:
+        return np.tile(stokes(E), (thetas.size, 1))
+
+    M = np.eye(2, dtype=complex)
+    for i in range(node + 1, last + 1):
+        M = node_jones(nodes[i], i, cli_branch) @ M
+    Es = node_jones(nodes[node], node, cli_branch, theta=thetas) @ E  # (F,2)
+    return stokes_many(Es @ M.T)
@@ -0,0 +1,70 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import groupby
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+from amo.run.timing import TimedOp
+
+# (op, start_ns, end_ns, ok)
+OpResult = Tuple[TimedOp, int, int, bool]
+
+
+def group_by_time(timeline: List[TimedOp]) -> Iterator[Tuple[int, List[TimedOp]]]:
+    """Consecutive ops sharing one planned time (timeline must be sorted)."""
+    for at_ns, ops in groupby(timeline, key=lambda op: op.at_ns):
+        yield at_ns, list(ops)
+
+
+class DeviceDispatcher:
+    """
+    Run a group of ops with one worker thread per device.
+
+    Ops on the same device keep their order (a device's ops run back to back
+    on its own single-thread executor); ops on different devices overlap.
+    run_group() returns only when every op finished, which acts as the
+    barrier between at_ms groups.
+    """
+
+    def __init__(self, run_op: Callable[[TimedOp], bool]):
+        self._run_op = run_op
+        self._workers: Dict[str, ThreadPoolExecutor] = {}
+
+    def _worker(self, device: str) -> ThreadPoolExecutor:
+        ex = self._workers.get(device)
+        if ex is None:
+            ex = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"dev-{device}")
+            self._workers[device] = ex
+        return ex
+
+    def run_serial(self, ops: List[TimedOp]) -> List[OpResult]:
+        out: List[OpResult] = []
+        for op in ops:
+            start = time.monotonic_ns()
+            ok = self._run_op(op)
+            out.append((op, start, time.monotonic_ns(), ok))
+        return out
+
+    def run_group(self, ops: List[TimedOp]) -> List[OpResult]:
+        by_dev: Dict[str, List[TimedOp]] = {}
+        for op in ops:
+            by_dev.setdefault(op.device or "", []).append(op)
+        if len(by_dev) == 1:
+            return self.run_serial(ops)
+        futures = [self._worker(dev).submit(self.run_serial, dev_ops) for dev, dev_ops in by_dev.items()]
+        results: List[OpResult] = []
+        for f in futures:
+            results.extend(f.result())
+        order = {id(op): i for i, op in enumerate(ops)}
+        results.sort(key=lambda r: order[id(r[0])])
+        return results
+
+    def close(self) -> None:
+        for ex in self._workers.values():
+            ex.shutdown(wait=True)
+        self._workers.clear()
+
+    def __enter__(self) -> "DeviceDispatcher":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
@@ -0,0 +1,186 @@
+import hashlib
+import json
+import os
+import pathlib
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from amo.control import interlocks
+from amo.run.runner import load_recipe, preflight
+from amo.run.timing import TimedOp, compile_timeline
+
+# Bump when the on-disk layout or compile/preflight semantics change.
+CACHE_FORMAT = 2
+
+_KIND = {"set": 0, "status": 1}
+_KIND_NAME = {v: k for k, v in _KIND.items()}
+# how op_value is stored: float64 as-is, int in the float slot, or JSON side table
+_V_FLOAT, _V_INT, _V_JSON = 0, 1, 2
+
+
+def _sha(blob: bytes) -> str:
+    return hashlib.sha256(blob).hexdigest()
+
+
+def registry_version(devices: Dict[str, Any], param_whitelist: dict | None = None) -> str:
+    wl = {k: sorted(v) if isinstance(v, (list, tuple, set)) else v for k, v in (param_whitelist or {}).items()}
+    return _sha(json.dumps([sorted(devices), wl], sort_keys=True, default=str).encode())[:16]
+
+
+def interlock_version(interlock_check) -> Optional[str]:
+    """Rules hash of an interlock, or None if it cannot be versioned (no caching)."""
+    if interlock_check is interlocks.check:
+        return "limits-" + interlocks.limits_version()
+    v = getattr(interlock_check, "version", None)
+    return str(v) if v is not None else None
+
+
+@dataclass
+class CompiledRecipe:
+    digest: str
+    steps: List[dict]
+    timeline: List[TimedOp]
+
+
+@dataclass
+class PreparedRecipe(CompiledRecipe):
+    ok: bool = True
+    issues: List[str] = field(default_factory=list)
+    cached: bool = False
+
+
+def _pack(c: CompiledRecipe, compiled: bool) -> Dict[str, np.ndarray]:
+    targets: Dict[str, int] = {}
+    objs: List[Any] = []
+    n = len(c.timeline)
+    at_ns = np.empty(n, np.int64)
+    step = np.empty(n, np.int32)
+    kind = np.empty(n, np.uint8)
+    target = np.empty(n, np.int32)
+    value = np.zeros(n, np.float64)
+    vkind = np.zeros(n, np.uint8)
+    for i, op in enumerate(c.timeline):
+        at_ns[i], step[i], kind[i] = op.at_ns, op.step, _KIND[op.kind]
+        target[i] = targets.setdefault(op.target or "", len(targets))
+        v = op.value
+        if isinstance(v, float):
+            value[i] = v
+        elif isinstance(v, int) and not isinstance(v, bool) and abs(v) < 2**53:
+            value[i], vkind[i] = v, _V_INT
+        elif op.kind == "set":
+            value[i], vkind[i] = len(objs), _V_JSON
+            objs.append(v)
+    tables = json.dumps({"digest": c.digest, "steps": c.steps, "targets": list(targets), "values": objs}).encode()
+    return {
+        "at_ns": at_ns, "step": step, "kind": kind, "target": target,
+        "value": value, "vkind": vkind, "compiled": np.array(compiled),
+        "tables": np.frombuffer(tables, np.uint8),
+    }
+
+
+def _unpack(z: Any) -> Tuple[CompiledRecipe, bool]:
+    tables = json.loads(z["tables"].tobytes())
+    targets, objs = tables["targets"], tables["values"]
+    timeline: List[TimedOp] = []
+    for at_ns, idx, kind, ti, v, vk in zip(z["at_ns"].tolist(), z["step"].tolist(), z["kind"].tolist(),
+                                           z["target"].tolist(), z["value"].tolist(), z["vkind"].tolist()):
+        t = targets[ti]
+        if _KIND_NAME[kind] == "status":
+            timeline.append(TimedOp(at_ns, idx, "status", t, target=t))
+            continue
+        val = objs[int(v)] if vk == _V_JSON else (int(v) if vk == _V_INT else v)
+        dev, _, param = t.partition(".")
+        timeline.append(TimedOp(at_ns, idx, "set", dev if param else None, param or None, val, t))
+    return CompiledRecipe(tables["digest"], tables["steps"], timeline), bool(z["compiled"])
+
+
+def _json_exact(steps: Any) -> bool:
+    """True if steps survive a JSON round trip unchanged (YAML dates, NaN, int keys do not)."""
+    try:
+        return json.loads(json.dumps(steps)) == steps
+    except (TypeError, ValueError):
+        return False
+
+
+class RecipeCache:
+    """
+    Content-addressed cache of parsed, compiled and preflighted recipes.
+
+    <root>/<sha256(recipe)>.npz holds the steps exactly as loaded (JSON) and,
+    once a preflight has passed, their compiled timeline as flat arrays (no
+    pickle); <sha>-<registry>-<interlock>.json holds the preflight result for
+    one device set and rule set. Interlocks that expose no version (plain
+    callables other than interlocks.check) are always re-checked. Recipes
+    that do not survive a JSON round trip are not cached.
+    """
+
+    def __init__(self, root: str | pathlib.Path = ".amo_cache/recipes"):
+        self.root = pathlib.Path(root)
+
+    def _write(self, path: pathlib.Path, write) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            write(f)
+        os.replace(tmp, path)
+
+    def _load(self, path: str) -> Tuple[CompiledRecipe, bool, bool]:
+        """(recipe, hit, compiled) for the file at path; the timeline is empty until compiled."""
+        raw = pathlib.Path(path).read_bytes()
+        digest = _sha(raw + f"|fmt{CACHE_FORMAT}".encode())
+        entry = self.root / f"{digest}.npz"
+        if entry.exists():
+            try:
+                with np.load(entry, allow_pickle=False) as z:
+                    c, compiled = _unpack(z)
+                return c, True, compiled
+            except (OSError, ValueError, KeyError):
+                pass  # corrupt entry: rebuild below
+        return CompiledRecipe(digest, load_recipe(path), []), False, False
+
+    def _store(self, c: CompiledRecipe, compiled: bool) -> None:
+        if isinstance(c.steps, list) and _json_exact(c.steps):
+            self._write(self.root / f"{c.digest}.npz", lambda f: np.savez(f, **_pack(c, compiled)))
+
+    def prepare(self, path: str, devices: Dict[str, Any], interlock_check,
+                *, param_whitelist: dict | None = None) -> PreparedRecipe:
+        c, hit, compiled = self._load(path)
+        ilk = interlock_version(interlock_check)
+        entry = None
+        res = None
+        if ilk is not None:
+            entry = self.root / f"{c.digest}-{registry_version(devices, param_whitelist)}-{ilk}.json"
+            if hit and entry.exists():
+                res = json.loads(entry.read_text())
+        if res is None:
+            ok, issues = preflight(c.steps, devices, interlock_check, param_whitelist=param_whitelist)
+            if entry is not None:
+                blob = json.dumps({"ok": ok, "issues": issues}).encode()
+                self._write(entry, lambda f: f.write(blob))
+        else:
+            ok, issues = res["ok"], res["issues"]
+        if ok and not compiled:
+            c.timeline = compile_timeline(c.steps)
+            self._store(c, True)
+        elif not hit:
+            self._store(c, False)
+        return PreparedRecipe(c.digest, c.steps, c.timeline, ok, issues, res is not None)
+
+
+def prepare_recipe(path: str, devices: Dict[str, Any], interlock_check, *,
+                   param_whitelist: dict | None = None,
+                   cache_dir: str | pathlib.Path | None = ".amo_cache/recipes") -> PreparedRecipe:
+    """
+    load_recipe + preflight + compile_timeline, served from the on-disk cache
+    when the same recipe bytes were already prepared against the same
+    devices and interlock rules. The timeline is compiled only once
+    preflight passes (empty otherwise). cache_dir=None disables caching.
+    """
+    if cache_dir is None:
+        steps = load_recipe(path)
+        ok, issues = preflight(steps, devices, interlock_check, param_whitelist=param_whitelist)
+        timeline = compile_timeline(steps) if ok else []
+        return PreparedRecipe(_sha(pathlib.Path(path).read_bytes()), steps, timeline, ok, issues)
+    return RecipeCache(cache_dir).prepare(path, devices, interlock_check, param_whitelist=param_whitelist)
@@ -3,7 +3,9 @@ import json
 import pathlib
 import yaml
 from datetime import datetime
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, Iterable, List, Tuple
+from amo.run.timing import SPIN_NS, OpTiming, TimedOp, TimingReport, compile_timeline, run_order, wait_until_ns
+from amo.run.dispatch import DeviceDispatcher, group_by_time
 
 def new_run_dir(base: str = "data") -> pathlib.Path:
     # Use microseconds to avoid collisions; no printing here—let caller handle errors.
@@ -18,9 +20,11 @@ def save_params(run_dir: pathlib.Path, params: Dict[str, Any]) -> None:
 def save_environment(run_dir: pathlib.Path, env: Dict[str, Any]) -> None:
     (run_dir / "environment.json").write_text(json.dumps(env, indent=2))
 
+_Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 def load_recipe(path: str) -> list[dict]:
     with open(path, "r") as f:
-        return yaml.safe_load(f) or []
+        return yaml.load(f, Loader=_Loader) or []
 
 def _iter_set_ops(steps: List[dict]):
     for step in steps:
@@ -28,13 +32,27 @@ def _iter_set_ops(steps: List[dict]):
         for target, value in set_ops.items():
             yield step, target, value
 
+def target_issue(target: str, device_names: set, param_whitelist: dict) -> str | None:
+    """Why a 'device.param' set target is invalid for these devices, or None if it is fine."""
+    if "." not in target:
+        return f"Invalid target '{target}'. Use device.param (e.g., laser.power)."
+    dev_name, param = target.split(".", 1)
+    if dev_name not in device_names:
+        return f"Unknown device '{dev_name}' in recipe."
+    allowed = param_whitelist.get(dev_name)
+    if isinstance(allowed, (list, tuple, set)) and param not in allowed:
+        return f"Unknown parameter '{param}' for device '{dev_name}'. Allowed: {sorted(allowed)}"
+    return None
+
 def preflight(steps: List[dict], devices: Dict[str, Any], interlock_check, *, param_whitelist: dict | None = None) -> Tuple[bool, List[str]]:
     """
     Validate before executing:
       - target format 'device.param'
       - device exists
       - param exists if we have a whitelist (from registry metadata)
-      - values respect interlock limits (for constants)
+      - values respect interlock limits (for constants), checked in the
+        order the ops will run (by at_ms); an InterlockEngine checks all
+        set-ops in one vectorized pass
       - timing fields are numeric
     """
     issues: List[str] = []
@@ -45,22 +63,40 @@ def preflight(steps: List[dict], devices: Dict[str, Any], interlock_check, *, pa
         issues.append("Recipe root must be a list of steps.")
         return False, issues
 
-    for _, target, value in _iter_set_ops(steps):
-        if "." not in target:
-            issues.append(f"Invalid target '{target}'. Use device.param (e.g., laser.power).")
-            continue
-        dev_name, param = target.split(".", 1)
-        if dev_name not in device_names:
-            issues.append(f"Unknown device '{dev_name}' in recipe.")
-            continue
-        allowed = param_whitelist.get(dev_name)
-        if isinstance(allowed, (list, tuple, set)) and param not in allowed:
-            issues.append(f"Unknown parameter '{param}' for device '{dev_name}'. Allowed: {sorted(allowed)}")
+    # rate limits and conditions depend on order: check in run order, or in
+    # recipe order when at_ms is malformed (reported below)
+    try:
+        ordered = [steps[i] for i in run_order(steps)]
+    except (TypeError, ValueError):
+        ordered = steps
+
+    # targets repeat across steps: validate each distinct one once
+    seen: Dict[str, str | None] = {}
+    keys: List[str] = []
+    values: List[Any] = []
+    for _, target, value in _iter_set_ops(ordered):
+        why = seen.get(target, "")
+        if why == "":
+            why = target_issue(target, device_names, param_whitelist)
+            seen[target] = why
+        if why is not None:
+            issues.append(why)
             continue
-        cmd = {"device": dev_name, "action": "set", "param": param, "value": value}
-        ok, why = interlock_check(cmd)
-        if not ok:
-            issues.append(f"{dev_name}.{param}={value} blocked: {why}")
+        keys.append(target)
+        values.append(value)
+
+    check_ops = getattr(interlock_check, "check_ops", None)
+    if callable(check_ops):
+        # compiled engine: one vectorized pass over every set-op
+        for i, why in check_ops(keys, values):
+            issues.append(f"{keys[i]}={values[i]} blocked: {why}")
+    else:
+        for target, value in zip(keys, values):
+            dev_name, param = target.split(".", 1)
+            cmd = {"device": dev_name, "action": "set", "param": param, "value": value}
+            ok, why = interlock_check(cmd)
+            if not ok:
+                issues.append(f"{dev_name}.{param}={value} blocked: {why}")
 
     for step in steps:
         at_ms = step.get("at_ms")
@@ -72,43 +108,100 @@ def preflight(steps: List[dict], devices: Dict[str, Any], interlock_check, *, pa
 
     return (len(issues) == 0), issues
 
-def execute_recipe(steps: list[dict], devices: Dict[str, Any], interlock_check) -> None:
-    """Supports timed 'at', 'set', and 'status' steps with guards."""
-    start = time.monotonic()
-    for idx, step in enumerate(steps):
-        at_ms = step.get("at_ms")
-        if at_ms is not None:
-            t_target = start + (float(at_ms) / 1000.0)
-            while time.monotonic() < t_target:
-                time.sleep(0.001)
+def _gate(ops: List[TimedOp], devices: Dict[str, Any], interlock_check) -> Dict[int, str]:
+    """
+    Interlock decisions for one group, made in timeline order before the ops
+    are dispatched to device threads. Returns {id(op): reason} of blocked ops.
+    """
+    blocked: Dict[int, str] = {}
+    for op in ops:
+        if op.kind != "set" or op.param is None or op.device not in devices:
+            continue
+        cmd = {"device": op.device, "action": "set", "param": op.param, "value": op.value}
+        ok, why = interlock_check(cmd)
+        if not ok:
+            blocked[id(op)] = why
+    return blocked
 
-        set_ops = step.get("set", {}) or {}
-        for target, value in set_ops.items():
-            if "." not in target:
-                print(f"[step {idx}] SKIP invalid target '{target}' (use device.param).")
-                continue
-            dev_name, param = target.split(".", 1)
-            dev = devices.get(dev_name)
-            if dev is None:
-                print(f"[step {idx}] SKIP unknown device '{dev_name}'.")
-                continue
-            cmd = {"device": dev_name, "action": "set", "param": param, "value": value}
-            ok, why = interlock_check(cmd)
-            if not ok:
-                print(f"BLOCKED: {why}")
-                continue
-            try:
-                dev.set(**{param: value})
-            except Exception as e:
-                print(f"[step {idx}] ERROR applying {dev_name}.{param}={value}: {e}")
-
-        for name in step.get("status", []):
-            dev = devices.get(name)
-            if dev is None:
-                print(f"[step {idx}] SKIP status for unknown device '{name}'.")
-                continue
-            try:
-                st = dev.status()
-                print(f"[status] {name}: {st}")
-            except Exception as e:
-                print(f"[step {idx}] ERROR status for '{name}': {e}")
+def _run_op(op: TimedOp, devices: Dict[str, Any], blocked: Dict[int, str]) -> bool:
+    idx = op.step
+    if op.kind == "status":
+        name = op.device
+        dev = devices.get(name)
+        if dev is None:
+            print(f"[step {idx}] SKIP status for unknown device '{name}'.")
+            return False
+        try:
+            st = dev.status()
+            print(f"[status] {name}: {st}")
+            return True
+        except Exception as e:
+            print(f"[step {idx}] ERROR status for '{name}': {e}")
+            return False
+
+    if op.param is None:
+        print(f"[step {idx}] SKIP invalid target '{op.target}' (use device.param).")
+        return False
+    dev_name, param, value = op.device, op.param, op.value
+    dev = devices.get(dev_name)
+    if dev is None:
+        print(f"[step {idx}] SKIP unknown device '{dev_name}'.")
+        return False
+    why = blocked.get(id(op))
+    if why is not None:
+        print(f"BLOCKED: {why}")
+        return False
+    try:
+        dev.set(**{param: value})
+        return True
+    except Exception as e:
+        print(f"[step {idx}] ERROR applying {dev_name}.{param}={value}: {e}")
+        return False
+
+def execute_recipe(steps: list[dict], devices: Dict[str, Any], interlock_check,
+                   *, run_dir: pathlib.Path | None = None, spin_ns: int = SPIN_NS,
+                   concurrent: bool = True) -> TimingReport:
+    """
+    Supports timed 'at', 'set', and 'status' steps with guards.
+
+    Steps are compiled into a timeline sorted by at_ms. Ops sharing an at_ms
+    wait for their planned time (sleep, then spin on monotonic_ns) and are
+    dispatched together: with concurrent=True each device gets its own
+    worker, so the group takes as long as its slowest device while per-device
+    order is kept. The next group starts only after the current one is done.
+    Planned vs actual start times are returned as a TimingReport and written
+    to run_dir/timing.json if given.
+    """
+    return run_timeline(compile_timeline(steps), devices, interlock_check,
+                        run_dir=run_dir, spin_ns=spin_ns, concurrent=concurrent)
+
+def run_timeline(timeline: Iterable[TimedOp], devices: Dict[str, Any], interlock_check,
+                 *, run_dir: pathlib.Path | None = None, spin_ns: int = SPIN_NS,
+                 concurrent: bool = True) -> TimingReport:
+    """
+    Execute time-sorted ops (a list or a lazy stream) group by group.
+
+    Interlocks are checked serially in timeline order at each group's
+    planned time; the device threads only apply what was allowed. A stateful
+    interlock (one with reset(), e.g. InterlockEngine) starts the run from an
+    empty state, as preflight assumes.
+    """
+    reset = getattr(interlock_check, "reset", None)
+    if callable(reset):
+        reset()
+    t0 = time.monotonic_ns()
+    report = TimingReport(t0_ns=t0)
+    blocked: Dict[int, str] = {}
+    try:
+        with DeviceDispatcher(lambda op: _run_op(op, devices, blocked)) as dispatcher:
+            for at_ns, ops in group_by_time(timeline):
+                wait_until_ns(t0 + at_ns, spin_ns)
+                blocked.clear()
+                blocked.update(_gate(ops, devices, interlock_check))
+                results = dispatcher.run_group(ops) if concurrent else dispatcher.run_serial(ops)
+                for op, start, end, ok in results:
+                    report.ops.append(OpTiming(op.step, op.kind, op.target or "", op.at_ns, start - t0, end - t0, ok))
+    finally:
+        if run_dir is not None:
+            report.write(run_dir)
+    return report
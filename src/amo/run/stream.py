@@ -0,0 +1,188 @@
+import json
+import queue
+import pathlib
+import threading
+from typing import Any, Dict, Iterator, List
+
+import yaml
+from yaml.composer import Composer
+from yaml.constructor import SafeConstructor
+from yaml.resolver import Resolver
+
+from amo.control.interlocks import InterlockEngine
+from amo.run.runner import run_timeline, target_issue
+from amo.run.timing import SPIN_NS, TimingReport, stream_timeline
+
+try:  # libyaml events, Python composer: lets us build one step at a time
+    from yaml.cyaml import CParser as _Parser
+except ImportError:  # pragma: no cover - pure-Python PyYAML
+    from yaml.parser import Parser
+    from yaml.reader import Reader
+    from yaml.scanner import Scanner
+
+    class _Parser(Reader, Scanner, Parser):  # type: ignore[no-redef]
+        def __init__(self, stream):
+            Reader.__init__(self, stream)
+            Scanner.__init__(self)
+            Parser.__init__(self)
+
+
+class _StepLoader(_Parser, Composer, SafeConstructor, Resolver):
+    def __init__(self, stream):
+        _Parser.__init__(self, stream)
+        Composer.__init__(self)
+        SafeConstructor.__init__(self)
+        Resolver.__init__(self)
+
+
+class RecipeError(ValueError):
+    """A streamed recipe failed preflight; .issues lists why."""
+    def __init__(self, issues: List[str]):
+        super().__init__("; ".join(issues))
+        self.issues = issues
+
+
+def iter_recipe(path: str) -> Iterator[dict]:
+    """
+    Yield recipe steps one at a time without loading the whole file.
+
+    '.jsonl' recipes hold one JSON step per line; anything else is YAML whose
+    root is a list of steps (parsed with libyaml when available).
+    """
+    p = str(path)
+    if p.endswith(".jsonl"):
+        with open(p, "r") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        return
+
+    with open(p, "r") as f:
+        loader = _StepLoader(f)
+        try:
+            loader.get_event()  # StreamStart
+            if loader.check_event(yaml.StreamEndEvent):
+                return  # empty file
+            loader.get_event()  # DocumentStart
+            if not loader.check_event(yaml.SequenceStartEvent):
+                root = loader.construct_document(loader.compose_node(None, None))
+                if root is None:
+                    return
+                raise RecipeError(["Recipe root must be a list of steps."])
+            loader.get_event()
+            while not loader.check_event(yaml.SequenceEndEvent):
+                yield loader.construct_document(loader.compose_node(None, None))
+        finally:
+            loader.dispose()
+
+
+class StepPreflight:
+    """
+    preflight() one step at a time, in recipe order.
+
+    An InterlockEngine is copied and checked statefully. Steps must not go
+    back in time (at_ms never decreases), so recipe order is run order and
+    rate limits and cross-device conditions see the same predecessors as at
+    runtime.
+    """
+
+    def __init__(self, devices: Dict[str, Any], interlock_check, *, param_whitelist: dict | None = None):
+        self._devices = set(devices.keys())
+        self._whitelist = param_whitelist or {}
+        self._check = interlock_check.copy() if isinstance(interlock_check, InterlockEngine) else interlock_check
+        self._seen: Dict[str, str | None] = {}
+        self._at_ms = 0.0
+
+    def __call__(self, step: Any) -> List[str]:
+        if not isinstance(step, dict):
+            return [f"Recipe step must be a mapping; got {step!r}"]
+        issues: List[str] = []
+        for target, value in (step.get("set", {}) or {}).items():
+            why = self._seen.get(target, "")
+            if why == "":
+                why = target_issue(target, self._devices, self._whitelist)
+                self._seen[target] = why
+            if why is not None:
+                issues.append(why)
+                continue
+            dev_name, param = target.split(".", 1)
+            ok, why = self._check({"device": dev_name, "action": "set", "param": param, "value": value})
+            if not ok:
+                issues.append(f"{dev_name}.{param}={value} blocked: {why}")
+        at_ms = step.get("at_ms")
+        if at_ms is not None:
+            try:
+                t = float(at_ms)
+            except Exception:
+                issues.append(f"at_ms must be numeric; got '{at_ms}'")
+            else:
+                if t < self._at_ms:
+                    issues.append(f"at_ms must not decrease in a streamed recipe; got {at_ms} after {self._at_ms:g}")
+                else:
+                    self._at_ms = t
+        return issues
+
+
+_DONE = object()
+
+
+def _checked_steps(path: str, pf: StepPreflight, lookahead: int, stop: threading.Event) -> Iterator[dict]:
+    """Read + preflight on a background thread, at most `lookahead` steps ahead."""
+    q: "queue.Queue[Any]" = queue.Queue(maxsize=lookahead)
+
+    def put(item: Any) -> bool:
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def reader() -> None:
+        try:
+            for idx, step in enumerate(iter_recipe(path)):
+                issues = pf(step)
+                if issues:
+                    put(RecipeError([f"[step {idx}] {why}" for why in issues]))
+                    return
+                if not put(step):
+                    return
+            put(_DONE)
+        except Exception as e:
+            put(e)
+
+    t = threading.Thread(target=reader, name="recipe-reader", daemon=True)
+    t.start()
+    try:
+        while True:
+            item = q.get()
+            if item is _DONE:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        t.join()
+
+
+def execute_recipe_stream(path: str, devices: Dict[str, Any], interlock_check,
+                          *, param_whitelist: dict | None = None, lookahead: int = 1024,
+                          run_dir: pathlib.Path | None = None, spin_ns: int = SPIN_NS,
+                          concurrent: bool = True) -> TimingReport:
+    """
+    Run a recipe file while it is still being read.
+
+    Steps are parsed lazily and preflighted as they arrive; execution starts
+    with the first steps, and memory holds at most `lookahead` steps plus
+    `lookahead` reordering ops. at_ms must be non-decreasing (use
+    execute_recipe to run a recipe out of order). A step failing preflight stops the run before
+    it executes and raises RecipeError; ops already run stay in the report
+    (and run_dir/timing.json).
+    """
+    pf = StepPreflight(devices, interlock_check, param_whitelist=param_whitelist)
+    stop = threading.Event()
+    steps = _checked_steps(path, pf, lookahead, stop)
+    return run_timeline(stream_timeline(steps, lookahead), devices, interlock_check,
+                        run_dir=run_dir, spin_ns=spin_ns, concurrent=concurrent)
@@ -0,0 +1,142 @@
+import heapq
+import json
+import time
+import pathlib
+from dataclasses import dataclass, field, asdict
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Sleep until this close to the deadline, then spin on the clock.
+SPIN_NS = 2_000_000
+
+
+@dataclass
+class TimedOp:
+    """One 'set' or 'status' op placed on the recipe timeline."""
+    at_ns: int                 # planned offset from run start
+    step: int                  # index of the recipe step it came from
+    kind: str                  # "set" | "status"
+    device: Optional[str]
+    param: Optional[str] = None
+    value: Any = None
+    target: Optional[str] = None   # raw 'device.param' key for set ops
+
+
+@dataclass
+class OpTiming:
+    """Planned vs actual times of one executed op, in ns from run start."""
+    step: int
+    kind: str
+    target: str
+    planned_ns: int
+    start_ns: int
+    end_ns: int
+    ok: bool = True
+
+    @property
+    def lateness_ns(self) -> int:
+        return self.start_ns - self.planned_ns
+
+
+def step_ops(idx: int, step: dict, at_ns: int) -> List[TimedOp]:
+    """Ops of one recipe step (set ops first, then status), all at at_ns."""
+    ops: List[TimedOp] = []
+    for target, value in (step.get("set", {}) or {}).items():
+        dev, _, param = target.partition(".")
+        ops.append(TimedOp(at_ns, idx, "set", dev if param else None, param or None, value, target))
+    for name in step.get("status", []) or []:
+        ops.append(TimedOp(at_ns, idx, "status", name, target=name))
+    return ops
+
+
+def _step_times(steps: Iterable[dict]) -> Iterator[Tuple[int, dict, int]]:
+    # steps without at_ms inherit the previous step's time
+    at_ns = 0
+    for idx, step in enumerate(steps):
+        at_ms = step.get("at_ms")
+        if at_ms is not None:
+            at_ns = int(round(float(at_ms) * 1e6))
+        yield idx, step, at_ns
+
+
+def compile_timeline(steps: List[dict]) -> List[TimedOp]:
+    """
+    Flatten recipe steps into ops sorted by planned time.
+
+    Steps without at_ms run at the previous step's time; ties keep recipe
+    order (set ops before status within a step).
+    """
+    ops: List[TimedOp] = []
+    for idx, step, at_ns in _step_times(steps):
+        ops.extend(step_ops(idx, step, at_ns))
+    ops.sort(key=lambda op: op.at_ns)  # stable
+    return ops
+
+
+def run_order(steps: List[dict]) -> List[int]:
+    """Indices of steps in the order compile_timeline() runs them (stable by time)."""
+    times = [at_ns for _, _, at_ns in _step_times(steps)]
+    return sorted(range(len(times)), key=times.__getitem__)
+
+
+def stream_timeline(steps: Iterable[dict], lookahead: int = 1024) -> Iterator[TimedOp]:
+    """
+    compile_timeline() for a lazy step source.
+
+    Ops are reordered through a heap holding at most `lookahead` ops, so
+    steps that arrive out of order by less than the window come out sorted;
+    anything later than that is emitted late rather than buffered.
+    """
+    heap: List[Tuple[int, int, TimedOp]] = []
+    seq = 0
+    for idx, step, at_ns in _step_times(steps):
+        for op in step_ops(idx, step, at_ns):
+            heapq.heappush(heap, (op.at_ns, seq, op))
+            seq += 1
+        while len(heap) > lookahead:
+            yield heapq.heappop(heap)[2]
+    while heap:
+        yield heapq.heappop(heap)[2]
+
+
+def wait_until_ns(deadline_ns: int, spin_ns: int = SPIN_NS) -> int:
+    """Sleep most of the way to a time.monotonic_ns deadline, then spin. Returns now."""
+    now = time.monotonic_ns()
+    remaining = deadline_ns - now
+    if remaining > spin_ns:
+        time.sleep((remaining - spin_ns) / 1e9)
+    while (now := time.monotonic_ns()) < deadline_ns:
+        pass
+    return now
+
+
+@dataclass
+class TimingReport:
+    t0_ns: int                 # time.monotonic_ns() at run start
+    ops: List[OpTiming] = field(default_factory=list)
+
+    def summary(self) -> Dict[str, Any]:
+        if not self.ops:
+            return {"n_ops": 0}
+        late = sorted(op.lateness_ns for op in self.ops)
+        n = len(late)
+        mean = sum(late) / n
+        std = (sum((x - mean) ** 2 for x in late) / n) ** 0.5
+        return {
+            "n_ops": n,
+            "lateness_mean_us": mean / 1e3,
+            "lateness_max_us": late[-1] / 1e3,
+            "lateness_p99_us": late[min(n - 1, int(0.99 * n))] / 1e3,
+            "jitter_std_us": std / 1e3,
+            "duration_ms": max(op.end_ns for op in self.ops) / 1e6,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "summary": self.summary(),
+            "ops": [dict(asdict(op), lateness_ns=op.lateness_ns) for op in self.ops],
+        }
+
+    def write(self, run_dir: pathlib.Path) -> pathlib.Path:
+        path = pathlib.Path(run_dir) / "timing.json"
+        path.write_text(json.dumps(self.to_dict(), indent=2, default=str))
+        return path
@@ -1,2 +1,16 @@
 from .logger import TwinLogger as TwinLogger
-__all__ = ["TwinLogger"]
+from .index import TwinLogReader as TwinLogReader, query_events as query_events
+
+__all__ = ["TwinLogger", "ColumnarTwinLogger", "TwinLogReader", "query_events"]
+
+
+def __getattr__(name):
+    # NumPy-backed, so loaded on first use (PEP 562)
+    if name == "ColumnarTwinLogger":
+        from .columnar import ColumnarTwinLogger
+        return ColumnarTwinLogger
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,120 @@
+import json
+import re
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from amo.twin.logger import INDEX_SUFFIX, _read_index, event_kind
+
+_SEGMENT = re.compile(r"^dds_(\d{8}_\d{6})(?:_(\d+))?\.jsonl(\.gz)?$")
+
+
+@dataclass
+class Segment:
+    path: Path
+    run: str          # the logger's start stamp, shared by all its segments
+    number: int
+    compressed: bool
+    blocks: List[Dict[str, Any]]
+
+    @property
+    def t0(self) -> Optional[float]:
+        return self.blocks[0]["t0"] if self.blocks else None
+
+    @property
+    def t1(self) -> Optional[float]:
+        return self.blocks[-1]["t1"] if self.blocks else None
+
+
+class TwinLogReader:
+    """
+    Time-window / event-type queries over a TwinLogger directory.
+
+    Only the .idx sidecars are read up front; events() then seeks to the
+    blocks whose [t0, t1] overlaps the window and that contain the wanted
+    kinds, and decodes just those (one gzip member each for compressed
+    segments). Bytes written after a segment's last index line (a live or
+    crashed logger) are scanned.
+    """
+
+    def __init__(self, root: str | Path = "data", run: Optional[str] = None):
+        self.root = Path(root)
+        self.segments: List[Segment] = []
+        for p in self.root.iterdir() if self.root.exists() else ():
+            m = _SEGMENT.match(p.name)
+            if m is None or (run is not None and m.group(1) != run):
+                continue
+            if not m.group(3) and Path(str(p) + ".gz").exists():
+                continue  # compression just finished; the plain copy is about to go
+            self.segments.append(Segment(p, m.group(1), int(m.group(2) or 0), bool(m.group(3)),
+                                         _read_index(Path(str(p) + INDEX_SUFFIX))))
+        self.segments.sort(key=lambda s: (s.run, s.number))
+
+    def events(self, t0: Optional[float] = None, t1: Optional[float] = None,
+               kind: Optional[str | List[str]] = None) -> Iterator[Dict[str, Any]]:
+        """Events with t0 <= t_wall <= t1 (open ends allowed) and matching kind, in log order."""
+        kinds = None if kind is None else ({kind} if isinstance(kind, str) else set(kind))
+        lo = float("-inf") if t0 is None else t0
+        hi = float("inf") if t1 is None else t1
+        for seg in self.segments:
+            if seg.blocks and (seg.t1 < lo or seg.t0 > hi) and not self._has_tail(seg):
+                continue
+            with open(seg.path, "rb") as f:
+                for data in self._blocks(seg, f, lo, hi, kinds):
+                    for line in data.splitlines():
+                        if not line.strip():
+                            continue
+                        try:
+                            ev = json.loads(line)
+                        except json.JSONDecodeError:
+                            continue  # torn last line of a crashed log
+                        t = ev.get("t_wall", 0.0)
+                        if lo <= t <= hi and (kinds is None or event_kind(ev) in kinds):
+                            yield ev
+
+    def _has_tail(self, seg: Segment) -> bool:
+        end = seg.blocks[-1]["offset"] + seg.blocks[-1]["length"] if seg.blocks else 0
+        return seg.path.stat().st_size > end
+
+    def _blocks(self, seg: Segment, f, lo: float, hi: float, kinds) -> Iterator[bytes]:
+        end = 0
+        for b in seg.blocks:
+            end = b["offset"] + b["length"]
+            if b["t1"] < lo or b["t0"] > hi:
+                continue
+            if kinds is not None and not kinds.intersection(b.get("kinds", {})):
+                continue
+            f.seek(b["offset"])
+            raw = f.read(b["length"])
+            yield zlib.decompress(raw, 31) if seg.compressed else raw
+        f.seek(end)
+        tail = f.read()
+        if tail:
+            yield _decompress_members(tail) if seg.compressed else tail
+
+    def kinds(self) -> Dict[str, int]:
+        """Event counts per kind, from the indexes alone."""
+        out: Dict[str, int] = {}
+        for seg in self.segments:
+            for b in seg.blocks:
+                for k, n in b.get("kinds", {}).items():
+                    out[k] = out.get(k, 0) + n
+        return out
+
+
+def _decompress_members(data: bytes) -> bytes:
+    out = []
+    while data:
+        d = zlib.decompressobj(31)
+        out.append(d.decompress(data))
+        data = d.unused_data
+        if not d.eof:
+            break
+    return b"".join(out)
+
+
+def query_events(root: str | Path = "data", t0: Optional[float] = None, t1: Optional[float] = None,
+                 kind: Optional[str | List[str]] = None, run: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Shorthand for list(TwinLogReader(root, run).events(t0, t1, kind))."""
+    return list(TwinLogReader(root, run).events(t0, t1, kind))
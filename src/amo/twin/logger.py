@@ -1,14 +1,200 @@
 import json
+import os
+import threading
 import time
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+
+INDEX_SUFFIX = ".idx"
+
+
+def event_kind(event: Dict[str, Any]) -> Optional[str]:
+    """Event type used by the index: 'evt', else 'op'."""
+    kind = event.get("evt", event.get("op"))
+    return None if kind is None else str(kind)
+
 
 class TwinLogger:
-    def __init__(self, root="data"):
+    """
+    JSONL event log.
+
+    Writes are block-buffered; call flush()/close() or use it as a context
+    manager. For high event rates use amo.twin.columnar.ColumnarTwinLogger.
+
+    With rotate_bytes and/or rotate_s the log is split into segments
+    dds_<ts>_0000.jsonl, _0001, ...; closed segments are gzip-compressed on
+    a background thread (compress=False keeps them plain). Every segment has
+    a sidecar '<segment>.idx' with one JSON line per block of index_every
+    events: {offset, length, t0, t1, n, kinds}. Compressed segments store
+    each block as its own gzip member, so amo.twin.index.TwinLogReader can
+    seek straight to the blocks of a time window or event type.
+    """
+    def __init__(self, root="data", buffering: int = 1 << 16, *,
+                 rotate_bytes: Optional[int] = None, rotate_s: Optional[float] = None,
+                 compress: bool = True, index_every: int = 1000):
         Path(root).mkdir(parents=True, exist_ok=True)
-        ts = time.strftime("%Y%m%d_%H%M%S")
-        self._fp = open(Path(root)/f"dds_{ts}.jsonl", "a", buffering=1)
+        self.root = Path(root)
+        self._ts = time.strftime("%Y%m%d_%H%M%S")
+        self._buffering = buffering
+        self.rotate_bytes = rotate_bytes
+        self.rotate_s = rotate_s
+        self.compress = compress
+        self.index_every = max(1, int(index_every))
+        self._segment = 0
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pending: List[Future] = []
+        self._lock = threading.Lock()
+        self._open_segment()
+
+    def _segment_path(self) -> Path:
+        if self.rotate_bytes is None and self.rotate_s is None:
+            return self.root / f"dds_{self._ts}.jsonl"
+        return self.root / f"dds_{self._ts}_{self._segment:04d}.jsonl"
+
+    def _open_segment(self) -> None:
+        self.path = self._segment_path()
+        self._fp = open(self.path, "a", buffering=self._buffering)
+        self._idx = open(str(self.path) + INDEX_SUFFIX, "a")
+        self._pos = self._fp.tell()
+        self._opened = time.time()
+        self._new_block()
+
+    def _new_block(self) -> None:
+        self._block_off = self._pos
+        self._block_n = 0
+        self._block_t0 = self._block_t1 = None
+        self._block_kinds: Dict[str, int] = {}
 
     def record(self, event: Dict[str, Any]) -> None:
-        event["t_wall"] = time.time()
-        self._fp.write(json.dumps(event) + "\n")
+        t = time.time()
+        if self._should_rotate(t):
+            self.rotate()
+        event["t_wall"] = t
+        line = json.dumps(event) + "\n"  # ASCII: len == bytes
+        self._fp.write(line)
+        self._pos += len(line)
+        if self._block_t0 is None:
+            self._block_t0 = t
+        self._block_t1 = t
+        self._block_n += 1
+        kind = event_kind(event)
+        if kind is not None:
+            self._block_kinds[kind] = self._block_kinds.get(kind, 0) + 1
+        if self._block_n >= self.index_every:
+            self._end_block()
+
+    def _should_rotate(self, t: float) -> bool:
+        if self._pos == 0:
+            return False
+        if self.rotate_bytes is not None and self._pos >= self.rotate_bytes:
+            return True
+        return self.rotate_s is not None and t - self._opened >= self.rotate_s
+
+    def _end_block(self) -> None:
+        if self._block_n == 0:
+            return
+        # data first, so an index line never points past what is on disk
+        self._fp.flush()
+        self._idx.write(json.dumps({
+            "offset": self._block_off, "length": self._pos - self._block_off,
+            "t0": self._block_t0, "t1": self._block_t1, "n": self._block_n,
+            "kinds": self._block_kinds,
+        }) + "\n")
+        self._idx.flush()
+        self._new_block()
+
+    def rotate(self) -> Path:
+        """Close the current segment (queueing its compression) and start the next one."""
+        closed = self.path
+        self._close_segment()
+        self._segment += 1
+        self._open_segment()
+        return closed
+
+    def _close_segment(self) -> None:
+        self._end_block()
+        self._fp.close()
+        self._idx.close()
+        if self.compress and (self.rotate_bytes is not None or self.rotate_s is not None):
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="twinlog-gzip")
+            with self._lock:
+                self._pending = [f for f in self._pending if not f.done()]
+                self._pending.append(self._pool.submit(compress_segment, self.path))
+
+    def flush(self) -> None:
+        self._end_block()
+        self._fp.flush()
+
+    def close(self) -> None:
+        if self._fp.closed:
+            return
+        self._close_segment()
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            for f in self._pending:
+                f.result()
+
+    def __enter__(self) -> "TwinLogger":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __del__(self) -> None:
+        for name in ("_fp", "_idx"):
+            fp = getattr(self, name, None)
+            if fp is not None and not fp.closed:
+                fp.close()
+
+
+def compress_segment(path: str | Path, level: int = 6) -> Path:
+    """
+    Gzip a closed segment block by block and rewrite its index to point at
+    the compressed members. Returns the .gz path; the plain file is removed.
+    """
+    path = Path(path)
+    idx_path = Path(str(path) + INDEX_SUFFIX)
+    gz_path = Path(str(path) + ".gz")
+    blocks = _read_index(idx_path)
+    out_blocks = []
+    with open(path, "rb") as src, open(str(gz_path) + ".tmp", "wb") as dst:
+        pos = 0
+        for b in blocks:
+            src.seek(b["offset"])
+            member = _gzip_member(src.read(b["length"]), level)
+            dst.write(member)
+            out_blocks.append({**b, "offset": pos, "length": len(member)})
+            pos += len(member)
+        # bytes past the last indexed block (crash before its index line)
+        src.seek(blocks[-1]["offset"] + blocks[-1]["length"] if blocks else 0)
+        tail = src.read()
+        if tail:
+            dst.write(_gzip_member(tail, level))
+    tmp_idx = Path(str(gz_path) + INDEX_SUFFIX + ".tmp")
+    tmp_idx.write_text("".join(json.dumps(b) + "\n" for b in out_blocks))
+    os.replace(str(gz_path) + ".tmp", gz_path)
+    os.replace(tmp_idx, str(gz_path) + INDEX_SUFFIX)
+    path.unlink()
+    idx_path.unlink(missing_ok=True)
+    return gz_path
+
+
+def _gzip_member(data: bytes, level: int) -> bytes:
+    c = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return c.compress(data) + c.flush()
+
+
+def _read_index(path: Path) -> List[Dict[str, Any]]:
+    """Index lines of one segment; a torn last line (crash) is ignored."""
+    if not path.exists():
+        return []
+    out = []
+    for line in path.read_text().splitlines():
+        try:
+            out.append(json.loads(line))
+        except json.JSONDecodeError:
+            break
+    return out
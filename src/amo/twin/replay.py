@@ -0,0 +1,240 @@
+from __future__ import annotations
+import gzip
+import json
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from amo.optics.polarimetry import stokes_many
+from amo.run.chain_exec import node_jones
+from amo.twin.columnar import MAGIC, ColumnarTwinLogger, iter_chunks
+
+
+@dataclass
+class ReplayBatch:
+    """
+    Rows of one event kind from one chunk. Arrays are read-only views into
+    the mapped log wherever the chunk holds only that kind (copies only when
+    rows have to be masked out).
+    """
+    seq: np.ndarray
+    t_wall: np.ndarray
+    columns: Dict[str, np.ndarray]
+
+    def __len__(self) -> int:
+        return len(self.seq)
+
+    @property
+    def S(self) -> np.ndarray:
+        return self.columns["S"]
+
+    def values(self, name: str) -> Optional[np.ndarray]:
+        """Column name with categorical / JSON codes decoded to their values (None if absent)."""
+        col = self.columns.get(name)
+        if col is None:
+            return None
+        labels = self.columns.get(name + "#categories")
+        texts = self.columns.get(name + "#json")
+        if texts is not None:
+            labels = np.empty(len(texts), dtype=object)
+            labels[:] = [json.loads(t) for t in texts]
+        return col if labels is None else labels[col]
+
+
+class ReplayLog:
+    """
+    Memory-mapped view of a twin log for replay.
+
+    Takes a .amotwin file (ColumnarTwinLogger) directly. A TwinLogger JSONL
+    log is converted once into '<log>.amotwin' next to it (redone when the
+    JSONL is newer), so later replays never parse JSON again.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = as_columnar(path)
+
+    def batches(self, kind: Optional[str] = "pol_step") -> Iterator[ReplayBatch]:
+        """One batch per chunk holding events with evt == kind (None: all)."""
+        for chunk in iter_chunks(self.path):
+            rows = _select(chunk, kind)
+            if rows is None:
+                continue
+            cols = {k: v for k, v in chunk.items() if "#" not in k and k not in ("seq", "t_wall")}
+            if rows is not True:
+                cols = {k: v[rows] for k, v in cols.items()}
+            for k in list(cols):
+                for suffix in ("#categories", "#json"):
+                    if k + suffix in chunk:
+                        cols[k + suffix] = chunk[k + suffix]
+            seq, t = chunk["seq"], chunk["t_wall"]
+            yield ReplayBatch(seq if rows is True else seq[rows],
+                              t if rows is True else t[rows], cols)
+
+    def __iter__(self) -> Iterator[ReplayBatch]:
+        return self.batches()
+
+
+def _select(chunk: Dict[str, np.ndarray], kind: Optional[str]):
+    """True for the whole chunk, a row mask, or None when nothing matches."""
+    if kind is None:
+        return True
+    cats = chunk.get("evt#categories")
+    if cats is None:
+        return None
+    hit = np.flatnonzero(cats == kind)
+    if hit.size == 0:
+        return None
+    if cats.size == 1:
+        return True
+    return chunk["evt"] == hit[0]
+
+
+def as_columnar(path: str | Path, out: str | Path | None = None, chunk_rows: int = 65536) -> Path:
+    """Path of a .amotwin version of a twin log, converting JSONL on first use."""
+    path = Path(path)
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) == MAGIC:
+            return path
+    out = Path(out) if out is not None else Path(str(path) + ".amotwin")
+    if out.exists() and out.stat().st_mtime_ns >= path.stat().st_mtime_ns:
+        return out
+    tmp = out.with_name(out.name + ".tmp")
+    tmp.unlink(missing_ok=True)
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rt") as src, ColumnarTwinLogger(tmp.parent, chunk_rows, name=tmp.name) as log:
+        for line in src:
+            if line.strip():
+                ev = json.loads(line)
+                log.record(ev, t_wall=ev.pop("t_wall", None))
+    os.replace(tmp, out)
+    return out
+
+
+@dataclass
+class ReplayDiff:
+    runs: int = 0
+    steps: int = 0
+    max_abs_err: float = 0.0
+    mismatches: List[Dict[str, Any]] = field(default_factory=list)  # first max_report only
+    n_mismatch: int = 0
+
+    @property
+    def ok(self) -> bool:
+        return self.n_mismatch == 0
+
+
+def replay_chain(log: str | Path | ReplayLog, nodes: List[Dict[str, Any]], E0: np.ndarray,
+                 branch: str | None = None, *, logged_params: bool = True,
+                 atol: float = 1e-9, max_report: int = 20) -> ReplayDiff:
+    """
+    Re-simulate every logged pol_step run (pol_runner.run_and_log) through
+    the chain and compare Stokes vectors.
+
+    Each node's logged theta/retard and PBS branch (meta.*) are used where
+    present, the config (and `branch`) otherwise; logged_params=False
+    replays the config as it is now. Runs are re-simulated in batches, one (R,2,2) Jones
+    stack per node for the R complete runs of a log window, instead of one
+    run_chain() call per run.
+    """
+    log = log if isinstance(log, ReplayLog) else ReplayLog(log)
+    N = len(nodes)
+    diff = ReplayDiff()
+    carry: List[ReplayBatch] = []
+    for window in _windows(log):
+        carry = _replay_window(carry + window, nodes, E0, branch, N, logged_params, atol, max_report, diff)
+    return diff
+
+
+def _windows(log: ReplayLog) -> Iterator[List[ReplayBatch]]:
+    """Batches grouped into runs of chunks whose seq ranges interleave (one flush each)."""
+    group: List[ReplayBatch] = []
+    hi = -1
+    for b in log.batches("pol_step"):
+        if len(b) == 0:
+            continue
+        if group and b.seq[0] > hi:
+            yield group
+            group = []
+        group.append(b)
+        hi = max(hi, int(b.seq[-1]))
+    if group:
+        yield group
+
+
+def _replay_window(batches: List[ReplayBatch], nodes, E0, branch, N, logged_params, atol, max_report,
+                   diff) -> List[ReplayBatch]:
+    seq = np.concatenate([b.seq for b in batches])
+    order = np.argsort(seq, kind="stable")
+    seq = seq[order]
+    t_wall = np.concatenate([b.t_wall for b in batches])[order]
+    node = np.concatenate([b.columns["node"] for b in batches])[order]
+    S = np.concatenate([b.S for b in batches])[order]
+
+    def logged(name: str, numeric: bool = True) -> np.ndarray:
+        """Logged column in seq order; NaN (None) where a batch does not have it."""
+        missing = np.nan if numeric else None
+        if not logged_params:
+            return np.full(len(seq), missing, dtype=float if numeric else object)
+        parts = []
+        for b in batches:
+            v = b.values(name)
+            if v is None:
+                v = np.full(len(b), missing, dtype=float if numeric else object)
+            elif numeric and v.dtype == object:
+                v = np.array([np.nan if x is None else x for x in v], dtype=float)
+            parts.append(v if numeric else v.astype(object))
+        return np.concatenate(parts)[order].astype(float if numeric else object)
+
+    theta_log, retard_log = logged("meta.theta"), logged("meta.retard")
+    branch_log = logged("meta.branch", numeric=False)
+    at = np.clip(node, 0, N - 1)
+    theta = np.where(np.isnan(theta_log), np.array([n.get("theta", 0.0) for n in nodes], dtype=float)[at], theta_log)
+    retard = np.where(np.isnan(retard_log), np.array([n.get("retard", 0.0) for n in nodes], dtype=float)[at], retard_log)
+
+    # a complete run is N consecutive steps with node == 0..N-1
+    first = np.flatnonzero(node == 0)
+    starts = first[first + N <= len(node)]
+    if starts.size:
+        span = starts[:, None] + np.arange(N)
+        good = np.all(node[span] == np.arange(N), axis=1) & np.all(np.diff(seq[span], axis=1) == 1, axis=1)
+        starts = starts[good]
+
+    if starts.size:
+        span = starts[:, None] + np.arange(N)
+        E = np.broadcast_to(E0.astype(complex), (starts.size, 2))
+        sim = np.empty((starts.size, N, 4))
+        for i, n in enumerate(nodes):
+            if n["type"] == "waveplate":
+                n = {**n, "retard": retard[span[:, i]]}
+            if n["type"] == "pbs":
+                # runs may have taken different ports: one stack per logged branch
+                b = branch_log[span[:, i]].tolist()
+                J = np.empty((starts.size, 2, 2), dtype=complex)
+                for val in dict.fromkeys(b):
+                    m = np.array([x == val for x in b])
+                    J[m] = node_jones({**n, "branch": val} if val else n, i, branch, theta=theta[span[m, i]])
+            else:
+                J = node_jones(n, i, branch, theta=theta[span[:, i]])
+            E = np.einsum("rij,rj->ri", J, E)
+            sim[:, i] = stokes_many(E)
+        err = np.abs(sim - S[span]).max(axis=2)
+        diff.runs += starts.size
+        diff.steps += starts.size * N
+        diff.max_abs_err = max(diff.max_abs_err, float(err.max()))
+        bad_r, bad_i = np.nonzero(err > atol)
+        diff.n_mismatch += bad_r.size
+        for r, i in zip(bad_r[:max(0, max_report - len(diff.mismatches))], bad_i):
+            k = span[r, i]
+            diff.mismatches.append({"seq": int(seq[k]), "node": int(i), "logged": S[k].tolist(),
+                                    "replayed": sim[r, i].tolist(), "err": float(err[r, i])})
+
+    # an unfinished run at the end may complete in the next window
+    if not (first.size and first[-1] + N > len(node)):
+        return []
+    k = int(first[-1])
+    return [ReplayBatch(seq[k:], t_wall[k:], {"node": node[k:], "S": S[k:],
+                                              "meta.theta": theta_log[k:], "meta.retard": retard_log[k:],
+                                              "meta.branch": branch_log[k:]})]
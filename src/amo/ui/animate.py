@@ -2,47 +2,36 @@ import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation
 
+from amo.ui.liveplot import draw_sphere
+from amo.ui.poincare import decimate_arc, new_figure, normalize_stokes
+
 # keep a module-level handle so GC doesn't kill the animation
 _anim_handle = None
 
-def animate_stokes(sweep_S_list, interval_ms=100, title="Poincaré Animation"):
+def animate_stokes(sweep_S_list, interval_ms=100, title="Poincaré Animation", max_frames=2000, save=None):
     """
     sweep_S_list: list of [S0,S1,S2,S3] over time (frames)
+
+    Long sweeps are arc-length decimated to about max_frames frames; the
+    path of frame k is a slice of the precomputed points, so no frame
+    rebuilds it. With save (a .gif, or a video format ffmpeg knows) the
+    frames are rendered off-screen and written with amo.ui.export.
     """
-    pts = []
-    for S in sweep_S_list:
-        S0 = S[0] if S[0] != 0 else 1.0
-        pts.append(np.array(S[1:4], dtype=float) / float(S0))
-    pts = np.array(pts)
+    pts = normalize_stokes(sweep_S_list)
 
     if len(pts) < 2:
         raise ValueError("Need at least 2 frames to animate (check your --sweep range)")
+    pts = pts[decimate_arc(pts, max_points=max_frames)]
 
-    fig = plt.figure()
+    fig = new_figure(headless=save is not None)
     ax = fig.add_subplot(111, projection='3d')
-
-    # unit sphere wireframe
-    u = np.linspace(0, 2*np.pi, 64)
-    v = np.linspace(0, np.pi, 32)
-    x = np.outer(np.cos(u), np.sin(v))
-    y = np.outer(np.sin(u), np.sin(v))
-    z = np.outer(np.ones_like(u), np.cos(v))
-    ax.plot_wireframe(x, y, z, linewidth=0.3, alpha=0.25)
+    draw_sphere(ax, 64, 32, linewidth=0.3, alpha=0.25)
 
     # animated artists
     dot, = ax.plot([], [], [], marker='o', linestyle='None')
     path, = ax.plot([], [], [], linewidth=1.5)
-
-    ax.set_xlim(-1,1)
-    ax.set_ylim(-1,1)
-    ax.set_zlim(-1,1)
-    ax.set_xlabel('S1')
-    ax.set_ylabel('S2')
-    ax.set_zlabel('S3')
     ax.set_title(title)
 
-    xs, ys, zs = [], [], []
-
     def init():
         dot.set_data([], [])
         dot.set_3d_properties([])
@@ -51,15 +40,25 @@ def animate_stokes(sweep_S_list, interval_ms=100, title="Poincaré Animation"):
         return dot, path
 
     def update(frame):
-        xs.append(pts[frame,0])
-        ys.append(pts[frame,1])
-        zs.append(pts[frame,2])
-        dot.set_data([pts[frame,0]], [pts[frame,1]])
-        dot.set_3d_properties([pts[frame,2]])
-        path.set_data(xs, ys)
-        path.set_3d_properties(zs)
+        dot.set_data(pts[frame:frame + 1, 0], pts[frame:frame + 1, 1])
+        dot.set_3d_properties(pts[frame:frame + 1, 2])
+        path.set_data(pts[:frame + 1, 0], pts[:frame + 1, 1])
+        path.set_3d_properties(pts[:frame + 1, 2])
         return dot, path
 
+    if save is not None:
+        from amo.ui.export import export_gif, export_video
+
+        def render(frame):
+            update(frame)
+            fig.canvas.draw()
+            return np.asarray(fig.canvas.buffer_rgba())[:, :, :3].copy()
+
+        fps = 1000.0 / interval_ms
+        if str(save).lower().endswith(".gif"):
+            return export_gif(save, render, len(pts), fps)
+        return export_video(save, (render(k) for k in range(len(pts))), fps)
+
     global _anim_handle
     _anim_handle = FuncAnimation(fig, update, init_func=init,
                                  frames=len(pts), interval=interval_ms,
@@ -1,41 +1,52 @@
-import numpy as np
-from amo.optics.polarimetry import trace_stokes
 import typer
-from amo.io.config import get_influx_config
-from amo.io.sinks.influx import InfluxSink
-from amo.io.loggers.rga import stream_rga_csv_to_influx, upload_rga_folder
+
+# Heavy dependencies (numpy, influxdb_client, the RGA loggers) are imported
+# inside the commands that use them, so --help and the light commands start fast.
 
 app = typer.Typer(no_args_is_help=True)
 
 @app.command()
 def influx_test():
     """Write a single test point to InfluxDB."""
+    from amo.io.config import get_influx_config
+    from amo.io.sinks.influx import InfluxSink
     cfg = get_influx_config()
     with InfluxSink(cfg.url, cfg.token, cfg.org, cfg.bucket) as sink:
         sink.write("amo_ping", {"value": 1.0}, {"who": "cli"})
     typer.echo("✅ InfluxDB write OK.")
 
+def _open_sink(spool: str | None):
+    from amo.io.config import get_influx_config
+    from amo.io.sinks.influx import InfluxSink
+    from amo.io.sinks.spool import SpooledSink
+    cfg = get_influx_config()
+    sink = InfluxSink(cfg.url, cfg.token, cfg.org, cfg.bucket)
+    return SpooledSink(sink, spool) if spool else sink
+
+SPOOL_OPT = typer.Option(None, "--spool", help="Spool writes to this directory; replay when InfluxDB is reachable")
+
 @app.command()
-def rga_log(csv: str, follow: bool = True):
+def rga_log(csv: str, follow: bool = True, spool: str = SPOOL_OPT):
     """Stream an RGA CSV into InfluxDB (tail-f style)."""
-    cfg = get_influx_config()
-    with InfluxSink(cfg.url, cfg.token, cfg.org, cfg.bucket) as sink:
+    from amo.io.loggers.rga import stream_rga_csv_to_influx
+    with _open_sink(spool) as sink:
         stream_rga_csv_to_influx(csv, sink, follow=follow)
 
 @app.command()
-def rga_upload(folder: str):
+def rga_upload(folder: str, spool: str = SPOOL_OPT,
+               workers: int = typer.Option(None, "--workers", help="Parser processes (default: CPU count)"),
+               resume: bool = typer.Option(True, "--resume/--no-resume", help="Track progress in <folder>/.rga_backfill.json")):
     """Upload all CSV files in a folder into InfluxDB."""
-    cfg = get_influx_config()
-    with InfluxSink(cfg.url, cfg.token, cfg.org, cfg.bucket) as sink:
-        upload_rga_folder(folder, sink)
-
-if __name__ == "__main__":
-    app()
-
+    from amo.io.loggers.rga import upload_rga_folder
+    with _open_sink(spool) as sink:
+        stats = upload_rga_folder(folder, sink, workers=workers, manifest="auto" if resume else None)
+    typer.echo(f"✅ {stats['lines']} rows from {stats['files']} files in {stats['writes']} writes.")
 
 @app.command()
 def pol_demo(plot: bool = False):
     """H -> HWP(22.5) -> QWP(45) -> POL(0)"""
+    import numpy as np
+    from amo.optics.polarimetry import trace_stokes
     nodes = [
         {"type":"waveplate","theta":22.5,"retard":180.0},
         {"type":"waveplate","theta":45.0,"retard":90.0},
@@ -49,3 +60,6 @@ def pol_demo(plot: bool = False):
     if plot:
         from amo.ui.poincare import plot_stokes_path
         plot_stokes_path([np.array(x["S"]) for x in steps])
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,248 @@
+"""
+Streaming GIF / video export for the live scripts.
+
+Frames are rendered one at a time on the calling thread (matplotlib is
+not thread-safe; LiveDashboard.frame_rgb renders off-screen), then
+quantized and LZW-encoded in a worker pool while the next frames render.
+Encoded frames are appended to the file in order as they complete, with
+at most a few frames in flight, so memory does not grow with the run
+length. Each frame carries its own palette and only the rectangle that
+changed since the previous frame is stored.
+
+The output size is estimated from the first `sample` encoded frames, and
+the frame stride (and so the effective fps) is chosen from that estimate
+before the rest of the run is rendered: one pass, no re-encoding.
+"""
+from __future__ import annotations
+import io
+import itertools
+import os
+import shutil
+import struct
+import subprocess
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Deque, Iterable, Optional, Tuple
+
+import numpy as np
+
+_NETSCAPE_LOOP = b"\x21\xff\x0bNETSCAPE2.0\x03\x01"
+_GCE_BYTES = 8         # graphic control extension in front of every frame
+
+
+@dataclass
+class ExportStats:
+    frames: int            # frames of the run (step calls)
+    written: int           # frames in the file
+    stride: int            # final stride: every stride-th frame was rendered
+    fps: float             # effective frame rate at the end of the file
+    bytes: int
+    est_bytes: int         # size predicted from the sample
+    seconds: float
+
+
+def _changed_box(prev: Optional[np.ndarray], cur: np.ndarray) -> Optional[Tuple[int, int, int, int]]:
+    """(top, left, bottom, right) of the pixels that differ from prev; None when identical."""
+    if prev is None or prev.shape != cur.shape:
+        return 0, 0, cur.shape[0], cur.shape[1]
+    diff = np.any(prev != cur, axis=2)
+    rows = np.flatnonzero(diff.any(axis=1))
+    if rows.size == 0:
+        return None
+    cols = np.flatnonzero(diff.any(axis=0))
+    return int(rows[0]), int(cols[0]), int(rows[-1]) + 1, int(cols[-1]) + 1
+
+
+def encode_frame(rgb: np.ndarray, prev: Optional[np.ndarray] = None, colors: int = 256) -> bytes:
+    """
+    One GIF image block (descriptor, local palette, LZW data) for an
+    (h, w, 3) uint8 frame, cropped to the area changed since prev. Runs in
+    the worker pool; PIL releases the GIL while quantizing and encoding.
+    """
+    from PIL import Image
+
+    box = _changed_box(prev, rgb)
+    if box is None:
+        box = (0, 0, 1, 1)  # nothing changed: a 1x1 patch of the same pixel
+    top, left, bottom, right = box
+    im = Image.fromarray(np.ascontiguousarray(rgb[top:bottom, left:right]))
+    im = im.quantize(colors=max(2, min(256, int(colors))), method=getattr(Image, "FASTOCTREE", 2))
+    buf = io.BytesIO()
+    im.save(buf, "GIF")
+    return _as_local_block(buf.getvalue(), left, top)
+
+
+def _as_local_block(gif: bytes, left: int, top: int) -> bytes:
+    """Move the global palette of a single-image GIF into its image descriptor."""
+    flags = gif[10]
+    pos = 13
+    palette = b""
+    if flags & 0x80:
+        n = 3 << ((flags & 7) + 1)
+        palette, pos = gif[13:13 + n], 13 + n
+    while gif[pos] == 0x21:                       # skip extensions
+        pos += 2
+        while gif[pos]:
+            pos += gif[pos] + 1
+        pos += 1
+    if gif[pos] != 0x2C:
+        raise ValueError("no image descriptor in encoded frame")
+    _, _, w, h, img_flags = struct.unpack("<HHHHB", gif[pos + 1:pos + 10])
+    if palette:
+        img_flags = (img_flags & 0x40) | 0x80 | (flags & 7)
+    end = gif.rindex(b"\x3b")
+    return b"\x2c" + struct.pack("<HHHHB", left, top, w, h, img_flags) + palette + gif[pos + 10:end]
+
+
+class GifStreamWriter:
+    """Appends pre-encoded image blocks (encode_frame) to an animated GIF file."""
+
+    def __init__(self, path: str | Path, size: Tuple[int, int], loop: int = 0):
+        self.path = Path(path)
+        self._fp = open(self.path, "wb")
+        w, h = size
+        self._fp.write(b"GIF89a" + struct.pack("<HHBBB", w, h, 0, 0, 0))
+        if loop is not None:
+            self._fp.write(_NETSCAPE_LOOP + struct.pack("<H", loop) + b"\x00")
+        self.frames = 0
+        self.bytes = self._fp.tell()
+
+    def add(self, block: bytes, duration_ms: float) -> int:
+        """Append one frame; returns the bytes written."""
+        # graphic control: disposal 1 (keep), so cropped frames draw over the previous one
+        delay = max(2, int(round(duration_ms / 10)))
+        self._fp.write(b"\x21\xf9\x04" + struct.pack("<BHB", 1 << 2, delay, 0) + b"\x00")
+        self._fp.write(block)
+        self.frames += 1
+        self.bytes += _GCE_BYTES + len(block)
+        return _GCE_BYTES + len(block)
+
+    def close(self) -> None:
+        if not self._fp.closed:
+            self._fp.write(b"\x3b")
+            self._fp.close()
+
+    def __enter__(self) -> "GifStreamWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def pick_stride(gap_bytes, first_bytes: int, n_frames: int, max_bytes: Optional[int], margin: float = 0.9) -> int:
+    """
+    Smallest stride whose predicted size fits margin * max_bytes.
+    gap_bytes[g - 1] is the measured size of a frame diffed against the
+    frame g steps earlier; wider gaps reuse the widest measurement.
+    """
+    if not max_bytes or n_frames <= 1:
+        return 1
+    budget = margin * max_bytes - first_bytes
+    for s in range(1, n_frames):
+        if gap_bytes[min(s, len(gap_bytes)) - 1] * ((n_frames - 1) // s) <= budget:
+            return s
+    return n_frames
+
+
+def export_gif(path: str | Path, render: Callable[[int], np.ndarray], n_frames: int, fps: float, *,
+               advance: Optional[Callable[[int], None]] = None, colors: int = 256,
+               max_bytes: Optional[int] = None, sample: int = 8, workers: Optional[int] = None,
+               loop: int = 0, margin: float = 0.9) -> ExportStats:
+    """
+    Render frames 0..n_frames-1 with render(i) -> (h, w, 3) uint8 and
+    stream them to an animated GIF.
+
+    With max_bytes, the first `sample` frames are encoded first, both
+    against their neighbour and against frame 0, and the stride is picked
+    so the predicted size fits. If the frames written later run larger than
+    the sample (plots filling up), the stride is doubled on the fly, so the
+    limit holds without a second pass. Frames skipped by the stride are
+    passed to advance(i) instead (state-only step, no drawing; render(i)
+    when not given) so the run stays the same. Each frame's delay covers the
+    frames skipped after it, so playback keeps real time.
+    """
+    t_start = time.perf_counter()
+    n_frames = max(1, int(n_frames))
+    workers = workers or min(8, os.cpu_count() or 1)
+    in_flight = 2 * workers + 1
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gif-encode") as pool:
+        head = [render(i) for i in range(min(max(2, sample), n_frames))]
+        near = [pool.submit(encode_frame, rgb, prev, colors) for rgb, prev in zip(head, [None] + head[:-1])]
+        far = [pool.submit(encode_frame, rgb, head[0], colors) for rgb in head[2:]] if max_bytes else []
+        sizes = [len(f.result()) for f in near]
+        first = sizes[0] + _GCE_BYTES
+        gaps = [sum(sizes[1:]) / (len(sizes) - 1)] if len(sizes) > 1 else [sizes[0]]
+        gaps = [g + _GCE_BYTES for g in gaps + [len(f.result()) for f in far]]
+        stride = pick_stride(gaps, first, n_frames, max_bytes, margin)
+        est_total = int(first + gaps[min(stride, len(gaps)) - 1] * ((n_frames - 1) // stride))
+        h, w = head[0].shape[:2]
+
+        with GifStreamWriter(path, (w, h), loop=loop) as out:
+            queue: Deque = deque()      # [block future, frames until the next kept frame]
+            recent: Deque = deque(maxlen=16)
+            prev = None
+            keep = 0
+            for i in range(n_frames):
+                rgb = head[i] if i < len(head) else None
+                if i != keep:
+                    if rgb is None:
+                        (advance or render)(i)
+                    continue
+                if rgb is None:
+                    rgb = render(i)
+                if i < len(head) and (i == 0 or prev is head[i - 1]):
+                    fut = near[i]       # the sample already diffed it against prev
+                else:
+                    fut = pool.submit(encode_frame, rgb, prev, colors)
+                entry = [fut, stride]
+                queue.append(entry)
+                prev, keep = rgb, i + stride
+                if max_bytes and len(recent) == recent.maxlen:
+                    per = sum(recent) / len(recent)
+                    if out.bytes + per * (len(queue) + (n_frames - 1 - i) // stride) > margin * max_bytes:
+                        stride *= 2
+                        entry[1], keep = stride, i + stride
+                        recent.clear()
+                while len(queue) >= in_flight or (queue and queue[0][0].done()):
+                    fut, hold = queue.popleft()
+                    recent.append(out.add(fut.result(), 1000.0 * hold / fps))
+            del head, near, far
+            while queue:
+                fut, hold = queue.popleft()
+                out.add(fut.result(), 1000.0 * hold / fps)
+            written = out.frames
+    return ExportStats(frames=n_frames, written=written, stride=stride, fps=fps / stride,
+                       bytes=os.path.getsize(path), est_bytes=est_total,
+                       seconds=time.perf_counter() - t_start)
+
+
+def export_video(path: str | Path, frames: Iterable[np.ndarray], fps: float, *,
+                 codec: str = "libx264", crf: int = 23) -> int:
+    """
+    Pipe (h, w, 3) uint8 frames to ffmpeg (mp4/webm/...); returns the
+    frame count. Frames are written as they arrive, nothing is buffered.
+    """
+    exe = shutil.which("ffmpeg")
+    if exe is None:
+        raise RuntimeError("ffmpeg not found on PATH (needed for video export; use a .gif path instead)")
+    frames = iter(frames)
+    first = next(frames)
+    h, w = first.shape[:2]
+    cmd = [exe, "-y", "-loglevel", "error", "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{w}x{h}",
+           "-r", f"{fps:g}", "-i", "-", "-c:v", codec, "-crf", str(crf), "-pix_fmt", "yuv420p",
+           "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2", str(path)]
+    proc = subprocess.Popen(cmd, stdin=subprocess.PIPE)
+    n = 0
+    try:
+        for rgb in itertools.chain([first], frames):
+            proc.stdin.write(np.ascontiguousarray(rgb, dtype=np.uint8).tobytes())
+            n += 1
+    finally:
+        proc.stdin.close()
+        if proc.wait() != 0:
+            raise RuntimeError(f"ffmpeg exited with status {proc.returncode}")
+    return n
+
@@ -0,0 +1,262 @@
+"""
+Building blocks for live matplotlib dashboards (scripts/dds_live.py,
+scripts/dual_live.py).
+
+Histories live in fixed NumPy rings, so a frame never walks a Python
+deque. Lines are plotted against "seconds ago", so the x axis never moves,
+and only the line artists are redrawn (blitting) unless an autoscale step
+changes the limits. Long histories are min/max decimated to about one
+point per pixel column.
+"""
+from __future__ import annotations
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+
+class Ring:
+    """
+    Fixed-capacity float ring whose newest `capacity` values are always
+    one contiguous slice: every value is written twice (at i and
+    i + capacity), so view() is zero-copy.
+    """
+
+    def __init__(self, capacity: int, width: int = 1):
+        self.capacity = int(capacity)
+        shape = (2 * self.capacity,) if width == 1 else (2 * self.capacity, width)
+        self._buf = np.full(shape, np.nan)
+        self._i = 0       # next write slot in [0, capacity)
+        self._n = 0
+
+    def __len__(self) -> int:
+        return self._n
+
+    def append(self, v) -> None:
+        self._buf[self._i] = self._buf[self._i + self.capacity] = v
+        self._i = (self._i + 1) % self.capacity
+        self._n = min(self._n + 1, self.capacity)
+
+    def extend(self, values) -> None:
+        v = np.asarray(values, dtype=float)[-self.capacity:]
+        m = len(v)
+        if m == 0:
+            return
+        first = min(m, self.capacity - self._i)
+        for off in (0, self.capacity):
+            self._buf[self._i + off:self._i + off + first] = v[:first]
+            self._buf[off:off + m - first] = v[first:]
+        self._i = (self._i + m) % self.capacity
+        self._n = min(self._n + m, self.capacity)
+
+    def view(self) -> np.ndarray:
+        """Oldest-to-newest values (read-only view, valid until the next write)."""
+        start = self._i + self.capacity - self._n
+        v = self._buf[start:start + self._n]
+        v.flags.writeable = False
+        return v
+
+    def last(self):
+        return self._buf[self._i - 1 + self.capacity] if self._n else None
+
+
+def minmax_decimate(x: np.ndarray, y: np.ndarray, max_points: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    At most ~max_points points that keep every bin's min and max (in
+    order), so spikes survive and the envelope looks exactly like the full
+    trace at screen resolution.
+    """
+    n = len(y)
+    if n <= max_points or max_points < 4:
+        return x, y
+    size = -(-n // (max_points // 2))
+    m = (n // size) * size
+    yb = y[:m].reshape(-1, size)
+    base = np.arange(yb.shape[0]) * size
+    imin, imax = yb.argmin(axis=1), yb.argmax(axis=1)
+    idx = np.empty(2 * len(base), dtype=np.intp)
+    idx[0::2] = base + np.minimum(imin, imax)
+    idx[1::2] = base + np.maximum(imin, imax)
+    if m < n:
+        idx = np.concatenate([idx, np.arange(m, n)])
+    return x[idx], y[idx]
+
+
+class LiveLine:
+    """
+    One trace: (t, y) history in Rings, drawn against seconds-before-now on
+    an axis with fixed x limits [-window_s, 0].
+
+    y limits autoscale with hysteresis: they change only when data leaves
+    them or fills less than 1/shrink of them, from the decimated envelope
+    (exact extremes, O(max_points) per frame).
+    """
+
+    def __init__(self, ax, capacity: int = 100_000, window_s: float = 10.0, max_points: int = 2000,
+                 autoscale: bool = True, pad: float = 0.1, shrink: float = 4.0, **line_kw):
+        self.ax = ax
+        self.t = Ring(capacity)
+        self.y = Ring(capacity)
+        self.window_s = float(window_s)
+        self.max_points = int(max_points)
+        self.autoscale = autoscale
+        self.pad, self.shrink = pad, shrink
+        (self.artist,) = ax.plot([], [], **line_kw)
+        ax.set_xlim(-self.window_s, 0.0)
+
+    def push(self, t: float, y: float) -> None:
+        self.t.append(t)
+        self.y.append(y)
+
+    def extend(self, t, y) -> None:
+        self.t.extend(t)
+        self.y.extend(y)
+
+    def refresh(self, now: float) -> bool:
+        """Update the artist; True when the axis limits changed (full redraw needed)."""
+        t, y = self.t.view(), self.y.view()
+        start = int(np.searchsorted(t, now - self.window_s))
+        xs, ys = minmax_decimate(t[start:] - now, y[start:], self.max_points)
+        self.artist.set_data(xs, ys)
+        if not self.autoscale or len(ys) == 0:
+            return False
+        lo, hi = float(np.nanmin(ys)), float(np.nanmax(ys))
+        if not np.isfinite(lo):
+            return False
+        cur_lo, cur_hi = self.ax.get_ylim()
+        span = max(hi - lo, 1e-12 * max(1.0, abs(hi)))
+        if lo >= cur_lo and hi <= cur_hi and (cur_hi - cur_lo) <= self.shrink * (1 + 2 * self.pad) * span:
+            return False
+        self.ax.set_ylim(lo - self.pad * span, hi + self.pad * span)
+        return True
+
+
+class PoincareTrail:
+    """Current point plus the last `length` points of a Stokes trajectory on a 3D axis."""
+
+    def __init__(self, ax3d, length: int = 500, **line_kw):
+        self.ax = ax3d
+        self.pts = Ring(length, width=3)
+        (self.dot,) = ax3d.plot([], [], [], marker="o", markersize=5, linestyle="None")
+        (self.path,) = ax3d.plot([], [], [], linewidth=1.2, **line_kw)
+
+    def push(self, s1: float, s2: float, s3: float) -> None:
+        self.pts.append((s1, s2, s3))
+
+    def extend(self, S: np.ndarray) -> None:
+        self.pts.extend(S)
+
+    def refresh(self, now: float = 0.0) -> bool:
+        p = self.pts.view()
+        if len(p):
+            self.path.set_data(p[:, 0], p[:, 1])
+            self.path.set_3d_properties(p[:, 2])
+            self.dot.set_data(p[-1:, 0], p[-1:, 1])
+            self.dot.set_3d_properties(p[-1:, 2])
+        return False
+
+    @property
+    def artists(self) -> list:
+        return [self.path, self.dot]
+
+
+def draw_sphere(ax3d, n_u: int = 48, n_v: int = 24, **kw) -> None:
+    """Unit-sphere wireframe and [-1, 1] limits on a 3D axis."""
+    u = np.linspace(0, 2 * np.pi, n_u)
+    v = np.linspace(0, np.pi, n_v)
+    ax3d.plot_wireframe(np.outer(np.cos(u), np.sin(v)), np.outer(np.sin(u), np.sin(v)),
+                        np.outer(np.ones_like(u), np.cos(v)), linewidth=kw.pop("linewidth", 0.2),
+                        alpha=kw.pop("alpha", 0.25), **kw)
+    ax3d.set_xlim(-1, 1); ax3d.set_ylim(-1, 1); ax3d.set_zlim(-1, 1)
+    ax3d.set_xlabel("S1"); ax3d.set_ylabel("S2"); ax3d.set_zlabel("S3")
+
+
+class LiveDashboard:
+    """
+    Owns a figure's live elements and redraws them.
+
+    update(now) refreshes every element; when the backend supports it
+    (and blit is not False) only the animated artists are redrawn over a
+    cached background, and a full draw happens only after a limit change
+    or a resize. run(step) drives update() from a canvas timer.
+    """
+
+    def __init__(self, fig, blit: Optional[bool] = None):
+        self.fig = fig
+        self.canvas = fig.canvas
+        self.blit = self.canvas.supports_blit if blit is None else (blit and self.canvas.supports_blit)
+        self.elements: List = []
+        self._bg = None
+        self._full = True
+        self.full_draws = 0
+        self.canvas.mpl_connect("draw_event", self._on_draw)
+
+    def line(self, ax, **kw) -> LiveLine:
+        el = LiveLine(ax, **kw)
+        self._add(el, [el.artist])
+        return el
+
+    def trail(self, ax3d, **kw) -> PoincareTrail:
+        el = PoincareTrail(ax3d, **kw)
+        self._add(el, el.artists)
+        return el
+
+    def _add(self, el, artists) -> None:
+        el._artists = artists
+        for a in artists:
+            a.set_animated(self.blit)
+        self.elements.append(el)
+
+    def _artists(self):
+        for el in self.elements:
+            yield from el._artists
+
+    def _on_draw(self, event) -> None:
+        if not self.blit:
+            return
+        self._bg = self.canvas.copy_from_bbox(self.fig.bbox)
+        for a in self._artists():
+            self.fig.draw_artist(a)
+
+    def _redraw(self) -> bool:
+        """Full draw after a limit change (recaching the background), else blit; True if blitted."""
+        if self._full or self._bg is None:
+            self._full = False
+            self.full_draws += 1
+            self.canvas.draw()       # _on_draw recaches the background
+            return False
+        self.canvas.restore_region(self._bg)
+        for a in self._artists():
+            self.fig.draw_artist(a)
+        return True
+
+    def update(self, now: float) -> None:
+        for el in self.elements:
+            self._full |= el.refresh(now)
+        if not self.blit:
+            self.canvas.draw_idle()
+            return
+        if self._redraw():
+            self.canvas.blit(self.fig.bbox)
+        self.canvas.flush_events()
+
+    def frame_rgb(self, now: float) -> np.ndarray:
+        """
+        Refresh and render one frame off-screen as (h, w, 3) uint8. Like
+        update(), only the animated artists are redrawn over the cached
+        background unless a limit changed.
+        """
+        for el in self.elements:
+            self._full |= el.refresh(now)
+        if self.blit:
+            self._redraw()
+        else:
+            self.canvas.draw()
+        return np.asarray(self.canvas.buffer_rgba())[:, :, :3].copy()
+
+    def run(self, step: Callable[[], float], interval_ms: int = 16):
+        """Call step() (returns 'now') then update() every interval_ms; returns the timer."""
+        timer = self.canvas.new_timer(interval=interval_ms)
+        timer.add_callback(lambda: self.update(step()))
+        timer.start()
+        self._timer = timer  # keep a reference so it is not collected
+        return timer
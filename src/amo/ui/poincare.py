@@ -1,29 +1,110 @@
 import numpy as np
 import matplotlib.pyplot as plt
 
-def plot_stokes_path(S_list):
-    """S_list: iterable of [S0,S1,S2,S3]"""
-    pts = []
-    for S in S_list:
-        S0 = S[0] if S[0] != 0 else 1.0
-        pts.append(np.array(S[1:4], dtype=float) / float(S0))
-    pts = np.array(pts)
-
-    fig = plt.figure()
-    ax = fig.add_subplot(111, projection='3d')
+from amo.ui.liveplot import draw_sphere
+
+DENSITY_ABOVE = 200_000     # plot_stokes_path switches to a density map above this many points
+
+
+def normalize_stokes(S) -> np.ndarray:
+    """(N, 4) Stokes vectors -> (N, 3) points S1..S3 / S0 (S0 == 0 is treated as 1)."""
+    S = np.asarray(S, dtype=float).reshape(-1, 4)
+    S0 = np.where(S[:, 0] != 0, S[:, 0], 1.0)
+    return S[:, 1:4] / S0[:, None]
+
+
+def decimate_arc(pts: np.ndarray, step: float = None, max_points: int = 5000) -> np.ndarray:
+    """
+    Indices of a path thinned to about one point per `step` of path length
+    (default: total length / max_points). Stretches where the state sits
+    still collapse to a point or two, fast moves keep their detail; the
+    first and last points are always kept. For points on the sphere the
+    segment lengths are the arc lengths to first order.
+    """
+    n = len(pts)
+    if n <= 2 or (step is None and n <= max_points):
+        return np.arange(n)
+    seg = np.sqrt(np.sum(np.diff(pts, axis=0) ** 2, axis=1))
+    s = np.concatenate([[0.0], np.cumsum(seg)])
+    if step is None:
+        step = s[-1] / max_points
+    if step <= 0:
+        return np.array([0, n - 1])
+    bins = np.floor(s / step)
+    keep = np.flatnonzero(np.diff(bins)) + 1
+    return np.unique(np.concatenate([[0], keep, [n - 1]]))
+
+
+def sphere_density(pts: np.ndarray, n_lon: int = 180, n_lat: int = 90):
+    """
+    Point counts on an equal-area (longitude, sin latitude) grid.
+    Returns (counts (n_lat, n_lon), lon edges, lat edges) in radians.
+    """
+    lon = np.arctan2(pts[:, 1], pts[:, 0])
+    r = np.sqrt(np.sum(pts ** 2, axis=1))
+    z = np.divide(pts[:, 2], r, out=np.zeros(len(pts)), where=r > 0)
+    i = np.clip(((z + 1) / 2 * n_lat).astype(int), 0, n_lat - 1)
+    j = np.clip(((lon + np.pi) / (2 * np.pi) * n_lon).astype(int), 0, n_lon - 1)
+    counts = np.bincount(i * n_lon + j, minlength=n_lat * n_lon).reshape(n_lat, n_lon)
+    lon_e = np.linspace(-np.pi, np.pi, n_lon + 1)
+    lat_e = np.arcsin(np.linspace(-1, 1, n_lat + 1))
+    return counts, lon_e, lat_e
 
-    # unit sphere wireframe
-    u = np.linspace(0, 2*np.pi, 64)
-    v = np.linspace(0, np.pi, 32)
-    x = np.outer(np.cos(u), np.sin(v))
-    y = np.outer(np.sin(u), np.sin(v))
-    z = np.outer(np.ones_like(u), np.cos(v))
-    ax.plot_wireframe(x, y, z, linewidth=0.3, alpha=0.3)
-
-    # path
-    ax.plot(pts[:,0], pts[:,1], pts[:,2], marker='o')
-    ax.set_xlabel('S1')
-    ax.set_ylabel('S2')
-    ax.set_zlabel('S3')
-    ax.set_title('Poincaré Path')
-    plt.show()
+
+def plot_density(ax, pts: np.ndarray, n_lon: int = 180, n_lat: int = 90, cmap: str = "viridis", log: bool = True):
+    """Colour the unit sphere on a 3D axis by how often each cell was visited."""
+    from matplotlib.colors import LogNorm, Normalize
+    counts, lon_e, lat_e = sphere_density(pts, n_lon, n_lat)
+    lon, lat = np.meshgrid(lon_e, lat_e)
+    x, y, z = np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)
+    c = counts.astype(float)
+    norm = LogNorm(vmin=1, vmax=max(2.0, c.max())) if log else Normalize(0, max(1.0, c.max()))
+    colors = plt.get_cmap(cmap)(norm(np.where(c > 0, c, np.nan)))
+    colors[c == 0] = (0.92, 0.92, 0.92, 0.15)
+    ax.plot_surface(x, y, z, facecolors=colors, rstride=1, cstride=1, linewidth=0, shade=False)
+    ax.set_xlim(-1, 1); ax.set_ylim(-1, 1); ax.set_zlim(-1, 1)
+    ax.set_xlabel('S1'); ax.set_ylabel('S2'); ax.set_zlabel('S3')
+    return counts
+
+
+def new_figure(headless: bool = False):
+    """A figure from pyplot, or with headless=True a bare Agg figure (no GUI, not tracked by pyplot)."""
+    if not headless:
+        return plt.figure()
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    fig = Figure()
+    FigureCanvasAgg(fig)
+    return fig
+
+
+def plot_stokes_path(S_list, max_points: int = 5000, density=None, save: str = None,
+                     title: str = 'Poincaré Path'):
+    """
+    S_list: iterable or (N, 4) array of [S0,S1,S2,S3]
+
+    The path is arc-length decimated to about max_points points; with
+    density=True (default: above DENSITY_ABOVE points) the sphere is drawn
+    as a visit-density map instead. With save the figure is rendered
+    off-screen to that file (no display needed); otherwise it is shown.
+    """
+    pts = normalize_stokes(S_list if isinstance(S_list, np.ndarray) else list(S_list))
+    if density is None:
+        density = len(pts) > DENSITY_ABOVE
+
+    fig = new_figure(headless=save is not None)
+    ax = fig.add_subplot(111, projection='3d')
+    if density:
+        plot_density(ax, pts)
+    else:
+        draw_sphere(ax, 64, 32, linewidth=0.3, alpha=0.3)
+        keep = decimate_arc(pts, max_points=max_points)
+        p = pts[keep]
+        ax.plot(p[:, 0], p[:, 1], p[:, 2], marker='o' if len(p) <= 500 else None,
+                linewidth=1.0 if len(p) > 500 else None)
+    ax.set_title(title)
+    if save is not None:
+        fig.savefig(save)
+    else:
+        plt.show()
+    return fig
@@ -1,8 +1,7 @@
 import typer
-import numpy as np
-from amo.optics.polarimetry import trace_stokes
-from amo.io.chain_loader import load_chain_json
-from amo.run.chain_exec import run_chain
+
+# numpy and the optics/run modules are imported inside the commands, so
+# --help starts without them.
 
 app = typer.Typer(no_args_is_help=True, help="Polarization tools")
 
@@ -11,6 +10,8 @@ def pol_demo(
     plot: bool = typer.Option(False, "--plot", help="Show Poincaré plot"),
 ):
     """H -> HWP(22.5) -> QWP(45) -> POL(0)"""
+    import numpy as np
+    from amo.optics.polarimetry import trace_stokes
     nodes = [
         {"type": "waveplate", "theta": 22.5, "retard": 180.0},
         {"type": "waveplate", "theta": 45.0, "retard": 90.0},
@@ -32,6 +33,9 @@ def pol_branch(
     plot: bool = typer.Option(False, "--plot", help="Show Poincaré plot"),
 ):
     """Run a JSON chain, selecting a PBS branch."""
+    import numpy as np
+    from amo.io.chain_loader import load_chain_json
+    from amo.run.chain_exec import run_chain
     nodes, E0 = load_chain_json(config)
     steps = run_chain(nodes, E0, cli_branch=branch)
     for s in steps:
@@ -41,6 +45,29 @@ def pol_branch(
         from amo.ui.poincare import plot_stokes_path
         plot_stokes_path([np.array(x["S"]) for x in steps])
 
+@app.command("pol-tree")
+def pol_tree(
+    config: str = typer.Argument(..., help="Path to chain JSON"),
+    as_json: bool = typer.Option(False, "--json", help="Print the nested branch tree as JSON"),
+    plot: bool = typer.Option(False, "--plot", help="Show leaf states on the Poincaré sphere"),
+):
+    """Run a JSON chain down every PBS branch at once."""
+    from amo.io.chain_loader import load_chain_json
+    from amo.run.chain_exec import run_chain_tree
+    nodes, E0 = load_chain_json(config)
+    tree = run_chain_tree(nodes, E0)
+    if as_json:
+        import json
+        typer.echo(json.dumps(tree.as_tree(), indent=2))
+    else:
+        width = max(6, len(tree.pbs_nodes))
+        for lf in tree.leaves():
+            S = lf["S"]
+            print(f"{lf['branch'] or '-':{width}s} P={lf['P']:.3f} S=[{S[0]:.3f},{S[1]:.3f},{S[2]:.3f},{S[3]:.3f}]")
+    if plot:
+        from amo.ui.poincare import plot_stokes_path
+        plot_stokes_path(tree.S)
+
 @app.command("pol-log")
 def pol_log(
     config: str = typer.Argument(..., help="Path to chain JSON"),
@@ -49,6 +76,8 @@ def pol_log(
     plot: bool = typer.Option(False, "--plot", help="Show Poincaré plot"),
 ):
     """Run a chain, log each step via TwinLogger, optionally plot."""
+    import numpy as np
+    from amo.io.chain_loader import load_chain_json
     from amo.run.pol_runner import run_and_log
     nodes, E0 = load_chain_json(config)
     steps = run_and_log(nodes, E0, branch, log_root=data_dir)
@@ -60,6 +89,29 @@ def pol_log(
         plot_stokes_path([np.array(x["S"]) for x in steps])
     typer.echo(f"✅ Logged {len(steps)} steps to {data_dir}/dds_*.jsonl")
 
+@app.command("pol-drift")
+def pol_drift(
+    log: str = typer.Argument(..., help="Twin log with pol_step events (.jsonl, .jsonl.gz or .amotwin)"),
+    node: int = typer.Option(-1, "--node", "-n", help="Node whose output to plot (-1: last node)"),
+    max_points: int = typer.Option(5000, "--max-points", help="Path points after arc-length decimation"),
+    density: bool = typer.Option(None, "--density/--path", help="Visit-density map or path (default: by size)"),
+    save: str = typer.Option(None, "--save", help="Render off-screen to this image file instead of showing"),
+):
+    """Plot logged polarization drift on the Poincaré sphere."""
+    import numpy as np
+    from amo.twin.replay import ReplayLog
+    from amo.ui.poincare import plot_stokes_path
+    batches = list(ReplayLog(log).batches("pol_step"))
+    if not batches:
+        raise typer.BadParameter(f"no pol_step events in {log}")
+    nodes = np.concatenate([b.columns["node"] for b in batches])
+    S = np.concatenate([b.S for b in batches])[nodes == (nodes.max() if node < 0 else node)]
+    typer.echo(f"{len(S)} states")
+    plot_stokes_path(S, max_points=max_points, density=density, save=save,
+                     title=f"Drift @node{node if node >= 0 else int(nodes.max())}")
+    if save:
+        typer.echo(f"Saved {save}")
+
 @app.command("pol-animate")
 def pol_animate(
     config: str = typer.Argument(..., help="Path to chain JSON"),
@@ -70,6 +122,9 @@ def pol_animate(
     after: int = typer.Option(-1, "--after", help="Plot Stokes after node index (use -1 for final)"),
 ):
     """Animate polarization by sweeping a node's theta."""
+    import numpy as np
+    from amo.io.chain_loader import load_chain_json
+    from amo.run.chain_exec import sweep_theta
     from amo.ui.animate import animate_stokes
     nodes, E0 = load_chain_json(config)
     if not (0 <= node < len(nodes)):
@@ -79,15 +134,11 @@ def pol_animate(
     except Exception:
         raise typer.BadParameter("sweep must be 'start:stop:step' in degrees")
 
+    if not (after == -1 or 0 <= after < len(nodes)):
+        raise typer.BadParameter(f"--after {after} out of range for chain length {len(nodes)}")
+
     thetas = np.arange(start, stop + 1e-9, step)
-    S_frames = []
-    for th in thetas:
-        nodes[node] = {**nodes[node], "theta": float(th)}
-        steps = run_chain(nodes, E0, cli_branch=branch)
-        idx = after if after != -1 else len(steps) - 1
-        if not (0 <= idx < len(steps)):
-            raise typer.BadParameter(f"--after {after} out of range for chain length {len(steps)}")
-        S_frames.append(np.array(steps[idx]["S"]))
+    S_frames = sweep_theta(nodes, E0, node, thetas, after=after, cli_branch=branch)
     animate_stokes(S_frames, interval_ms=interval_ms, title=f"Sweep theta@node{node} {start}:{stop}:{step}")
 
 if __name__ == "__main__":
@@ -4,19 +4,20 @@ AMO-Digital-Twin
 Core public API surface for now:
 - LightState
 - Pipeline
-- PolarizationBackend
+- PolarizationBackend, MuellerBackend
 - basic optics blocks
 """
 
 from .core.light import LightState
 from .core.pipeline import Pipeline
-from .core.backend import PolarizationBackend
+from .core.backend import PolarizationBackend, MuellerBackend
 from .blocks.basic_optics import Laser, HalfWavePlate, Mirror, PowerDetector
 
 __all__ = [
     "LightState",
     "Pipeline",
     "PolarizationBackend",
+    "MuellerBackend",
     "Laser",
     "HalfWavePlate",
     "Mirror",
@@ -10,6 +10,7 @@ from .basic_optics import (
     Mirror,
     NeutralDensityFilter,
     PowerDetector,
+    Depolarizer,
 )
 
 __all__ = [
@@ -24,4 +25,5 @@ __all__ = [
     "Mirror",
     "NeutralDensityFilter",
     "PowerDetector",
+    "Depolarizer",
 ]
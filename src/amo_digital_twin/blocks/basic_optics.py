@@ -7,6 +7,57 @@ import numpy as np
 
 from ..core.block import Block
 from ..core.light import LightState
+from ..core.mueller import apply_mueller, cached_mueller, depolarizer_mueller
+from ..core.noise import noise_from_spec
+
+
+def _rotation(theta: np.ndarray) -> np.ndarray:
+    """R = [[c, -s], [s, c]]; theta (rad) may be an array -> (..., 2, 2)."""
+    c, s = np.cos(theta), np.sin(theta)
+    R = np.empty(np.shape(theta) + (2, 2), dtype=np.complex128)
+    R[..., 0, 0] = c
+    R[..., 0, 1] = -s
+    R[..., 1, 0] = s
+    R[..., 1, 1] = c
+    return R
+
+
+def _retarder(theta: np.ndarray, e: Any) -> np.ndarray:
+    """R.T @ diag(1, e) @ R written out; broadcasts over theta and e."""
+    c, s = np.cos(theta), np.sin(theta)
+    cs = c * s * (e - 1.0)
+    J = np.empty(np.broadcast(theta, e).shape + (2, 2), dtype=np.complex128)
+    J[..., 0, 0] = c**2 + e * s**2
+    J[..., 0, 1] = cs
+    J[..., 1, 0] = cs
+    J[..., 1, 1] = s**2 + e * c**2
+    return J
+
+
+def _scalar_jones(amplitude: Any) -> np.ndarray:
+    """amplitude * identity; broadcasts over amplitude."""
+    a = np.asarray(amplitude, dtype=np.complex128)
+    return a[..., None, None] * np.eye(2, dtype=np.complex128)
+
+
+def _param(block: Block, key: str, default: float) -> np.ndarray:
+    return np.asarray(block.params.get(key, default), dtype=float)
+
+
+def _scalar_or_array(x: Any) -> Any:
+    """Plain float for 0-d values, ndarray for per-sample batches."""
+    arr = np.asarray(x)
+    return float(arr) if arr.ndim == 0 else arr
+
+
+def _apply_jones(J: np.ndarray, E: np.ndarray) -> np.ndarray:
+    """
+    J @ E where either side may carry a leading batch axis:
+    J (2,2) or (N,2,2), E (2,) or (N,2).
+    """
+    if J.ndim == 2:
+        return E @ J.T
+    return np.einsum("...ij,...j->...i", J, E)
 
 
 @dataclass
@@ -24,12 +75,12 @@ class Laser(Block):
         super().__init__(id=id, kind="laser", params=params)
 
     def _apply_pol(self, light: LightState) -> LightState:
-        angle_deg = float(self.params.get("pol_angle_deg", 0.0))
-        power_mw = float(self.params.get("power_mw", 1.0))
+        angle_deg = _param(self, "pol_angle_deg", 0.0)
+        power_mw = _scalar_or_array(_param(self, "power_mw", 1.0))
         wavelength_m = float(self.params.get("wavelength_m", 1064e-9))
 
         angle_rad = np.deg2rad(angle_deg)
-        E = np.array([np.cos(angle_rad), np.sin(angle_rad)], dtype=np.complex128)
+        E = np.stack([np.cos(angle_rad), np.sin(angle_rad)], axis=-1).astype(np.complex128)
 
         out = light.copy()
         out.mode = "POL"
@@ -39,6 +90,26 @@ class Laser(Block):
         out.meta["power_mw"] = power_mw
         return out
 
+    def _apply_mueller(self, light: LightState) -> LightState:
+        """
+        Extra param in Stokes mode:
+          - dop: degree of polarization of the source (default 1.0)
+        """
+        angle_rad = np.deg2rad(float(self.params.get("pol_angle_deg", 0.0)))
+        power_mw = float(self.params.get("power_mw", 1.0))
+        dop = float(self.params.get("dop", 1.0))
+
+        out = light.copy()
+        out.mode = "STOKES"
+        out.wavelength_m = float(self.params.get("wavelength_m", 1064e-9))
+        out.E = None
+        out.S = power_mw * np.array(
+            [1.0, dop * np.cos(2 * angle_rad), dop * np.sin(2 * angle_rad), 0.0]
+        )
+        out.dir = np.array([0.0, 0.0, 1.0])
+        out.meta["power_mw"] = power_mw
+        return out
+
 
 @dataclass
 class HalfWavePlate(Block):
@@ -52,22 +123,20 @@ class HalfWavePlate(Block):
     def __init__(self, id: str, **params: Any) -> None:
         super().__init__(id=id, kind="hwp", params=params)
 
+    def jones_matrix(self) -> np.ndarray:
+        theta = np.deg2rad(_param(self, "angle_deg", 0.0))
+        return _retarder(theta, -1.0)
+
     def _apply_pol(self, light: LightState) -> LightState:
         out = light.copy()
         if out.E is None:
             return out
-
-        angle_deg = float(self.params.get("angle_deg", 0.0))
-        theta = np.deg2rad(angle_deg)
-
-        c = np.cos(theta)
-        s = np.sin(theta)
-        R = np.array([[c, -s], [s, c]], dtype=np.complex128)
-        J = R.T @ np.diag([1.0, -1.0]) @ R
-
-        out.E = J @ out.E
+        out.E = _apply_jones(self.jones_matrix(), out.E)
         return out
 
+    def _apply_mueller(self, light: LightState) -> LightState:
+        return apply_mueller(light, cached_mueller(self.jones_matrix()))
+
 @dataclass
 class QuarterWavePlate(Block):
     """
@@ -84,25 +153,22 @@ class QuarterWavePlate(Block):
     def __init__(self, id: str, **params: Any) -> None:
         super().__init__(id=id, kind="qwp", params=params)
 
+    def jones_matrix(self) -> np.ndarray:
+        # Jones for ideal QWP with fast axis at angle theta.
+        # J = R(-θ) @ diag(1, i) @ R(θ)
+        theta = np.deg2rad(_param(self, "angle_deg", 0.0))
+        return _retarder(theta, 1.0j)
+
     def _apply_pol(self, light: LightState) -> LightState:
         out = light.copy()
         if out.E is None:
             return out
-
-        angle_deg = float(self.params.get("angle_deg", 0.0))
-        theta = np.deg2rad(angle_deg)
-
-        # Jones for ideal QWP with fast axis at angle theta.
-        # J = R(-θ) @ diag(1, i) @ R(θ)
-        c = np.cos(theta)
-        s = np.sin(theta)
-        R = np.array([[c, -s], [s, c]], dtype=np.complex128)
-        J_ret = np.diag([1.0 + 0.0j, 1.0j])
-        J = R.T @ J_ret @ R
-
-        out.E = J @ out.E
+        out.E = _apply_jones(self.jones_matrix(), out.E)
         return out
 
+    def _apply_mueller(self, light: LightState) -> LightState:
+        return apply_mueller(light, cached_mueller(self.jones_matrix()))
+
 @dataclass
 class GenericRetarder(Block):
     """
@@ -120,26 +186,22 @@ class GenericRetarder(Block):
     def __init__(self, id: str, **params: Any) -> None:
         super().__init__(id=id, kind="retarder", params=params)
 
+    def jones_matrix(self) -> np.ndarray:
+        # J = R(-θ) @ diag(1, e^{iδ}) @ R(θ)
+        theta = np.deg2rad(_param(self, "angle_deg", 0.0))
+        retardance_rad = _param(self, "retardance_rad", 0.0)
+        return _retarder(theta, np.exp(1j * retardance_rad))
+
     def _apply_pol(self, light: LightState) -> LightState:
         out = light.copy()
         if out.E is None:
             return out
-
-        angle_deg = float(self.params.get("angle_deg", 0.0))
-        retardance_rad = float(self.params.get("retardance_rad", 0.0))
-
-        theta = np.deg2rad(angle_deg)
-
-        # J = R(-θ) @ diag(1, e^{iδ}) @ R(θ)
-        c = np.cos(theta)
-        s = np.sin(theta)
-        R = np.array([[c, -s], [s, c]], dtype=np.complex128)
-        J_ret = np.diag([1.0 + 0.0j, np.exp(1j * retardance_rad)])
-        J = R.T @ J_ret @ R
-
-        out.E = J @ out.E
+        out.E = _apply_jones(self.jones_matrix(), out.E)
         return out
 
+    def _apply_mueller(self, light: LightState) -> LightState:
+        return apply_mueller(light, cached_mueller(self.jones_matrix()))
+
 @dataclass
 class PolarizationRotator(Block):
     """
@@ -155,21 +217,19 @@ class PolarizationRotator(Block):
     def __init__(self, id: str, **params: Any) -> None:
         super().__init__(id=id, kind="pol_rotator", params=params)
 
+    def jones_matrix(self) -> np.ndarray:
+        return _rotation(np.deg2rad(_param(self, "angle_deg", 0.0)))
+
     def _apply_pol(self, light: LightState) -> LightState:
         out = light.copy()
         if out.E is None:
             return out
-
-        angle_deg = float(self.params.get("angle_deg", 0.0))
-        theta = np.deg2rad(angle_deg)
-
-        c = np.cos(theta)
-        s = np.sin(theta)
-        R = np.array([[c, -s], [s, c]], dtype=np.complex128)
-
-        out.E = R @ out.E
+        out.E = _apply_jones(self.jones_matrix(), out.E)
         return out
 
+    def _apply_mueller(self, light: LightState) -> LightState:
+        return apply_mueller(light, cached_mueller(self.jones_matrix()))
+
 @dataclass
 class GlobalPhase(Block):
     """
@@ -185,16 +245,23 @@ class GlobalPhase(Block):
     def __init__(self, id: str, **params: Any) -> None:
         super().__init__(id=id, kind="global_phase", params=params)
 
+    def jones_matrix(self) -> np.ndarray:
+        return _scalar_jones(np.exp(1j * _param(self, "phase_rad", 0.0)))
+
     def _apply_pol(self, light: LightState) -> LightState:
         out = light.copy()
         if out.E is None:
             return out
 
-        phase_rad = float(self.params.get("phase_rad", 0.0))
-        out.E = np.exp(1j * phase_rad) * out.E
+        phase_rad = _param(self, "phase_rad", 0.0)
+        out.E = np.exp(1j * phase_rad)[..., None] * out.E
         # power |E|^2 is unchanged; meta["power_mw"] left as-is
         return out
 
+    def _apply_mueller(self, light: LightState) -> LightState:
+        # M is the identity: a global phase is invisible to Stokes parameters.
+        return apply_mueller(light, cached_mueller(self.jones_matrix()))
+
 @dataclass
 class JonesElement(Block):
     """
@@ -219,6 +286,12 @@ class JonesElement(Block):
     def __init__(self, id: str, **params: Any) -> None:
         super().__init__(id=id, kind="jones", params=params)
 
+    def jones_matrix(self) -> np.ndarray:
+        raw_mat = self.params.get("matrix", None)
+        if raw_mat is None:
+            return np.eye(2, dtype=np.complex128)
+        return np.array(raw_mat, dtype=np.complex128).reshape(2, 2)
+
     def _apply_pol(self, light: LightState) -> LightState:
         out = light.copy()
         if out.E is None:
@@ -229,10 +302,12 @@ class JonesElement(Block):
             # No-op if no matrix provided
             return out
 
-        M = np.array(raw_mat, dtype=np.complex128).reshape(2, 2)
-        out.E = M @ out.E
+        out.E = _apply_jones(self.jones_matrix(), out.E)
         return out
 
+    def _apply_mueller(self, light: LightState) -> LightState:
+        return apply_mueller(light, cached_mueller(self.jones_matrix()))
+
 
 @dataclass
 class NeutralDensityFilter(Block):
@@ -249,13 +324,19 @@ class NeutralDensityFilter(Block):
     def __init__(self, id: str, **params: Any) -> None:
         super().__init__(id=id, kind="nd_filter", params=params)
 
+    def jones_matrix(self) -> np.ndarray:
+        return _scalar_jones(np.sqrt(10.0 ** (-_param(self, "optical_density", 0.0))))
+
+    def _apply_mueller(self, light: LightState) -> LightState:
+        return apply_mueller(light, cached_mueller(self.jones_matrix()))
+
     def _apply_pol(self, light: LightState) -> LightState:
         out = light.copy()
-        od = float(self.params.get("optical_density", 0.0))
+        od = _scalar_or_array(_param(self, "optical_density", 0.0))
         T = 10.0 ** (-od)  # intensity transmission
 
         if out.E is not None:
-            out.E = np.sqrt(T) * out.E
+            out.E = np.sqrt(T)[..., None] * out.E if np.ndim(T) else np.sqrt(T) * out.E
 
         power = out.meta.get("power_mw")
         if power is not None:
@@ -275,12 +356,22 @@ class Mirror(Block):
     def __init__(self, id: str, **params: Any) -> None:
         super().__init__(id=id, kind="mirror", params=params)
 
+    def jones_matrix(self) -> np.ndarray:
+        return _scalar_jones(np.sqrt(_param(self, "reflectivity", 0.999)))
+
+    def _apply_mueller(self, light: LightState) -> LightState:
+        out = apply_mueller(light, cached_mueller(self.jones_matrix()))
+        if out.dir is not None:
+            d = out.dir
+            out.dir = np.array([d[0], d[1], -d[2]])
+        return out
+
     def _apply_pol(self, light: LightState) -> LightState:
         out = light.copy()
-        R = float(self.params.get("reflectivity", 0.999))
+        R = _scalar_or_array(_param(self, "reflectivity", 0.999))
 
         if out.E is not None:
-            out.E = np.sqrt(R) * out.E
+            out.E = np.sqrt(R)[..., None] * out.E if np.ndim(R) else np.sqrt(R) * out.E
         if out.dir is not None:
             d = out.dir
             out.dir = np.array([d[0], d[1], -d[2]])
@@ -296,16 +387,62 @@ class PowerDetector(Block):
     Simple power detector.
 
     Stores last reading in params["last_reading_mw"].
+
+    params:
+      - noise: optional NoiseStream or noise spec dict (see core.noise);
+        the noiseless value is then kept in params["last_ideal_mw"].
     """
 
     def __init__(self, id: str, **params: Any) -> None:
         super().__init__(id=id, kind="power_detector", params=params)
 
+    def _record(self, power: Any) -> None:
+        spec = self.params.get("noise")
+        if spec is None or power is None:
+            self.params["last_reading_mw"] = power
+            return
+        if getattr(self, "_noise_spec", None) is not spec:
+            # build the stream once per spec so its buffer and seed carry over
+            self._noise = noise_from_spec(spec, device_id=self.id)
+            self._noise_spec = spec
+        self.params["last_ideal_mw"] = power
+        self.params["last_reading_mw"] = self._noise.apply(power)
+
     def _apply_pol(self, light: LightState) -> LightState:
         out = light.copy()
         power = out.meta.get("power_mw", None)
-        self.params["last_reading_mw"] = power
+        self._record(power)
         return out
+
+    def _apply_mueller(self, light: LightState) -> LightState:
+        out = light.copy()
+        if out.S is None:
+            self._record(None)
+            return out
+        S0 = out.S[..., 0]
+        self._record(float(S0) if S0.ndim == 0 else S0.copy())
+        return out
+
+
+@dataclass
+class Depolarizer(Block):
+    """
+    Isotropic partial depolarizer (Stokes/Mueller backend only).
+
+    params:
+      - dop: fraction of the degree of polarization that survives [0,1]
+
+    Jones vectors cannot represent partially polarized light, so the
+    polarization backend passes light through unchanged.
+    """
+
+    def __init__(self, id: str, **params: Any) -> None:
+        super().__init__(id=id, kind="depolarizer", params=params)
+
+    def _apply_mueller(self, light: LightState) -> LightState:
+        return apply_mueller(light, depolarizer_mueller(_param(self, "dop", 1.0)))
+
+
 class Polarizer(Block):
     """
     Ideal linear polarizer.
@@ -318,27 +455,28 @@ class Polarizer(Block):
     def __init__(self, id: str, **params: Any) -> None:
         super().__init__(id=id, kind="polarizer", params=params)
 
+    def jones_matrix(self) -> np.ndarray:
+        theta = np.deg2rad(_param(self, "axis_deg", 0.0))
+        eff = _param(self, "efficiency", 1.0)
+        a = np.stack([np.cos(theta), np.sin(theta)], axis=-1).astype(np.complex128)
+        return np.asarray(eff)[..., None, None] * (a[..., :, None] * a[..., None, :])
+
+    def _apply_mueller(self, light: LightState) -> LightState:
+        return apply_mueller(light, cached_mueller(self.jones_matrix()))
+
     def _apply_pol(self, light: LightState) -> LightState:
         out = light.copy()
         if out.E is None:
             return out
 
-        axis_deg = float(self.params.get("axis_deg", 0.0))
-        eff = float(self.params.get("efficiency", 1.0))
-
-        theta = np.deg2rad(axis_deg)
-        # Unit vector along transmission axis
-        a = np.array([np.cos(theta), np.sin(theta)], dtype=np.complex128)
-
-        # Project E onto axis and scale
-        amp = np.vdot(a, out.E)  # inner product
-        out.E = eff * amp * a
+        # Project E onto the transmission axis and scale by efficiency
+        out.E = _apply_jones(self.jones_matrix(), out.E)
 
         # Update power estimate (proportional to |E|^2)
         power = out.meta.get("power_mw")
         if power is not None:
             # Transmission is |projection|^2 times efficiency
-            trans = float(np.vdot(out.E, out.E).real)
+            trans = _scalar_or_array(np.sum(np.abs(out.E) ** 2, axis=-1))
             out.meta["power_mw"] = power * trans
 
         return out
@@ -15,6 +15,7 @@ from .basic_optics import (
     Mirror,
     NeutralDensityFilter,
     PowerDetector,
+    Depolarizer,
 )
 from amo_digital_twin.core.block import Block
 
@@ -69,4 +70,5 @@ def default_block_registry() -> BlockRegistry:
     reg.register("mirror", Mirror)
     reg.register("nd", NeutralDensityFilter)
     reg.register("power_detector", PowerDetector)
+    reg.register("depolarizer", Depolarizer)
     return reg
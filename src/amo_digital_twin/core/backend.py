@@ -26,3 +26,18 @@ class PolarizationBackend(BackendProto):
         if hasattr(block, "_apply_pol"):
             return block._apply_pol(light)  # type: ignore[attr-defined]
         return light.copy()
+
+
+class MuellerBackend(BackendProto):
+    """
+    Stokes/Mueller backend (partial polarization, depolarization,
+    incoherent mixtures). Light travels as LightState.S in "STOKES" mode;
+    S may hold a batch of Stokes vectors with shape (N, 4).
+    """
+
+    name: str = "MUELLER"
+
+    def apply(self, block: Block, light: LightState) -> LightState:
+        if hasattr(block, "_apply_mueller"):
+            return block._apply_mueller(light)  # type: ignore[attr-defined]
+        return light.copy()
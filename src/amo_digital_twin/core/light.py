@@ -6,7 +6,7 @@ from typing import Literal, Dict, Any, Optional
 import numpy as np
 
 
-ModeType = Literal["POL", "RT"]  # "POL": polarization only, "RT": simple ray
+ModeType = Literal["POL", "RT", "STOKES"]  # "POL": polarization only, "RT": simple ray, "STOKES": partial polarization
 
 
 @dataclass
@@ -16,6 +16,7 @@ class LightState:
 
     - mode="POL": use Jones vector E (Ex, Ey) and direction dir.
     - mode="RT": later, use rays array.
+    - mode="STOKES": use Stokes vector S (S0 in mW), shape (4,) or a batch (N, 4).
     """
 
     mode: ModeType = "POL"
@@ -28,6 +29,8 @@ class LightState:
 
     rays: Optional[np.ndarray] = None  # placeholder for ray mode
 
+    S: Optional[np.ndarray] = None  # real, shape (4,) or (N, 4)
+
     def copy(self) -> "LightState":
         return LightState(
             mode=self.mode,
@@ -36,6 +39,7 @@ class LightState:
             E=None if self.E is None else self.E.copy(),
             dir=None if self.dir is None else self.dir.copy(),
             rays=None if self.rays is None else self.rays.copy(),
+            S=None if self.S is None else self.S.copy(),
         )
 # Convention for rays:
 # rays: shape (N, 8)
@@ -46,3 +50,6 @@ class LightState:
 
     def is_ray_mode(self) -> bool:
         return self.mode == "RT"
+
+    def is_stokes_mode(self) -> bool:
+        return self.mode == "STOKES"
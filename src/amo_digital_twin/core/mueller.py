@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Iterable
+
+import numpy as np
+
+from .light import LightState
+
+
+# Maps the coherency vector E ⊗ E* = [ExEx*, ExEy*, EyEx*, EyEy*] to Stokes
+# [S0, S1, S2, S3], with S3 = -2 Im(Ex Ey*) as in amo.optics.polarimetry.
+_A = np.array(
+    [
+        [1, 0, 0, 1],
+        [1, 0, 0, -1],
+        [0, 1, 1, 0],
+        [0, 1j, -1j, 0],
+    ],
+    dtype=np.complex128,
+)
+_A_INV = np.linalg.inv(_A)
+
+
+def stokes_from_jones(E: np.ndarray) -> np.ndarray:
+    """
+    Stokes vector(s) of Jones vector(s), shape (..., 2) -> (..., 4).
+    """
+    Ex, Ey = E[..., 0], E[..., 1]
+    Ix, Iy = np.abs(Ex) ** 2, np.abs(Ey) ** 2
+    C = Ex * np.conj(Ey)
+    return np.stack([Ix + Iy, Ix - Iy, 2.0 * C.real, -2.0 * C.imag], axis=-1)
+
+
+def mueller_from_jones(J: np.ndarray) -> np.ndarray:
+    """
+    Real 4x4 Mueller matrix of a (non-depolarizing) Jones matrix.
+
+    M = A (J ⊗ J*) A^-1; J may be a stack of shape (..., 2, 2).
+    """
+    J = np.asarray(J, dtype=np.complex128)
+    K = np.einsum("...ij,...kl->...ikjl", J, J.conj()).reshape(J.shape[:-2] + (4, 4))
+    return (_A @ K @ _A_INV).real
+
+
+@lru_cache(maxsize=4096)
+def _mueller_from_bytes(raw: bytes) -> np.ndarray:
+    M = mueller_from_jones(np.frombuffer(raw, dtype=np.complex128).reshape(2, 2))
+    M.flags.writeable = False
+    return M
+
+
+def cached_mueller(J: np.ndarray) -> np.ndarray:
+    """
+    mueller_from_jones() memoized on the matrix contents.
+
+    Blocks rebuild their Jones matrix from params on every call, so keying on
+    the matrix itself stays correct when params change. Stacks are not cached.
+    """
+    J = np.asarray(J, dtype=np.complex128)
+    if J.shape != (2, 2):
+        return mueller_from_jones(J)
+    return _mueller_from_bytes(np.ascontiguousarray(J).tobytes())
+
+
+def depolarizer_mueller(dop) -> np.ndarray:
+    """
+    Isotropic partial depolarizer: S0 kept, S1..S3 scaled by dop (0..1).
+    """
+    p = np.asarray(dop, dtype=float)
+    M = np.zeros(p.shape + (4, 4))
+    M[..., 0, 0] = 1.0
+    for k in (1, 2, 3):
+        M[..., k, k] = p
+    return M
+
+
+def apply_mueller(light: LightState, M: np.ndarray) -> LightState:
+    """
+    Apply M to light.S; S may be one Stokes vector (4,) or a batch (N, 4).
+    """
+    out = light.copy()
+    if out.S is None:
+        return out
+    if M.ndim == 2:
+        out.S = out.S @ M.T
+    else:
+        out.S = np.einsum("...ij,...j->...i", M, out.S)
+    return out
+
+
+def degree_of_polarization(S: np.ndarray) -> np.ndarray:
+    S = np.asarray(S, dtype=float)
+    S0 = S[..., 0]
+    pol = np.sqrt(np.sum(S[..., 1:] ** 2, axis=-1))
+    return np.divide(pol, S0, out=np.zeros_like(pol), where=S0 > 0)
+
+
+def to_stokes(light: LightState) -> LightState:
+    """
+    Convert a POL-mode LightState to STOKES mode.
+
+    S0 is scaled to meta["power_mw"] when present, otherwise it is |E|^2.
+    """
+    out = light.copy()
+    if out.mode == "STOKES" or out.E is None:
+        out.mode = "STOKES"
+        return out
+    S = stokes_from_jones(out.E)
+    power = out.meta.get("power_mw")
+    if power is not None:
+        S0 = S[..., :1]
+        S = np.divide(S * power, S0, out=np.zeros_like(S), where=S0 > 0)
+    out.mode = "STOKES"
+    out.S = S
+    out.E = None
+    return out
+
+
+def incoherent_sum(lights: Iterable[LightState]) -> LightState:
+    """
+    Combine mutually incoherent beams: their Stokes vectors simply add.
+    """
+    states = [to_stokes(ls) for ls in lights]
+    if not states:
+        raise ValueError("incoherent_sum needs at least one LightState")
+    out = states[0].copy()
+    out.S = sum(ls.S for ls in states[1:]) + states[0].S
+    out.meta["power_mw"] = out.S[..., 0] if out.S.ndim > 1 else float(out.S[0])
+    return out
@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+import zlib
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+H_PLANCK = 6.62607015e-34
+C_LIGHT = 299_792_458.0
+K_BOLTZMANN = 1.380649e-23
+
+
+def device_rng(seed: Optional[int], device_id: str, *stream: int) -> np.random.Generator:
+    """
+    Independent, reproducible Generator for one device (and sub-stream).
+
+    The same (seed, device_id, stream) always yields the same draws, and
+    different devices never share a stream. seed=None draws fresh entropy.
+    """
+    key = (zlib.crc32(device_id.encode("utf-8")),) + tuple(stream)
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=key))
+
+
+@dataclass
+class WhiteNoise:
+    """
+    Signal-independent Gaussian noise.
+
+    Fields:
+      - sigma_mw: standard deviation in mW
+    """
+
+    sigma_mw: float = 0.0
+
+    def unit_block(self, rng: np.random.Generator, n: int) -> np.ndarray:
+        return rng.standard_normal(n)
+
+    def sigma(self, signal_mw: np.ndarray) -> Any:
+        return self.sigma_mw
+
+
+@dataclass
+class ShotNoise:
+    """
+    Photon shot noise on an optical power, sigma_P = sqrt(2 h nu P B).
+
+    Fields:
+      - wavelength_m
+      - bandwidth_hz: detection bandwidth
+    """
+
+    wavelength_m: float = 1064e-9
+    bandwidth_hz: float = 1e3
+
+    def unit_block(self, rng: np.random.Generator, n: int) -> np.ndarray:
+        return rng.standard_normal(n)
+
+    def sigma(self, signal_mw: np.ndarray) -> Any:
+        photon_j = H_PLANCK * C_LIGHT / self.wavelength_m
+        power_w = np.maximum(signal_mw, 0.0) * 1e-3
+        return np.sqrt(2.0 * photon_j * power_w * self.bandwidth_hz) * 1e3
+
+
+@dataclass
+class JohnsonNoise:
+    """
+    Thermal noise of the transimpedance resistor, referred to optical power.
+
+    Fields:
+      - temperature_k
+      - resistance_ohm
+      - bandwidth_hz
+      - responsivity_a_per_w: photodiode responsivity
+    """
+
+    temperature_k: float = 295.0
+    resistance_ohm: float = 10e3
+    bandwidth_hz: float = 1e3
+    responsivity_a_per_w: float = 0.7
+
+    def unit_block(self, rng: np.random.Generator, n: int) -> np.ndarray:
+        return rng.standard_normal(n)
+
+    def sigma(self, signal_mw: np.ndarray) -> Any:
+        i_rms = np.sqrt(4.0 * K_BOLTZMANN * self.temperature_k * self.bandwidth_hz / self.resistance_ohm)
+        return i_rms / self.responsivity_a_per_w * 1e3
+
+
+@dataclass
+class RINNoise:
+    """
+    Relative intensity noise: sigma proportional to the signal.
+
+    Fields:
+      - rel_sigma: fractional standard deviation (e.g. 0.01 = 1%)
+    """
+
+    rel_sigma: float = 0.0
+
+    @classmethod
+    def from_db(cls, rin_db_hz: float, bandwidth_hz: float) -> "RINNoise":
+        """RIN spec in dB/Hz integrated over bandwidth_hz."""
+        return cls(rel_sigma=float(np.sqrt(10.0 ** (rin_db_hz / 10.0) * bandwidth_hz)))
+
+    def unit_block(self, rng: np.random.Generator, n: int) -> np.ndarray:
+        return rng.standard_normal(n)
+
+    def sigma(self, signal_mw: np.ndarray) -> Any:
+        return self.rel_sigma * np.abs(signal_mw)
+
+
+@dataclass
+class FlickerNoise:
+    """
+    1/f^alpha (pink for alpha=1) drift noise, signal independent.
+
+    Fields:
+      - sigma_mw: standard deviation in mW
+      - alpha: spectral exponent
+
+    Samples are shaped in the frequency domain one buffer block at a time,
+    so correlations reach up to the stream's block_size samples.
+    """
+
+    sigma_mw: float = 0.0
+    alpha: float = 1.0
+
+    def unit_block(self, rng: np.random.Generator, n: int) -> np.ndarray:
+        white = rng.standard_normal(n)
+        X = np.fft.rfft(white)
+        f = np.arange(X.size, dtype=float)
+        X[0] = 0.0
+        X[1:] /= f[1:] ** (self.alpha / 2.0)
+        y = np.fft.irfft(X, n)
+        std = y.std()
+        return y / std if std > 0 else y
+
+    def sigma(self, signal_mw: np.ndarray) -> Any:
+        return self.sigma_mw
+
+
+NOISE_MODELS = {
+    "white": WhiteNoise,
+    "shot": ShotNoise,
+    "johnson": JohnsonNoise,
+    "rin": RINNoise,
+    "flicker": FlickerNoise,
+}
+
+
+class NoiseStream:
+    """
+    Buffered, seedable noise source for one device.
+
+    Each model draws from its own child Generator and pre-generates unit
+    samples block_size at a time, so per-read cost is a slice. Because every
+    model's sequence is fixed by (seed, device_id, model index), results do
+    not depend on how reads are chunked.
+    """
+
+    def __init__(
+        self,
+        models: Sequence[Any],
+        seed: Optional[int] = None,
+        device_id: str = "",
+        block_size: int = 4096,
+    ) -> None:
+        self.models = list(models)
+        self.seed = seed
+        self.device_id = device_id
+        self.block_size = int(block_size)
+        self._rngs = [device_rng(seed, device_id, i) for i in range(len(self.models))]
+        self._bufs: List[np.ndarray] = [np.empty(0) for _ in self.models]
+        self._pos = [0 for _ in self.models]
+
+    def _take(self, i: int, n: int) -> np.ndarray:
+        buf, pos = self._bufs[i], self._pos[i]
+        if pos + n <= buf.size:
+            self._pos[i] = pos + n
+            return buf[pos:pos + n]
+        parts = [buf[pos:]]
+        have = buf.size - pos
+        model, rng = self.models[i], self._rngs[i]
+        while have < n:
+            buf = model.unit_block(rng, self.block_size)
+            parts.append(buf)
+            have += buf.size
+        self._bufs[i] = buf
+        self._pos[i] = buf.size - (have - n)
+        return np.concatenate(parts)[:n]
+
+    def sample(self, signal_mw: Any) -> np.ndarray:
+        """Noise to add to signal_mw (scalar or array), same shape."""
+        sig = np.asarray(signal_mw, dtype=float)
+        n = sig.size
+        noise = np.zeros(n)
+        for i, model in enumerate(self.models):
+            noise += model.sigma(sig.ravel()) * self._take(i, n)
+        return noise.reshape(sig.shape)
+
+    def apply(self, signal_mw: Any) -> Any:
+        """signal + noise; floats stay floats."""
+        out = np.asarray(signal_mw, dtype=float) + self.sample(signal_mw)
+        return float(out) if out.ndim == 0 else out
+
+
+def noise_from_spec(spec: Any, device_id: str = "") -> Optional[NoiseStream]:
+    """
+    Build a NoiseStream from a config dict (or pass an existing one through).
+
+    Schema:
+      {
+        "seed": 1234,
+        "block_size": 4096,
+        "models": [ { "type": "white", "sigma_mw": 0.05 }, { "type": "rin", "rel_sigma": 0.01 } ]
+      }
+    """
+    if spec is None or isinstance(spec, NoiseStream):
+        return spec
+    models_raw: List[Dict[str, Any]] = spec.get("models", [])
+    models = []
+    for m in models_raw:
+        kw = dict(m)
+        kind = kw.pop("type")
+        if kind not in NOISE_MODELS:
+            raise KeyError(f"Unknown noise model '{kind}' for device '{device_id}'")
+        models.append(NOISE_MODELS[kind](**kw))
+    return NoiseStream(
+        models,
+        seed=spec.get("seed"),
+        device_id=device_id,
+        block_size=int(spec.get("block_size", 4096)),
+    )
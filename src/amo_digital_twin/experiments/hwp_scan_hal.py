@@ -2,13 +2,14 @@ from __future__ import annotations
 
 import json
 from pathlib import Path
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 
 import numpy as np
 
 from amo_digital_twin.core.light import LightState
 from amo_digital_twin.core.backend import PolarizationBackend
 from amo_digital_twin.core.pipeline import Pipeline
+from amo_digital_twin.core.noise import NoiseStream, WhiteNoise
 from amo_digital_twin.blocks.basic_optics import (
     Laser,
     HalfWavePlate,
@@ -60,10 +61,17 @@ def run_hwp_scan_hal(
     stop_deg: float = 180.0,
     step_deg: float = 10.0,
     noise_std_mw: float = 0.0,
+    seed: Optional[int] = None,
+    noise: Optional[NoiseStream] = None,
 ) -> List[Tuple[float, float, float]]:
     """
     HWP scan using HAL-like devices.
 
+    Measurement noise comes from the power meter's NoiseStream: pass one via
+    `noise`, or a white-noise stream of noise_std_mw is attached (seeded by
+    `seed` for reproducible scans). A noise stream already configured on the
+    device is kept when neither is given.
+
     Returns list of (angle_cmd_deg, power_sim_mw, power_meas_mw).
     """
     backend = PolarizationBackend()
@@ -73,6 +81,10 @@ def run_hwp_scan_hal(
     lab = load_lab_hal("configs/hal_lab_example.json")
     motor = get_angle_device(lab, "hwp_motor")
     pm = get_power_device(lab, "pm1")
+    if noise is not None:
+        pm.noise = noise
+    elif noise_std_mw > 0.0:
+        pm.noise = NoiseStream([WhiteNoise(noise_std_mw)], seed=seed, device_id="pm1")
 
     angles = np.arange(start_deg, stop_deg + 1e-9, step_deg)
 
@@ -96,13 +108,8 @@ def run_hwp_scan_hal(
         pd = pipe.by_id("pd1")
         power_sim = float(pd.params.get("last_reading_mw", 0.0))
 
-        # Feed sim power into power channel + noise
-        if noise_std_mw > 0.0:
-            noisy = float(np.random.normal(loc=power_sim, scale=noise_std_mw))
-        else:
-            noisy = power_sim
-
-        pm.reading_mw = noisy  # MockPowerMeter field; real devices would measure
+        # Feed sim power into power channel; the meter adds its own noise
+        pm.reading_mw = power_sim  # MockPowerMeter field; real devices would measure
         power_meas = pm.read_power_mw()
 
         results.append((float(ang), power_sim, float(power_meas)))
@@ -1,10 +1,11 @@
 from __future__ import annotations
 
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 
 from amo_digital_twin.core.light import LightState
 from amo_digital_twin.core.backend import PolarizationBackend
 from amo_digital_twin.core.pipeline import Pipeline
+from amo_digital_twin.core.noise import NoiseStream, WhiteNoise
 from amo_digital_twin.blocks.basic_optics import (
     Laser,
     NeutralDensityFilter,
@@ -29,10 +30,16 @@ def build_nd_pipeline(od_guess: float) -> Pipeline:
 def run_nd_scan_hal(
     od_guess: float = 0.3,
     noise_std_mw: float = 0.05,
+    seed: Optional[int] = None,
+    noise: Optional[NoiseStream] = None,
 ) -> Tuple[float, float, float]:
     """
     Run a single ND measurement via HAL.
 
+    Pass the same `noise` stream across repeated calls to get successive,
+    independent draws; otherwise a white-noise stream of noise_std_mw seeded
+    by `seed` is attached to the power meter.
+
     Returns (power_in_mw, power_sim_out_mw, power_meas_out_mw).
     """
     backend = PolarizationBackend()
@@ -45,6 +52,10 @@ def run_nd_scan_hal(
     # Load HAL, get power meter
     lab = load_lab_hal("configs/hal_lab_example.json")
     pm = get_power_device(lab, "pm1")
+    if noise is not None:
+        pm.noise = noise
+    elif noise_std_mw > 0.0:
+        pm.noise = NoiseStream([WhiteNoise(noise_std_mw)], seed=seed, device_id="pm1")
 
     # Run sim
     light_in = LightState()
@@ -53,15 +64,8 @@ def run_nd_scan_hal(
     pd = pipe.by_id("pd1")
     power_sim = float(pd.params.get("last_reading_mw", 0.0))
 
-    # Add measurement noise
-    import numpy as np
-
-    if noise_std_mw > 0.0:
-        power_meas = float(np.random.normal(loc=power_sim, scale=noise_std_mw))
-    else:
-        power_meas = power_sim
-
-    pm.reading_mw = power_meas
+    # Measurement noise is added by the power meter on read
+    pm.reading_mw = power_sim
 
     return power_in, power_sim, pm.read_power_mw()
 
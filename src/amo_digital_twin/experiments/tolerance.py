@@ -0,0 +1,271 @@
+from __future__ import annotations
+
+import argparse
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+from amo_digital_twin.core.light import LightState
+from amo_digital_twin.core.backend import PolarizationBackend
+from amo_digital_twin.core.circuit_config import (
+    CircuitConfig,
+    load_circuit_config,
+    build_pipeline_from_config,
+)
+
+
+@dataclass
+class ParamTolerance:
+    """
+    Random error added to one block parameter around its nominal config value.
+
+    Fields:
+      - target: "<block_id>.<param>" (e.g. "hwp1.angle_deg")
+      - dist: "uniform" (scale = half width) or "normal" (scale = sigma)
+      - scale: size of the error, in the parameter's own units
+    """
+
+    target: str
+    dist: str = "uniform"
+    scale: float = 0.0
+
+    def __post_init__(self) -> None:
+        if "." not in self.target:
+            raise ValueError(f"Tolerance target '{self.target}' must be 'block_id.param'")
+        if self.dist not in ("uniform", "normal"):
+            raise ValueError(f"Unknown distribution '{self.dist}' (use uniform or normal)")
+
+    @property
+    def block_id(self) -> str:
+        return self.target.split(".", 1)[0]
+
+    @property
+    def param(self) -> str:
+        return self.target.split(".", 1)[1]
+
+    def sample(self, rng: np.random.Generator, nominal: float, n: int) -> np.ndarray:
+        if self.dist == "normal":
+            return rng.normal(nominal, self.scale, n)
+        return rng.uniform(nominal - self.scale, nominal + self.scale, n)
+
+
+@dataclass
+class DetectorStats:
+    """
+    Streaming summary of one detector's readings.
+
+    Keeps a fixed-bin histogram plus running mean/variance, so memory does
+    not grow with the number of samples. Values outside the histogram range
+    are only counted (under/over) and clamp the quantile estimates.
+    """
+
+    edges: np.ndarray
+    spec: Optional[Tuple[float, float]] = None
+    counts: np.ndarray = field(init=False)
+    under: int = 0
+    over: int = 0
+    n: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    min: float = np.inf
+    max: float = -np.inf
+    in_spec: int = 0
+
+    def __post_init__(self) -> None:
+        self.counts = np.zeros(len(self.edges) - 1, dtype=np.int64)
+
+    def update(self, values: np.ndarray) -> None:
+        v = np.asarray(values, dtype=float).ravel()
+        if v.size == 0:
+            return
+        self.counts += np.histogram(v, bins=self.edges)[0]
+        self.under += int(np.count_nonzero(v < self.edges[0]))
+        self.over += int(np.count_nonzero(v > self.edges[-1]))
+
+        # Chan et al. parallel merge of (n, mean, M2)
+        nb, mb = v.size, float(v.mean())
+        m2b = float(np.sum((v - mb) ** 2))
+        delta = mb - self.mean
+        n = self.n + nb
+        self.mean += delta * nb / n
+        self.m2 += m2b + delta**2 * self.n * nb / n
+        self.n = n
+
+        self.min = min(self.min, float(v.min()))
+        self.max = max(self.max, float(v.max()))
+        if self.spec is not None:
+            lo, hi = self.spec
+            self.in_spec += int(np.count_nonzero((v >= lo) & (v <= hi)))
+
+    @property
+    def std(self) -> float:
+        return float(np.sqrt(self.m2 / (self.n - 1))) if self.n > 1 else 0.0
+
+    @property
+    def yield_fraction(self) -> Optional[float]:
+        if self.spec is None or self.n == 0:
+            return None
+        return self.in_spec / self.n
+
+    def quantile(self, q: float) -> float:
+        """Histogram estimate of the q-quantile (0..1), linear within a bin."""
+        if self.n == 0:
+            return float("nan")
+        target = q * self.n
+        cdf = self.under + np.cumsum(self.counts)
+        i = int(np.searchsorted(cdf, target))
+        if i >= len(self.counts):
+            return float(self.edges[-1])
+        below = cdf[i] - self.counts[i]
+        if target <= below:
+            return float(self.edges[i])
+        frac = (target - below) / self.counts[i]
+        return float(self.edges[i] + frac * (self.edges[i + 1] - self.edges[i]))
+
+    def summary(self, quantiles: Tuple[float, ...] = (0.01, 0.05, 0.5, 0.95, 0.99)) -> Dict[str, Any]:
+        return {
+            "n": self.n,
+            "mean": self.mean,
+            "std": self.std,
+            "min": self.min,
+            "max": self.max,
+            "quantiles": {q: self.quantile(q) for q in quantiles},
+            "yield": self.yield_fraction,
+        }
+
+
+@dataclass
+class ToleranceResult:
+    circuit: str
+    n_samples: int
+    seed: Optional[int]
+    detectors: Dict[str, DetectorStats] = field(default_factory=dict)
+
+
+def load_tolerances(data: Dict[str, Any]) -> List[ParamTolerance]:
+    """
+    Build tolerances from {"hwp1.angle_deg": {"dist": "uniform", "scale": 0.5}, ...}.
+    """
+    return [
+        ParamTolerance(target=t, dist=d.get("dist", "uniform"), scale=float(d.get("scale", 0.0)))
+        for t, d in data.items()
+    ]
+
+
+def run_tolerance_analysis(
+    cfg: CircuitConfig,
+    tolerances: List[ParamTolerance],
+    n_samples: int = 1_000_000,
+    chunk_size: int = 65_536,
+    seed: Optional[int] = None,
+    specs: Optional[Dict[str, Tuple[float, float]]] = None,
+    bins: int = 200,
+    hist_range: Optional[Dict[str, Tuple[float, float]]] = None,
+) -> ToleranceResult:
+    """
+    Monte-Carlo yield / spread of every power detector in a circuit.
+
+    Each chunk writes per-sample parameter arrays into the blocks and runs the
+    pipeline once; blocks broadcast over the leading sample axis, so a chunk
+    costs a handful of NumPy ops per block. Only DetectorStats are kept.
+
+    specs / hist_range are keyed by detector id. Without a hist_range the
+    histogram spans the first chunk's readings (padded by 5%).
+    """
+    specs = specs or {}
+    hist_range = hist_range or {}
+    rng = np.random.default_rng(seed)
+    backend = PolarizationBackend()
+    pipe = build_pipeline_from_config(cfg)
+
+    spec_by_id = {b.id: b for b in cfg.blocks}
+    nominal: List[float] = []
+    for tol in tolerances:
+        spec = spec_by_id.get(tol.block_id)
+        if spec is None:
+            raise KeyError(f"Tolerance target '{tol.target}': no block '{tol.block_id}' in circuit")
+        if tol.param not in spec.params:
+            raise KeyError(f"Tolerance target '{tol.target}': param must be set in the config")
+        nominal.append(float(spec.params[tol.param]))
+
+    detectors = [b for b in pipe.blocks if b.kind == "power_detector"]
+    if not detectors:
+        raise ValueError(f"Circuit '{cfg.name}' has no power_detector blocks")
+
+    result = ToleranceResult(circuit=cfg.name, n_samples=n_samples, seed=seed)
+    done = 0
+    while done < n_samples:
+        n = min(chunk_size, n_samples - done)
+        for tol, nom in zip(tolerances, nominal):
+            pipe.by_id(tol.block_id).params[tol.param] = tol.sample(rng, nom, n)
+        pipe.run(LightState(), backend)
+
+        for det in detectors:
+            reading = det.params.get("last_reading_mw")
+            values = np.broadcast_to(np.asarray(reading, dtype=float), (n,))
+            stats = result.detectors.get(det.id)
+            if stats is None:
+                lo, hi = hist_range.get(det.id, (float(values.min()), float(values.max())))
+                pad = 0.05 * (hi - lo) if hi > lo else max(1e-12, 0.05 * abs(hi))
+                stats = DetectorStats(
+                    edges=np.linspace(lo - pad, hi + pad, bins + 1),
+                    spec=specs.get(det.id),
+                )
+                result.detectors[det.id] = stats
+            stats.update(values)
+        done += n
+    return result
+
+
+def _parse_tol(text: str) -> ParamTolerance:
+    # hwp1.angle_deg=0.5  or  hwp1.angle_deg=normal:0.5
+    target, _, rhs = text.partition("=")
+    dist, _, scale = rhs.rpartition(":")
+    return ParamTolerance(target=target.strip(), dist=dist or "uniform", scale=float(scale))
+
+
+def _parse_spec(text: str) -> Tuple[str, Tuple[float, float]]:
+    # pd1=2.0:3.0
+    det, _, rng = text.partition("=")
+    lo, hi = (float(x) for x in rng.split(":"))
+    return det.strip(), (lo, hi)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Monte-Carlo tolerance analysis of a circuit config")
+    ap.add_argument("config", help="circuit JSON (see configs/)")
+    ap.add_argument("--tol", action="append", default=[],
+                    help="block.param=[uniform|normal:]scale, repeatable")
+    ap.add_argument("--tol-file", help="JSON {target: {dist, scale}}")
+    ap.add_argument("--spec", action="append", default=[], help="detector=lo:hi (mW), repeatable")
+    ap.add_argument("-n", "--samples", type=float, default=1e6)
+    ap.add_argument("--chunk", type=int, default=65_536)
+    ap.add_argument("--seed", type=int, default=None)
+    ap.add_argument("--bins", type=int, default=200)
+    args = ap.parse_args()
+
+    tolerances = [_parse_tol(t) for t in args.tol]
+    if args.tol_file:
+        tolerances += load_tolerances(json.loads(Path(args.tol_file).read_text()))
+    specs = dict(_parse_spec(s) for s in args.spec)
+
+    cfg = load_circuit_config(args.config)
+    res = run_tolerance_analysis(
+        cfg, tolerances, n_samples=int(args.samples), chunk_size=args.chunk,
+        seed=args.seed, specs=specs, bins=args.bins,
+    )
+
+    print(f"=== Tolerance analysis: {res.circuit} ({res.n_samples} samples, seed={res.seed}) ===")
+    for tol in tolerances:
+        print(f"  {tol.target}: {tol.dist} ±{tol.scale}")
+    for det_id, st in res.detectors.items():
+        s = st.summary()
+        q = "  ".join(f"p{100 * k:g}={v:.4f}" for k, v in s["quantiles"].items())
+        print(f"{det_id}: mean={s['mean']:.4f} std={s['std']:.4f} min={s['min']:.4f} max={s['max']:.4f}")
+        print(f"  {q}")
+        if s["yield"] is not None:
+            lo, hi = st.spec  # type: ignore[misc]
+            print(f"  yield [{lo}, {hi}] mW: {100 * s['yield']:.3f}%")
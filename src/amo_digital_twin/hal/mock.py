@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from typing import Any, Optional
 
+from ..core.noise import NoiseStream, noise_from_spec
 from .base import Device, Capability
 
 
@@ -9,16 +11,24 @@ from .base import Device, Capability
 class MockPowerMeter(Device):
     """
     Mock power meter.
+
+    noise: optional NoiseStream (or spec dict, see core.noise) applied to
+    every read; seeded per device id, so runs are reproducible.
     """
 
     reading_mw: float = 0.0
+    noise: Optional[NoiseStream] = None
 
-    def __init__(self, id: str = "mock_pm", model: str = "mock") -> None:
+    def __init__(self, id: str = "mock_pm", model: str = "mock", noise: Any = None) -> None:
         caps = [Capability(name="read_power_mw", kind="read", units="mW")]
         super().__init__(id=id, model=model, capabilities=caps)
+        self.reading_mw = 0.0
+        self.noise = noise_from_spec(noise, device_id=id)
 
     def read_power_mw(self) -> float:
-        return float(self.reading_mw)
+        if self.noise is None:
+            return float(self.reading_mw)
+        return float(self.noise.apply(self.reading_mw))
 
 
 @dataclass
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import json
 from pathlib import Path
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Optional, Tuple
 
 import numpy as np
 
@@ -42,6 +42,7 @@ def save_twin_params(data: Dict[str, Any]) -> None:
 def calibrate_hwp_offset(
     scan_step_deg: float = 10.0,
     noise_std_mw: float = 0.05,
+    seed: Optional[int] = None,
 ) -> float:
     """
     Run a HWP scan via HAL, fit the offset_deg, and write it into
@@ -53,6 +54,7 @@ def calibrate_hwp_offset(
     data: List[Tuple[float, float, float]] = run_hwp_scan_hal(
         step_deg=scan_step_deg,
         noise_std_mw=noise_std_mw,
+        seed=seed,
     )
 
     angles = np.array([d[0] for d in data], dtype=float)
@@ -2,10 +2,11 @@ from __future__ import annotations
 
 import json
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 import numpy as np
 
+from amo_digital_twin.core.noise import NoiseStream, WhiteNoise
 from amo_digital_twin.experiments.nd_scan_hal import run_nd_scan_hal
 
 
@@ -26,6 +27,7 @@ def calibrate_nd_optical_density(
     od_guess: float = 0.3,
     noise_std_mw: float = 0.05,
     repeats: int = 10,
+    seed: Optional[int] = None,
 ) -> float:
     """
     Estimate ND optical density from repeated measurements.
@@ -33,11 +35,14 @@ def calibrate_nd_optical_density(
     For each run, we measure (P_in, P_out_meas), compute T = P_out / P_in,
     average T, and set OD = -log10(T).
     """
+    # One stream for all repeats, so each run gets fresh (but seeded) noise
+    noise = NoiseStream([WhiteNoise(noise_std_mw)], seed=seed, device_id="pm1") if noise_std_mw > 0.0 else None
     Ts = []
     for _ in range(repeats):
         pin, _psim, pmeas = run_nd_scan_hal(
             od_guess=od_guess,
             noise_std_mw=noise_std_mw,
+            noise=noise,
         )
         if pin <= 0.0:
             continue
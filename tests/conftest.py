@@ -0,0 +1,53 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+class InfluxStandIn:
+    """Minimal /api/v2/write endpoint that records line protocol bodies."""
+
+    def __init__(self):
+        self.bodies = []
+        self.available = threading.Event()
+        self.available.set()
+        self.reject = lambda body: False  # bodies answered with 400, like bad line protocol
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if not stand_in.available.is_set():
+                    self.send_response(503)
+                    self.end_headers()
+                    return
+                if stand_in.reject(body):
+                    self.send_response(400)
+                    self.end_headers()
+                    return
+                stand_in.bodies.append(body)
+                self.send_response(204)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+
+    @property
+    def lines(self):
+        return [ln for b in self.bodies for ln in b.decode().splitlines() if ln]
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def influx_server():
+    srv = InfluxStandIn()
+    yield srv
+    srv.close()
@@ -0,0 +1,37 @@
+from benchmarks import harness
+
+
+def test_compare_flags_regressions_with_case_tolerance():
+    base = {"a": {"value": 1.0}, "b": {"value": 1.0}, "c": {"value": 1.0}, "gone": {"value": 1.0}}
+    now = {"a": {"value": 1.2}, "b": {"value": 1.6}, "c": {"value": 2.5, "tolerance": 2.0},
+           "d": {"value": 1.0}}
+    rows = {r.name: r.status for r in harness.compare(now, base, threshold=0.25)}
+    assert rows == {"a": "ok", "b": "REGRESSED", "c": "ok", "d": "new", "gone": "missing"}
+    assert "REGRESSED" in harness.report(harness.compare(now, base))
+
+
+def test_run_cases_and_results_roundtrip(tmp_path, monkeypatch):
+    monkeypatch.setattr(harness, "CASES", {})
+    harness.case("one")(lambda quick: harness.timeit(lambda: sum(range(100)), repeat=2, min_time=0.001))
+    harness.case("sizes", unit="us")(lambda quick: {"n=1": 1.0, "n=2": 2.0})
+    res = harness.run_cases(quick=True)
+    assert set(res) == {"one", "sizes[n=1]", "sizes[n=2]"}
+    assert 0 < res["one"]["value"] < 1e-3 and res["sizes[n=2]"]["unit"] == "us"
+    assert set(harness.run_cases(["sizes"], exact=True)) == {"sizes[n=1]", "sizes[n=2]"}
+    path = harness.write_results(tmp_path / "r.json", res)
+    assert harness.load_results(path) == res
+
+
+def test_quick_run_is_not_compared_to_full_baseline(tmp_path, monkeypatch, capsys):
+    from benchmarks import run
+
+    res = {"one": {"value": 1.0, "unit": "s"}}
+    monkeypatch.setattr(harness, "run_cases", lambda *a, **kw: {k: dict(v) for k, v in res.items()})
+    base = harness.write_results(tmp_path / "base.json", {**res, "big[n=64]": {"value": 1.0}})
+    argv = ["--baseline", str(base), "--out", str(tmp_path / "r.json"), "--check"]
+    assert run.main(argv + ["--quick"]) == 1
+    assert "not compared" in capsys.readouterr().out
+    assert harness.load_meta(tmp_path / "r.json")["quick"] is True
+
+    harness.write_results(base, res, quick=True)
+    assert run.main(argv + ["--quick"]) == 0
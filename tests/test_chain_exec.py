@@ -0,0 +1,37 @@
+import itertools
+import numpy as np
+from amo.run.chain_exec import run_chain, run_chain_tree, sweep_theta
+
+NODES = [
+    {"type": "waveplate", "theta": 10.0, "retard": 90.0},
+    {"type": "pbs", "theta": 30.0, "branch": None},
+    {"type": "waveplate", "theta": 22.5, "retard": 180.0},
+    {"type": "pbs", "theta": 0.0, "branch": None},
+    {"type": "polarizer", "theta": 15.0},
+]
+E0 = np.array([1.0 + 0j, 0.0 + 0j])
+
+def test_tree_matches_single_branch_runs():
+    tree = run_chain_tree(NODES, E0)
+    assert sorted(tree.branches) == ["RR", "RT", "TR", "TT"]
+    for b1, b2 in itertools.product("TR", repeat=2):
+        nodes = [dict(n) for n in NODES]
+        nodes[1]["branch"], nodes[3]["branch"] = b1, b2
+        S = run_chain(nodes, E0)[-1]["S"]
+        assert np.allclose(tree.S[tree.branches.index(b1 + b2)], S)
+
+def test_tree_nesting_conserves_power():
+    root = run_chain_tree(NODES[:4], E0).as_tree()
+    assert root["node"] == 1 and root["T"]["node"] == 3
+    assert np.isclose(root["P"], 1.0)
+
+def test_sweep_matches_per_theta_runs():
+    nodes = [dict(n, branch="T") if n["type"] == "pbs" else n for n in NODES]
+    thetas = np.linspace(0.0, 90.0, 7)
+    for node, after in [(0, -1), (2, 3), (3, -1), (4, 1)]:
+        frames = sweep_theta(nodes, E0, node, thetas, after=after)
+        assert frames.shape == (len(thetas), 4)
+        for th, S in zip(thetas, frames):
+            swept = [dict(n) for n in nodes]
+            swept[node]["theta"] = th
+            assert np.allclose(run_chain(swept, E0)[after]["S"], S)
@@ -0,0 +1,37 @@
+import json
+import os
+import subprocess
+import sys
+
+# Import budget for the CLI modules, in ms (set AMO_CLI_STARTUP_MS on slow machines).
+BUDGET_MS = float(os.environ.get("AMO_CLI_STARTUP_MS", "250"))
+
+_PROBE = """
+import json, sys, time
+t = time.perf_counter()
+import amo.ui.cli, amo.ui.pol_cli
+dt = (time.perf_counter() - t) * 1e3
+print(json.dumps({"ms": dt, "loaded": [m for m in %r if m in sys.modules]}))
+"""
+HEAVY = ["numpy", "influxdb_client", "amo.io.sinks.influx", "amo.io.loggers.rga", "amo.hw", "amo.twin"]
+
+
+def _probe():
+    out = subprocess.run([sys.executable, "-c", _PROBE % HEAVY], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout)
+
+
+def test_cli_import_skips_heavy_dependencies():
+    assert _probe()["loaded"] == []
+
+
+def test_cli_import_within_budget():
+    best = min(_probe()["ms"] for _ in range(3))
+    assert best < BUDGET_MS, f"CLI import took {best:.0f} ms (budget {BUDGET_MS:.0f} ms)"
+
+
+def test_lazy_package_attributes():
+    import amo
+    assert amo.twin.TwinLogger is not None
+    from amo.twin import ColumnarTwinLogger
+    assert ColumnarTwinLogger.__module__ == "amo.twin.columnar"
@@ -0,0 +1,39 @@
+import numpy as np
+
+from amo.hw.dds_sim import SimDDS, STATE_DTYPE
+
+
+def test_writes_are_latched_by_apply_update():
+    d = SimDDS(seed=0)
+    d.set_frequency(1, 2e6)
+    assert d.get_frequency(1) == 2e6
+    assert d.read_state()["ch"][1]["f_Hz"] == 0.0
+    d.apply_update()
+    assert d.read_state()["ch"][1]["f_Hz"] == 2e6
+
+
+def test_set_many_and_structured_readback():
+    n = 256
+    d = SimDDS(n_ch=n, seed=1)
+    ch = np.arange(0, n, 2)
+    d.set_many(ch, f_hz=1e6 + ch, phase_deg=400.0, amp=np.linspace(-1, 2, ch.size))
+    d.apply_update()
+    st = d.read_state_array()
+    assert st.dtype == STATE_DTYPE and st.shape == (n,)
+    assert np.array_equal(st["ch"], np.arange(n))
+    assert np.array_equal(st["f_Hz"][ch], 1e6 + ch) and not st["f_Hz"][1::2].any()
+    assert np.allclose(st["phase_deg"][ch], 40.0)
+    assert st["amp"].min() == 0.0 and st["amp"].max() == 1.0
+    st["f_Hz"][:] = -1  # caller owns the copy
+    assert d.read_state_array()["f_Hz"][0] == 1e6
+
+
+def test_read_state_matches_array_view():
+    a, b = SimDDS(seed=3), SimDDS(seed=3)
+    for d in (a, b):
+        d.set_many([0, 1], amp=[0.5, 0.25])
+        d.apply_update()
+    rows = a.read_state()["ch"]
+    st = b.read_state_array()
+    assert [r["power_est"] for r in rows] == st["power_est"].tolist()
+    assert [r["amp"] for r in rows] == [0.5, 0.25, 0.0, 0.0]
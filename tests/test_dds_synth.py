@@ -0,0 +1,113 @@
+import numpy as np
+import pytest
+
+from amo.hw.dds_sim import SimDDS
+from amo.hw.dds_synth import DDSSynth, RingBuffer, ftw_to_hz, ftw
+
+FS = 500e6
+
+
+def test_tone_frequency_phase_and_amplitude():
+    s = DDSSynth(1, FS)
+    s.set_tone(0, 10e6, phase_deg=90.0, amp=0.5)
+    x = s.render(1 << 15)[0]
+    assert x[0] == pytest.approx(0.5, abs=1e-3)
+    spec = np.abs(np.fft.rfft(x))
+    f_peak = np.argmax(spec) * FS / x.size
+    assert abs(f_peak - 10e6) <= FS / x.size
+    assert np.abs(x).max() == pytest.approx(0.5, abs=1e-3)
+
+
+def test_output_is_independent_of_block_boundaries():
+    a, b = DDSSynth(2, FS, block=1000), DDSSynth(2, FS)
+    for s in (a, b):
+        s.set_tone([0, 1], [12.345e6, 3e6])
+        s.config_sweep(1, 3e6, 4e6, 1e13)
+        s.start_sweep(1)
+    x = a.render(25_000)
+    y = np.concatenate([b.render(n) for n in (1, 7_000, 17_999)], axis=1)
+    assert np.array_equal(x, y)
+
+
+def test_sweep_reaches_stop_and_holds():
+    s = DDSSynth(1, FS)
+    s.config_sweep(0, 2e6, 1e6, 1e12)   # 1 MHz down in 1 us = 500 samples
+    s.start_sweep(0)
+    s.render(400)
+    assert 1e6 < s.frequency(0) < 2e6
+    s.render(400)
+    assert s.frequency(0) == pytest.approx(ftw_to_hz(ftw(1e6, FS), FS))
+    with pytest.raises(ValueError):
+        s.config_sweep(0, 1e6, FS, 1e12)
+
+
+def test_amplitude_profile_then_hold():
+    s, ref = DDSSynth(1, FS), DDSSynth(1, FS)
+    for d in (s, ref):
+        d.set_tone(0, 1e6)
+    s.set_amplitude_profile(0, [0.0, 2e-6], [0.0, 1.0])  # 0 -> 1 over 1000 samples
+    x, r = s.render(3000)[0], ref.render(3000)[0]
+    k = np.flatnonzero(np.abs(r[:1000]) > 0.5)
+    assert np.allclose(x[k] / r[k], k / 1000, atol=1e-3)
+    assert np.array_equal(x[1000:], r[1000:])
+
+
+def test_ring_buffer_order_and_overrun():
+    ring = RingBuffer(1, 1000)
+    s = DDSSynth(1, FS)
+    s.set_tone(0, 1e6)
+    ref = DDSSynth(1, FS)
+    ref.set_tone(0, 1e6)
+    full = ref.render(1500)[0]
+    s.stream_into(ring, 1500, block=400)
+    assert ring.overruns == 500 and len(ring) == 1000
+    assert np.array_equal(ring.read(600)[0], full[500:1100])
+    assert np.array_equal(ring.read(10_000)[0], full[1100:])
+
+
+def test_simdds_arm_trigger_starts_sweeps_together():
+    d = SimDDS(n_ch=2, seed=0)
+    d.set_many([0, 1], f_hz=[1e6, 1e6], amp=1.0)
+    d.apply_update()
+    d.config_freq_sweep(0, 1e6, 5e6, 1e13)
+    d.config_freq_sweep(1, 1e6, 5e6, 1e13)
+    d.start_sweep(0)
+    d.render(100)
+    d.arm()
+    d.trigger()
+    d.render(1000)
+    s = d.synth()
+    assert s.frequency(0) == s.frequency(1) > 1e6  # ch0 restarted by the trigger too
+    d.stop_sweep(1)
+    assert d.read_state()["ch"][1]["f_Hz"] == s.frequency(1)
+    assert len(d.triggers) == 1
+
+
+def test_simdds_update_keeps_running_sweeps_and_skips_unchanged_channels():
+    d, ref = SimDDS(n_ch=2, seed=0), SimDDS(n_ch=2, seed=0)
+    for x in (d, ref):
+        x.set_many([0, 1], f_hz=[1e6, 2e6], amp=1.0)
+        x.apply_update()
+        x.config_freq_sweep(0, 1e6, 5e6, 1e12)  # 4 us: still running below
+        x.start_sweep(0)
+        x.render(500)
+    d.set_phase_deg(1, 0.0)                              # unchanged register
+    d.apply_update()
+    assert np.array_equal(d.render(500), ref.render(500))
+    d.set_amplitude(1, 0.5)
+    d.set_freq(0, 3e6)                                   # ch0 is sweeping: frequency held by the sweep
+    d.apply_update()
+    out, want = d.render(500), ref.render(500)
+    assert np.array_equal(out[0], want[0])
+    assert np.allclose(out[1], 0.5 * want[1], atol=1e-6)
+
+
+def test_simdds_synth_rate_is_checked_at_creation():
+    d = SimDDS(n_ch=2, seed=0)
+    d.set_many([0, 1], f_hz=[10e6, 1e6])
+    d.apply_update()
+    with pytest.raises(ValueError, match="twice"):
+        d.synth(fs_hz=15e6)
+    d.set_freq(1, 2e6)
+    d.apply_update()                                     # no broken synth left behind
+    assert d.synth(fs_hz=50e6).fs == 50e6
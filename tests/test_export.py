@@ -0,0 +1,51 @@
+import numpy as np
+from PIL import Image, ImageSequence
+
+from amo.ui.export import _changed_box, export_gif
+
+
+def _frame(i, h=60, w=80):
+    rgb = np.full((h, w, 3), 255, dtype=np.uint8)
+    x = (3 * i) % (w - 6)
+    rgb[20:30, x:x + 6] = (200, 30, 30)
+    rgb[45:50, x:x + 4] = (20, 20, 180)
+    return rgb
+
+
+def test_changed_box():
+    a = _frame(0)
+    assert _changed_box(None, a) == (0, 0, 60, 80)
+    assert _changed_box(a, a.copy()) is None
+    b = a.copy()
+    b[5:7, 10:13] = 0
+    assert _changed_box(a, b) == (5, 10, 7, 13)
+
+
+def test_export_gif_roundtrip(tmp_path):
+    n = 25
+    stats = export_gif(tmp_path / "a.gif", _frame, n, fps=10, colors=16, workers=2)
+    assert stats.written == n and stats.stride == 1
+    with Image.open(tmp_path / "a.gif") as im:
+        assert im.n_frames == n
+        assert im.info["duration"] == 100
+        for i, fr in enumerate(ImageSequence.Iterator(im)):
+            got = np.asarray(fr.convert("RGB"))
+            assert np.abs(got.astype(int) - _frame(i)).max() <= 8
+
+
+def test_export_gif_size_budget(tmp_path):
+    n = 200
+    full = export_gif(tmp_path / "full.gif", _frame, n, fps=20, colors=16)
+    advanced = []
+    stats = export_gif(tmp_path / "small.gif", _frame, n, fps=20, colors=16,
+                       max_bytes=full.bytes // 3, advance=advanced.append)
+    assert stats.stride >= 3
+    assert stats.bytes <= full.bytes // 3
+    assert abs(stats.bytes - stats.est_bytes) < 0.2 * stats.bytes
+    assert stats.written == len(range(0, n, stats.stride))
+    assert len(advanced) == n - stats.written - sum(1 for i in range(8) if i % stats.stride)
+    with Image.open(tmp_path / "small.gif") as im:
+        assert im.info["duration"] == 50 * stats.stride
+        im.seek(im.n_frames - 1)
+        last = (im.n_frames - 1) * stats.stride
+        assert np.abs(np.asarray(im.convert("RGB")).astype(int) - _frame(last)).max() <= 8
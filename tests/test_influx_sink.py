@@ -0,0 +1,46 @@
+import numpy as np
+
+from amo.io.sinks.influx import InfluxSink, encode_columns
+
+
+def test_encode_columns_escapes_and_skips_nan():
+    data = encode_columns(
+        "rga", {"amu_2": [1.5, float("nan")], "p tot": [2.0, float("nan")]}, [10, 20],
+        tags={"station": "bake room", "device": "rga_01"},
+    )
+    assert data == b"rga,device=rga_01,station=bake\\ room amu_2=1.5,p\\ tot=2.0 10\n"
+
+
+def test_encode_columns_skips_inf_and_empty_tags():
+    data = encode_columns(
+        "rga", {"a": [float("inf"), 1.0, float("-inf")], "b": [2.0, float("-inf"), float("inf")]},
+        [1, 2, 3], tags={"station": "", "file": None, "device": "rga_01"},
+    )
+    assert data == b"rga,device=rga_01 b=2.0 1\nrga,device=rga_01 a=1.0 2\n"
+
+
+def test_background_flusher_batches_writes(influx_server):
+    with InfluxSink(influx_server.url, "tok", "org", "bucket", background=True) as sink:
+        for k in range(20):
+            ts = np.arange(100, dtype=np.int64) + 1000 * k
+            sink.write_columns("rga", {"amu_2": np.full(100, float(k))}, ts, {"device": "rga_01"})
+        sink.write("rga", {"amu_4": 3.0}, timestamp_ns=5)
+        assert sink.flush(timeout=10)
+        s = sink.stats()
+    assert s["lines_sent"] == s["lines_enqueued"] == 2001
+    assert s["batches_sent"] < 21
+    assert len(influx_server.lines) == 2001
+    assert influx_server.lines[-1] == "rga amu_4=3.0 5"
+
+
+def test_drop_oldest_bounds_queue(influx_server):
+    influx_server.available.clear()  # every send fails, queue backs up
+    with InfluxSink(influx_server.url, "tok", "org", "bucket", background=True,
+                    queue_max=2, overflow="drop_oldest") as sink:
+        for k in range(50):
+            sink.write_columns("m", {"x": [1.0]}, [k])
+        sink.flush(timeout=10)
+        s = sink.stats()
+    assert s["queue_depth_max"] <= 2
+    assert s["lines_sent"] == 0 and s["lines_dropped"] > 0
+    assert s["lines_dropped"] + s["lines_failed"] == s["lines_enqueued"] == 50
@@ -0,0 +1,129 @@
+import time
+
+import numpy as np
+
+from amo.control import interlocks
+from amo.control.interlocks import InterlockEngine
+from amo.run.runner import execute_recipe, preflight
+
+RULES = {
+    "ranges": {"laser.power": [0, 0.8]},
+    "rates": {"laser.detune_mhz": 5.0},
+    "conditions": [{"key": "laser.power", "when_above": 0.5, "requires": "shutter.open", "range": [1, 1]}],
+}
+
+
+def _cmd(target, value):
+    dev, param = target.split(".")
+    return {"device": dev, "action": "set", "param": param, "value": value}
+
+
+def test_module_check_is_generic_and_stateless():
+    interlocks.LIMITS["mot.current_a"] = (0.0, 5.0)
+    try:
+        assert interlocks.check(_cmd("mot.current_a", 3.0))[0]
+        assert not interlocks.check(_cmd("mot.current_a", 6.0))[0]
+        assert not interlocks.check(_cmd("mot.current_a", "x"))[0]
+        assert interlocks.check(_cmd("laser.power", 9.0))[0]
+    finally:
+        del interlocks.LIMITS["mot.current_a"]
+
+
+def test_engine_runtime_rules():
+    eng = InterlockEngine.from_dict(RULES)
+    assert not eng(_cmd("laser.power", 0.9))[0]
+    assert not eng(_cmd("laser.power", 0.6))[0]  # shutter never opened
+    assert eng(_cmd("shutter.open", 1))[0]
+    assert eng(_cmd("laser.power", 0.6))[0]
+    assert eng(_cmd("laser.detune_mhz", 0.0))[0]
+    ok, why = eng(_cmd("laser.detune_mhz", 10.0))
+    assert not ok and "exceeds" in why
+    assert eng(_cmd("camera.exposure_ms", 1e9))[0]
+
+
+def test_check_ops_matches_runtime_on_accepted_sequence():
+    eng = InterlockEngine.from_dict(RULES)
+    keys = ["laser.power", "shutter.open", "laser.power", "laser.detune_mhz", "laser.detune_mhz", "laser.power"]
+    vals = [0.6, 1, 0.7, 0.0, 9.0, "bad"]
+    issues = eng.check_ops(keys, vals)
+    assert [i for i, _ in issues] == [0, 4, 5]
+    runtime = [i for i, (k, v) in enumerate(zip(keys, vals)) if not eng(_cmd(k, v))[0]]
+    assert runtime == [0, 4, 5]
+
+
+def test_preflight_100k_steps_vectorized():
+    eng = InterlockEngine.from_dict(RULES)
+    rng = np.random.default_rng(0)
+    steps = [
+        {"at_ms": i, "set": {"shutter.open": 1, "laser.power": float(p), "laser.detune_mhz": float(i % 5)}}
+        for i, p in enumerate(rng.uniform(0.0, 0.79, 100_000))
+    ]
+    steps[500]["set"]["laser.power"] = 0.95
+    t0 = time.perf_counter()
+    ok, issues = preflight(steps, {"laser": object(), "shutter": object()}, eng)
+    assert time.perf_counter() - t0 < 1.0
+    assert not ok and len(issues) == 1 and "0.95" in issues[0]
+
+
+def test_check_ops_compares_rates_against_accepted_values_only():
+    eng = InterlockEngine.from_dict(RULES)
+    keys = ["laser.detune_mhz"] * 3
+    issues = eng.check_ops(keys, [0.0, 9.0, 10.0])
+    assert [i for i, _ in issues] == [1, 2]  # 10 is 10 away from the accepted 0
+    runtime = [i for i, v in enumerate([0.0, 9.0, 10.0]) if not eng(_cmd(keys[i], v))[0]]
+    assert runtime == [1, 2]
+
+
+def test_preflight_checks_in_timeline_order():
+    eng = InterlockEngine.from_dict(RULES)
+    devs = {"laser": object(), "shutter": object()}
+    steps = [{"at_ms": 10, "set": {"laser.power": 0.6}}, {"at_ms": 0, "set": {"shutter.open": 1}}]
+    assert preflight(steps, devs, eng) == (True, [])
+    # fine in recipe order, but the shutter closes at 10 ms, before the power step at 20 ms
+    steps = [{"at_ms": 0, "set": {"shutter.open": 1}}, {"at_ms": 20, "set": {"laser.power": 0.6}},
+             {"at_ms": 10, "set": {"shutter.open": 0}}]
+    ok, issues = preflight(steps, devs, eng)
+    assert not ok and "requires shutter.open" in issues[0]
+
+
+def test_runtime_interlock_decisions_follow_timeline_order():
+    class _Dev:
+        def __init__(self):
+            self.calls = []
+
+        def set(self, **kw):
+            self.calls.append(kw)
+
+    eng = InterlockEngine.from_dict(RULES)
+    devs = {"laser": _Dev(), "shutter": _Dev()}
+    # same at_ms, different device threads: the shutter op comes first on the timeline
+    steps = [{"at_ms": 0, "set": {"shutter.open": 1, "laser.power": 0.6}}] * 20
+    report = execute_recipe(steps, devs, eng)
+    assert all(op.ok for op in report.ops)
+    assert devs["laser"].calls == [{"power": 0.6}] * 20
+
+
+def test_check_ops_flags_nan_like_runtime():
+    eng = InterlockEngine.from_dict(RULES)
+    keys = ["laser.power", "laser.detune_mhz", "laser.detune_mhz", "laser.power"]
+    vals = [float("nan"), 0.0, float("nan"), 0.5]
+    issues = eng.check_ops(keys, vals)
+    assert issues[0] == (0, "laser.power must be within 0.0..0.8, got nan")
+    runtime = [i for i, (k, v) in enumerate(zip(keys, vals)) if not eng(_cmd(k, v))[0]]
+    assert [i for i, _ in issues] == runtime == [0]
+
+
+def test_each_run_starts_from_an_empty_interlock_state():
+    class _Dev:
+        def set(self, **kw):
+            pass
+
+    eng = InterlockEngine.from_dict(RULES)
+    devs = {"laser": _Dev(), "shutter": _Dev()}
+    execute_recipe([{"at_ms": 0, "set": {"shutter.open": 1, "laser.detune_mhz": 0.0}}], devs, eng)
+    # preflight assumes no shutter and no previous detuning; the run must agree
+    steps = [{"at_ms": 0, "set": {"laser.detune_mhz": 20.0, "laser.power": 0.6}}]
+    ok, issues = preflight(steps, devs, eng)
+    assert not ok and len(issues) == 1
+    report = execute_recipe(steps, devs, eng)
+    assert [op.ok for op in report.ops] == [True, False]
@@ -0,0 +1,75 @@
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+
+from amo.ui.liveplot import LiveDashboard, Ring, minmax_decimate
+
+
+def test_ring_keeps_newest_values_contiguous():
+    r = Ring(5)
+    r.extend([1, 2, 3])
+    r.append(4)
+    r.extend(range(10, 14))
+    v = r.view()
+    assert v.tolist() == [4, 10, 11, 12, 13] and not v.flags.writeable
+    r.extend(range(100))
+    assert r.view().tolist() == [95, 96, 97, 98, 99] and len(r) == 5
+    p = Ring(3, width=3)
+    p.append((1, 2, 3))
+    assert p.view().shape == (1, 3)
+
+
+def test_minmax_decimation_keeps_extremes_in_order():
+    x = np.arange(100_000, dtype=float)
+    y = np.sin(x / 1000)
+    y[12_345], y[70_001] = 5.0, -7.0
+    xs, ys = minmax_decimate(x, y, 2000)
+    assert len(xs) <= 2002 and np.all(np.diff(xs) > 0)
+    assert ys.max() == 5.0 and ys.min() == -7.0
+    assert len(minmax_decimate(x[:10], y[:10], 2000)[0]) == 10
+
+
+def test_dashboard_blits_until_limits_change():
+    fig, (ax1, ax2) = plt.subplots(1, 2)
+    dash = LiveDashboard(fig)
+    assert dash.blit
+    line = dash.line(ax1, capacity=100_000, window_s=100.0)
+    trail = dash.trail(fig.add_subplot(3, 3, 1, projection="3d"), length=50)
+    t = np.linspace(0, 100, 100_000)
+    line.extend(t, np.sin(t))
+    trail.extend(np.random.default_rng(0).normal(size=(80, 3)))
+    dash.update(100.0)
+    draws = dash.full_draws
+    for k in range(10):
+        line.push(100.0 + k * 0.01, 0.5)
+        dash.update(100.0 + k * 0.01)
+    assert dash.full_draws == draws          # in-range data: background reused
+    assert len(trail.pts) == 50
+    line.push(101.0, 10.0)
+    dash.update(101.0)
+    assert dash.full_draws == draws + 1 and ax1.get_ylim()[1] > 10.0
+    rgb = dash.frame_rgb(101.0)
+    assert rgb.ndim == 3 and rgb.shape[2] == 3
+    plt.close(fig)
+
+
+def test_frame_rgb_blits_and_matches_a_full_draw():
+    frames = {}
+    for blit in (True, False):
+        fig, ax = plt.subplots(figsize=(4, 3), dpi=50)
+        dash = LiveDashboard(fig, blit=blit)
+        line = dash.line(ax, capacity=1000, window_s=10.0, autoscale=False)
+        ax.set_ylim(-1.5, 1.5)
+        t = np.linspace(0, 10, 1000)
+        line.extend(t, np.sin(t))
+        dash.frame_rgb(10.0)
+        draws = dash.full_draws
+        for k in range(5):
+            line.push(10.0 + k * 0.1, 0.0)
+            frames[blit] = dash.frame_rgb(10.0 + k * 0.1)
+        if blit:
+            assert dash.full_draws == draws   # background reused for every frame
+        plt.close(fig)
+    differ = np.abs(frames[True].astype(int) - frames[False].astype(int)).max(axis=2) > 40
+    assert differ.mean() < 0.02              # only where the line crosses grid/spines
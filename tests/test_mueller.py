@@ -0,0 +1,42 @@
+import numpy as np
+from amo_digital_twin import LightState, Pipeline, PolarizationBackend, MuellerBackend
+from amo_digital_twin.blocks import (
+    Laser, HalfWavePlate, QuarterWavePlate, GenericRetarder, Polarizer, Depolarizer, PowerDetector,
+)
+from amo_digital_twin.core.mueller import (
+    stokes_from_jones, mueller_from_jones, degree_of_polarization, incoherent_sum,
+)
+
+def _pipe(*blocks):
+    pipe = Pipeline()
+    for b in blocks:
+        pipe.add(b)
+    return pipe
+
+def test_mueller_matches_jones_for_pure_states():
+    pipe = _pipe(
+        Laser("laser1", power_mw=2.0, pol_angle_deg=10.0),
+        HalfWavePlate("hwp1", angle_deg=17.0),
+        QuarterWavePlate("qwp1", angle_deg=40.0),
+        GenericRetarder("ret1", angle_deg=-5.0, retardance_rad=1.1),
+    )
+    E = pipe.run(LightState(), PolarizationBackend()).E
+    S = pipe.run(LightState(), MuellerBackend()).S
+    assert np.allclose(S, 2.0 * stokes_from_jones(E))
+    J = np.array([[0.3, 0.2j], [-0.1, 0.9 + 0.4j]])
+    E = np.array([0.6, 0.8j])
+    assert np.allclose(mueller_from_jones(J) @ stokes_from_jones(E), stokes_from_jones(J @ E))
+
+def test_batched_partial_polarization():
+    pipe = _pipe(Depolarizer("dep", dop=0.5), Polarizer("pol1", axis_deg=0.0), PowerDetector("pd1"))
+    S_in = np.array([[1.0, 1.0, 0.0, 0.0], [1.0, -1.0, 0.0, 0.0], [1.0, 0.0, 1.0, 0.0]])
+    out = pipe.run(LightState(mode="STOKES", S=S_in), MuellerBackend())
+    assert out.S.shape == (3, 4)
+    assert np.allclose(pipe.by_id("pd1").params["last_reading_mw"], [0.75, 0.25, 0.5])
+
+def test_incoherent_sum_of_orthogonal_beams_is_unpolarized():
+    H = LightState(mode="STOKES", S=np.array([1.0, 1.0, 0.0, 0.0]))
+    V = LightState(mode="STOKES", S=np.array([1.0, -1.0, 0.0, 0.0]))
+    mix = incoherent_sum([H, V])
+    assert np.allclose(mix.S, [2.0, 0.0, 0.0, 0.0])
+    assert degree_of_polarization(mix.S) == 0.0
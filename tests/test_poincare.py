@@ -0,0 +1,52 @@
+import matplotlib
+matplotlib.use("Agg")
+
+import numpy as np
+from PIL import Image
+
+from amo.ui.animate import animate_stokes
+from amo.ui.poincare import decimate_arc, normalize_stokes, plot_stokes_path, sphere_density
+
+
+def _drift(n, seed=0):
+    """Unit Stokes vectors that mostly sit still with a few fast excursions."""
+    rng = np.random.default_rng(seed)
+    ang = np.cumsum(rng.normal(0, 1e-5, n))
+    ang[n // 2:n // 2 + 100] += np.linspace(0, 3, 100)
+    ang[n // 2 + 100:] += 3
+    S = np.stack([np.full(n, 2.0), 2 * np.cos(ang), 2 * np.sin(ang), np.zeros(n)], axis=1)
+    return S
+
+
+def test_normalize_stokes():
+    S = np.array([[2.0, 2.0, 0.0, 0.0], [0.0, 0.5, 0.0, 0.0]])
+    assert np.allclose(normalize_stokes(S), [[1, 0, 0], [0.5, 0, 0]])
+    assert np.allclose(normalize_stokes(list(S)), normalize_stokes(S))
+
+
+def test_decimate_arc_keeps_fast_segments():
+    pts = normalize_stokes(_drift(100_000))
+    keep = decimate_arc(pts, max_points=500)
+    assert keep[0] == 0 and keep[-1] == len(pts) - 1
+    assert len(keep) < 1000
+    fast = np.sum((keep >= 50_000) & (keep < 50_100))
+    assert fast >= 99                      # the 0.1% of samples carrying most of the path length
+    assert np.all(np.diff(keep) > 0)
+
+
+def test_sphere_density_counts_every_point():
+    pts = normalize_stokes(_drift(10_000))
+    counts, lon_e, lat_e = sphere_density(pts, 36, 18)
+    assert counts.shape == (18, 36) and counts.sum() == 10_000
+    assert len(lon_e) == 37 and np.isclose(lat_e[0], -np.pi / 2)
+
+
+def test_headless_renders(tmp_path):
+    S = _drift(300_000)
+    plot_stokes_path(S, save=tmp_path / "density.png")
+    plot_stokes_path(S[:1000], save=tmp_path / "path.png")
+    for name in ("density.png", "path.png"):
+        with Image.open(tmp_path / name) as im:
+            assert im.size[0] > 100
+    stats = animate_stokes(S[::1000], interval_ms=50, max_frames=40, save=tmp_path / "a.gif")
+    assert 2 <= stats.written <= 80
@@ -0,0 +1,65 @@
+from amo.control import interlocks
+from amo.control.interlocks import InterlockEngine
+from amo.run.recipe_cache import prepare_recipe
+from amo.run.runner import load_recipe
+from amo.run.timing import compile_timeline
+
+
+def test_prepare_recipe_round_trips_through_cache(tmp_path):
+    recipe = tmp_path / "r.yaml"
+    recipe.write_text(
+        "- at_ms: 0\n  set: {laser.power: 0.9, laser.detune_mhz: -18, laser.mode: cw}\n  status: [laser]\n"
+        "- set: {laser.power: 0.2}\n"
+        "- at_ms: 12.5\n  status: [laser]\n"
+    )
+    eng = InterlockEngine.from_dict({"ranges": {"laser.power": [0, 0.5]}})
+    cache = tmp_path / "cache"
+    first = prepare_recipe(str(recipe), {"laser": object()}, eng, cache_dir=cache)
+    second = prepare_recipe(str(recipe), {"laser": object()}, eng, cache_dir=cache)
+    assert not first.cached and second.cached
+    assert second.steps == load_recipe(str(recipe))
+    assert type(second.steps[0]["set"]["laser.detune_mhz"]) is int
+    assert not second.ok and second.issues == first.issues
+    assert first.timeline == second.timeline == []  # never compiled past a failed preflight
+
+    loose = InterlockEngine.from_dict({"ranges": {"laser.power": [0, 1]}})
+    third = prepare_recipe(str(recipe), {"laser": object()}, loose, cache_dir=cache)
+    fourth = prepare_recipe(str(recipe), {"laser": object()}, loose, cache_dir=cache)
+    assert third.ok and not third.cached and fourth.cached
+    assert fourth.timeline == third.timeline == compile_timeline(load_recipe(str(recipe)))
+
+
+def test_cache_key_tracks_rules_and_content(tmp_path):
+    recipe = tmp_path / "r.yaml"
+    recipe.write_text("- at_ms: 0\n  set: {laser.power: 0.4}\n")
+    cache = tmp_path / "cache"
+    devs = {"laser": object()}
+    assert prepare_recipe(str(recipe), devs, interlocks.check, cache_dir=cache).ok
+    interlocks.LIMITS["laser.power"] = (0.0, 0.3)
+    try:
+        again = prepare_recipe(str(recipe), devs, interlocks.check, cache_dir=cache)
+        assert not again.cached and not again.ok
+    finally:
+        del interlocks.LIMITS["laser.power"]
+    recipe.write_text("- at_ms: 0\n  set: {laser.power: 0.1}\n")
+    changed = prepare_recipe(str(recipe), devs, interlocks.check, cache_dir=cache)
+    assert not changed.cached and changed.steps[0]["set"]["laser.power"] == 0.1
+
+
+def test_bad_at_ms_is_a_preflight_issue_with_or_without_cache(tmp_path):
+    recipe = tmp_path / "r.yaml"
+    recipe.write_text("- at_ms: soon\n  set: {laser.power: 0.1}\n")
+    for cache in (None, tmp_path / "cache", tmp_path / "cache"):
+        res = prepare_recipe(str(recipe), {"laser": object()}, interlocks.check, cache_dir=cache)
+        assert not res.ok and res.timeline == []
+        assert any("at_ms must be numeric" in i for i in res.issues)
+
+
+def test_cache_keeps_steps_exactly_as_loaded(tmp_path):
+    recipe = tmp_path / "r.yaml"
+    recipe.write_text("- at_ms: 1.0\n  note: warm up\n  set: {laser.power: 0.1}\n")
+    cache = tmp_path / "cache"
+    prepare_recipe(str(recipe), {"laser": object()}, interlocks.check, cache_dir=cache)
+    again = prepare_recipe(str(recipe), {"laser": object()}, interlocks.check, cache_dir=cache)
+    assert again.cached and again.steps == load_recipe(str(recipe))
+    assert type(again.steps[0]["at_ms"]) is float and again.steps[0]["note"] == "warm up"
@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+from amo.control.interlocks import InterlockEngine
+from amo.devices.simulators import SimLaser
+from amo.run.runner import load_recipe
+from amo.run.stream import RecipeError, execute_recipe_stream, iter_recipe
+
+STEPS = [
+    {"at_ms": 0, "set": {"laser.power": 0.1, "laser.detune_mhz": -18.0}, "status": ["laser"]},
+    {"at_ms": 2, "set": {"laser.power": 0.12}},
+    {"status": ["laser"]},
+]
+
+
+def test_iter_recipe_yaml_and_jsonl_match_load_recipe(tmp_path):
+    assert list(iter_recipe("recipes/demo_mot.yaml")) == load_recipe("recipes/demo_mot.yaml")
+    assert list(iter_recipe("recipes/empty.yaml")) == []
+    p = tmp_path / "r.jsonl"
+    p.write_text("\n".join(json.dumps(s) for s in STEPS) + "\n")
+    assert list(iter_recipe(str(p))) == STEPS
+
+
+def test_stream_executes_and_reports(tmp_path):
+    p = tmp_path / "r.jsonl"
+    p.write_text("\n".join(json.dumps(s) for s in STEPS))
+    laser = SimLaser()
+    eng = InterlockEngine.from_dict({"ranges": {"laser.power": [0, 0.5]}})
+    report = execute_recipe_stream(str(p), {"laser": laser}, eng, lookahead=2, run_dir=tmp_path)
+    assert laser.power == 0.12
+    assert [op.kind for op in report.ops] == ["set", "set", "status", "set", "status"]
+    assert (tmp_path / "timing.json").exists()
+
+
+def test_stream_stops_before_failing_step(tmp_path):
+    steps = [{"at_ms": i, "set": {"laser.power": 0.1 * i}} for i in range(4)]
+    steps[3]["set"]["laser.power"] = 0.9
+    p = tmp_path / "r.jsonl"
+    p.write_text("\n".join(json.dumps(s) for s in steps))
+    laser = SimLaser()
+    eng = InterlockEngine.from_dict({"ranges": {"laser.power": [0, 0.5]}})
+    with pytest.raises(RecipeError) as exc:
+        execute_recipe_stream(str(p), {"laser": laser}, eng, lookahead=1)
+    assert "[step 3]" in exc.value.issues[0]
+    assert laser.power < 0.9
+
+
+def test_stream_rejects_steps_that_go_back_in_time(tmp_path):
+    # in recipe order the shutter is open for the power step; on the timeline it is not
+    steps = [{"at_ms": 0, "set": {"shutter.open": 1}}, {"at_ms": 20, "set": {"laser.power": 0.6}},
+             {"at_ms": 10, "set": {"shutter.open": 0}}]
+    p = tmp_path / "r.jsonl"
+    p.write_text("\n".join(json.dumps(s) for s in steps))
+    laser, shutter = SimLaser(), SimLaser()
+    eng = InterlockEngine.from_dict({"conditions": [
+        {"key": "laser.power", "when_above": 0.5, "requires": "shutter.open", "range": [1, 1]}]})
+    with pytest.raises(RecipeError) as exc:
+        execute_recipe_stream(str(p), {"laser": laser, "shutter": shutter}, eng, lookahead=4)
+    assert exc.value.issues == ["[step 2] at_ms must not decrease in a streamed recipe; got 10 after 20"]
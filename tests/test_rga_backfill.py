@@ -0,0 +1,116 @@
+import json
+import os
+from concurrent.futures import Future
+
+import numpy as np
+
+from amo.io.loggers.rga_backfill import _bounded_map, backfill_rga_folder
+
+
+class _Collect:
+    def __init__(self, fail_after=None):
+        self.batches = []
+        self.tags = []
+        self.fail_after = fail_after
+
+    def write_columns(self, measurement, fields, timestamps_ns, tags):
+        if self.fail_after is not None and len(self.batches) >= self.fail_after:
+            raise ConnectionError("endpoint down")
+        self.batches.append((dict(fields), np.asarray(timestamps_ns)))
+        self.tags.append(dict(tags))
+        return len(timestamps_ns)
+
+    @property
+    def ts(self):
+        return np.concatenate([t for _, t in self.batches]) if self.batches else np.array([])
+
+
+def _make_folder(tmp_path, n_files=3, n_rows=400):
+    for k in range(n_files):
+        rows = "".join(f"{i},{k}.{i},1e-9,{20 + k}\n" for i in range(n_rows))
+        (tmp_path / f"bake_{k}.csv").write_text("time,amu_2,pressure_total,temperature\n" + rows)
+
+
+def test_backfill_parallel_batches_all_rows(tmp_path):
+    _make_folder(tmp_path)
+    sink = _Collect()
+    stats = backfill_rga_folder(str(tmp_path), sink, workers=2, chunk_bytes=2048, batch_lines=500)
+    assert stats["lines"] == 1200 and stats["chunks"] > 3
+    assert len(sink.batches) < stats["chunks"]
+    assert len(np.unique(sink.ts)) == 1200
+    temps = np.concatenate([f["temperature"] for f, _ in sink.batches])
+    assert sorted(set(temps.tolist())) == [20.0, 21.0, 22.0]
+    assert stats["files"] == 3
+
+
+def test_backfill_files_with_equal_mtime_stay_distinct(tmp_path):
+    _make_folder(tmp_path, n_rows=100)
+    for p in tmp_path.glob("*.csv"):
+        os.utime(p, ns=(1_700_000_000_000_000_000, 1_700_000_000_000_000_000))
+    sink = _Collect()
+    backfill_rga_folder(str(tmp_path), sink, workers=1)
+    assert len(np.unique(sink.ts)) == 300
+    assert all("file" not in tags for tags in sink.tags)  # same series as live rows
+    # a file added to the group later still gets stamps of its own
+    (tmp_path / "bake_9.csv").write_text((tmp_path / "bake_0.csv").read_text())
+    os.utime(tmp_path / "bake_9.csv", ns=(1_700_000_000_000_000_000, 1_700_000_000_000_000_000))
+    more = _Collect()
+    backfill_rga_folder(str(tmp_path), more, workers=1)
+    assert len(more.ts) == 100 and len(np.unique(np.concatenate([sink.ts, more.ts]))) == 400
+
+
+class _SlowFlush(_Collect):
+    def flush(self, timeout=None):
+        return False  # endpoint down: nothing drains
+
+
+def test_backfill_flush_timeout_does_not_mark_batch(tmp_path):
+    _make_folder(tmp_path, n_files=1, n_rows=50)
+    try:
+        backfill_rga_folder(str(tmp_path), _SlowFlush(), workers=1, flush_timeout=0.01)
+    except TimeoutError:
+        pass
+    else:
+        raise AssertionError("expected TimeoutError")
+    man = tmp_path / ".rga_backfill.json"
+    assert not man.exists() or all(not e["done"] for e in json.loads(man.read_text()).values())
+
+
+def test_backfill_resumes_from_manifest(tmp_path):
+    _make_folder(tmp_path)
+    full = _Collect()
+    backfill_rga_folder(str(tmp_path), full, workers=1, manifest=tmp_path / "full.json",
+                        chunk_bytes=2048, batch_lines=300)
+
+    broken = _Collect(fail_after=2)
+    try:
+        backfill_rga_folder(str(tmp_path), broken, workers=1, chunk_bytes=2048, batch_lines=300)
+    except ConnectionError:
+        pass
+    done = json.loads((tmp_path / ".rga_backfill.json").read_text())
+    assert any(e["done"] for e in done.values())
+
+    rest = _Collect()
+    backfill_rga_folder(str(tmp_path), rest, workers=1, chunk_bytes=2048, batch_lines=300)
+    got = np.concatenate([broken.ts, rest.ts])
+    assert np.array_equal(np.unique(got), np.sort(full.ts))
+    # only the batch that failed part-way is sent again (same tags and stamps: overwritten)
+    assert len(got) - len(full.ts) < 300
+    assert backfill_rga_folder(str(tmp_path), _Collect(), workers=1)["lines"] == 0
+
+
+class _CountingPool:
+    def __init__(self):
+        self.submitted = 0
+
+    def submit(self, fn, chunk):
+        self.submitted += 1
+        f = Future()
+        f.set_result(chunk)
+        return f
+
+
+def test_parsed_chunks_in_flight_are_bounded():
+    pool = _CountingPool()
+    ahead = [pool.submitted - i for i, _ in enumerate(_bounded_map(pool, list(range(50)), window=4))]
+    assert max(ahead) <= 4 and pool.submitted == 50
@@ -0,0 +1,85 @@
+import os
+import threading
+import time
+
+import numpy as np
+
+from amo.io.loggers.rga import parse_rga_csv_text, stream_rga_csv_to_influx
+
+
+class _Collect:
+    def __init__(self):
+        self.rows = []
+        self.calls = 0
+
+    def write_columns(self, measurement, fields, timestamps_ns, tags):
+        self.calls += 1
+        n = len(timestamps_ns)
+        self.rows += [{k: float(v[i]) for k, v in fields.items() if not np.isnan(v[i])} for i in range(n)]
+        return n
+
+
+HEADER = "time,amu_2,amu_28,pressure_total,note\n"
+
+
+def test_bulk_parse_handles_quotes_and_blanks():
+    cols = parse_rga_csv_text('1,2.5,,1e-9,"a, quoted"\n2,x,3,2e-9,b\n', HEADER.strip().split(","))
+    assert set(cols) == {"amu_2", "amu_28", "pressure_total"}
+    assert cols["amu_2"][0] == 2.5 and np.isnan(cols["amu_2"][1])
+    assert np.isnan(cols["amu_28"][0]) and cols["amu_28"][1] == 3.0
+
+
+def test_stream_existing_rows_in_one_batch(tmp_path):
+    p = tmp_path / "rga.csv"
+    p.write_text(HEADER + "".join(f"{i},{i}.0,1.0,1e-9,x\n" for i in range(500)))
+    sink = _Collect()
+    stream_rga_csv_to_influx(str(p), sink, follow=False)
+    assert sink.calls == 1 and len(sink.rows) == 500
+
+
+def test_stream_without_follow_parses_unterminated_last_line(tmp_path):
+    p = tmp_path / "rga.csv"
+    p.write_text("time,amu_2,amu_4\n1,1.0,2.0\n2,3.0,4.0")
+    sink = _Collect()
+    stream_rga_csv_to_influx(str(p), sink, follow=False)
+    assert len(sink.rows) == 2
+
+
+def _wait_for(cond, timeout=5.0):
+    t0 = time.monotonic()
+    while not cond() and time.monotonic() - t0 < timeout:
+        time.sleep(0.01)
+    return cond()
+
+
+def test_follow_appends_rotation_and_truncation(tmp_path):
+    p = tmp_path / "rga.csv"
+    p.write_text(HEADER + "0,0.0,1,1e-9,x\n")
+    sink, stop = _Collect(), threading.Event()
+    t = threading.Thread(target=stream_rga_csv_to_influx, args=(str(p), sink),
+                         kwargs={"stop": stop, "sleep_s": 0.05}, daemon=True)
+    t.start()
+    assert _wait_for(lambda: len(sink.rows) == 1)
+
+    with open(p, "a") as f:
+        f.write("1,1.0,1,1e-9,x\n2,2.0,")
+    assert _wait_for(lambda: len(sink.rows) == 2)
+    with open(p, "a") as f:
+        f.write("1,1e-9,x\n")
+    assert _wait_for(lambda: len(sink.rows) == 3)
+
+    rotated = tmp_path / "rga.csv.1"
+    os.rename(p, rotated)
+    p.write_text(HEADER + "3,3.0,1,1e-9,x\n")
+    assert _wait_for(lambda: len(sink.rows) == 4)
+
+    p.write_text(HEADER)  # truncate in place
+    time.sleep(0.3)  # a same-size rewrite between reads is indistinguishable from no change
+    with open(p, "a") as f:
+        f.write("4,4.0,1,1e-9,x\n")
+    assert _wait_for(lambda: len(sink.rows) == 5)
+
+    stop.set()
+    t.join(timeout=5)
+    assert not t.is_alive()
+    assert [r["amu_2"] for r in sink.rows] == [0.0, 1.0, 2.0, 3.0, 4.0]
@@ -0,0 +1,61 @@
+import json
+import time
+
+from amo.control import interlocks
+from amo.devices.simulators import SimLaser
+from amo.run.runner import execute_recipe
+from amo.run.timing import compile_timeline
+
+
+def test_compile_timeline_sorts_and_inherits_time():
+    steps = [
+        {"at_ms": 20, "set": {"laser.power": 0.2}},
+        {"status": ["laser"]},
+        {"at_ms": 5, "set": {"laser.detune_mhz": -10.0}},
+    ]
+    ops = compile_timeline(steps)
+    assert [(op.at_ns, op.kind, op.step) for op in ops] == [
+        (5_000_000, "set", 2),
+        (20_000_000, "set", 0),
+        (20_000_000, "status", 1),
+    ]
+
+
+def test_execute_recipe_writes_timing_report(tmp_path):
+    laser = SimLaser()
+    steps = [
+        {"at_ms": 0, "set": {"laser.power": 0.1}},
+        {"at_ms": 10, "set": {"laser.power": 0.2}, "status": ["laser"]},
+    ]
+    report = execute_recipe(steps, {"laser": laser}, interlocks.check, run_dir=tmp_path)
+    assert laser.power == 0.2
+    assert all(op.start_ns >= op.planned_ns for op in report.ops)
+    assert report.ops[1].start_ns >= 10_000_000
+    data = json.loads((tmp_path / "timing.json").read_text())
+    assert data["summary"]["n_ops"] == 3
+    assert len(data["ops"]) == 3
+
+
+class _SlowDevice:
+    def __init__(self, delay_s):
+        self.delay_s = delay_s
+        self.calls = []
+
+    def set(self, **kw):
+        time.sleep(self.delay_s)
+        self.calls.append(kw)
+
+    def status(self):
+        return {"ok": True}
+
+
+def test_devices_in_one_step_are_dispatched_concurrently():
+    devs = {name: _SlowDevice(0.1) for name in ("a", "b", "c")}
+    steps = [{"at_ms": 0, "set": {"a.x": 1, "b.x": 1, "c.x": 1, "a.y": 2}}]
+    report = execute_recipe(steps, devs, lambda cmd: (True, "ok"))
+    a_x, b_x, c_x, a_y = report.ops
+    # b and c start while a's first op is still running (serially they would wait for it);
+    # ordering rather than wall time, so a loaded machine cannot make this flaky
+    assert b_x.start_ns < a_x.end_ns and c_x.start_ns < a_x.end_ns
+    assert a_y.start_ns >= a_x.end_ns
+    assert devs["a"].calls == [{"x": 1}, {"y": 2}]
@@ -0,0 +1,110 @@
+import time
+
+from amo.io.sinks.influx import InfluxSink
+from amo.io.sinks.spool import Spool, SpooledSink
+
+
+def test_spool_survives_torn_tail_and_resumes_from_offset(tmp_path):
+    sp = Spool(tmp_path, segment_bytes=64)
+    for k in range(10):
+        sp.append(f"m x={k}.0 {k}\n".encode())
+    data, off = sp.read_batch(max_bytes=40)
+    assert data.startswith(b"m x=0.0 0\n") and data.count(b"\n") < 10
+    sp.commit(off)
+    sp.close()
+    segs = sorted(tmp_path.glob("seg-*.lp"))
+    with open(segs[-1], "ab") as f:
+        f.write(b"\x40\x00\x00\x00garbage")  # crash mid-append
+
+    sp = Spool(tmp_path, segment_bytes=64)
+    rest, off = sp.read_batch()
+    assert (data + rest).decode().splitlines() == [f"m x={k}.0 {k}" for k in range(10)]
+    sp.commit(off)
+    assert sp.pending_bytes() == 0
+    assert len(list(tmp_path.glob("seg-*.lp"))) == 1
+    sp.close()
+
+
+def test_spool_size_cap_drops_oldest(tmp_path):
+    sp = Spool(tmp_path, segment_bytes=100, max_bytes=300)
+    for k in range(100):
+        sp.append(b"m x=1.0 %d\n" % k)
+    assert sp.dropped_bytes > 0
+    assert sum(p.stat().st_size for p in tmp_path.glob("seg-*.lp")) <= 300 + 100
+    data, _ = sp.read_batch()
+    assert data.endswith(b"m x=1.0 99\n")
+    sp.close()
+
+
+def test_spooled_sink_rides_out_outage(influx_server, tmp_path):
+    influx_server.available.clear()
+    sink = SpooledSink(InfluxSink(influx_server.url, "tok", "org", "bucket"), tmp_path, max_backoff_s=0.1)
+    t0 = time.monotonic()
+    for k in range(200):
+        sink.write_columns("rga", {"amu_2": [float(k)]}, [k])
+    assert time.monotonic() - t0 < 1.0  # never waits on the endpoint
+    time.sleep(0.2)
+    assert sink.stats()["send_errors"] > 0 and influx_server.lines == []
+
+    influx_server.available.set()
+    assert sink.flush(timeout=10)
+    sink.close()
+    assert influx_server.lines == [f"rga amu_2={float(k)} {k}" for k in range(200)]
+
+
+def test_rejected_batch_is_quarantined_not_retried(influx_server, tmp_path):
+    influx_server.reject = lambda body: b"amu_3" in body
+    sink = SpooledSink(InfluxSink(influx_server.url, "tok", "org", "bucket"), tmp_path,
+                       max_batch_bytes=1, max_backoff_s=0.1)
+    sink.write_columns("rga", {"amu_2": [1.0]}, [1])
+    sink.write_columns("rga", {"amu_3": [2.0]}, [2])
+    sink.write_columns("rga", {"amu_2": [3.0]}, [3])
+    assert sink.flush(timeout=10)
+    stats = sink.stats()
+    sink.close()
+    assert influx_server.lines == ["rga amu_2=1.0 1", "rga amu_2=3.0 3"]
+    assert stats["batches_rejected"] == 1 and stats["send_errors"] == 0
+    note, line = (tmp_path / "rejected.lp").read_text().splitlines()
+    assert note.startswith("# ") and "400" in note and line == "rga amu_3=2.0 2"
+
+
+def test_read_batch_skips_segment_deleted_under_it(tmp_path):
+    sp = Spool(tmp_path, segment_bytes=40)
+    for k in range(6):
+        sp.append(b"m x=1.0 %d\n" % k)
+    oldest = sorted(tmp_path.glob("seg-*.lp"))[0]
+    oldest.unlink()  # as _enforce_cap does between the offset snapshot and the read
+    data, off = sp.read_batch()
+    assert data.endswith(b"m x=1.0 5\n") and b"m x=1.0 0\n" not in data
+    sp.commit(off)
+    assert sp.pending_bytes() == 0
+    sp.close()
+
+
+class _Lines:
+    def __init__(self):
+        self.lines = []
+
+    def send_lines(self, data):
+        self.lines.extend(data.decode().splitlines())
+
+    def close(self):
+        pass
+
+
+def test_replayer_survives_spool_errors(tmp_path):
+    sink = SpooledSink(_Lines(), tmp_path, max_backoff_s=0.05)
+    real, calls = sink.spool.read_batch, []
+
+    def flaky(max_bytes):
+        calls.append(max_bytes)
+        if len(calls) == 1:
+            raise OSError("disk hiccup")
+        return real(max_bytes)
+
+    sink.spool.read_batch = flaky
+    sink.write_columns("rga", {"amu_2": [1.0]}, [1])
+    assert sink.flush(timeout=5)
+    assert sink.stats()["spool_errors"] >= 1
+    sink.close()
+    assert sink.sink.lines == ["rga amu_2=1.0 1"]
@@ -0,0 +1,32 @@
+from pathlib import Path
+import numpy as np
+from amo_digital_twin.core.circuit_config import load_circuit_config
+from amo_digital_twin.experiments.tolerance import ParamTolerance, run_tolerance_analysis
+
+CONFIG = Path(__file__).resolve().parents[1] / "configs" / "circuit_demo_hwp_pol.json"
+
+def test_tolerance_streaming_stats_match_direct_samples():
+    cfg = load_circuit_config(CONFIG)
+    tols = [ParamTolerance("hwp1.angle_deg", "uniform", 0.5), ParamTolerance("m1.reflectivity", "normal", 0.002)]
+    res = run_tolerance_analysis(cfg, tols, n_samples=50_000, chunk_size=7_000, seed=3,
+                                 specs={"pd1": (4.9, 5.0)}, bins=400)
+    st = res.detectors["pd1"]
+
+    rng = np.random.default_rng(3)
+    angles, refl = [], []
+    for n in [7_000] * 7 + [1_000]:
+        angles.append(rng.uniform(22.0, 23.0, n))
+        refl.append(rng.normal(0.99, 0.002, n))
+    theta = np.deg2rad(np.concatenate(angles))
+    power = 10.0 * np.cos(2 * theta) ** 2 * np.concatenate(refl)
+
+    assert st.n == 50_000
+    assert np.isclose(st.mean, power.mean()) and np.isclose(st.std, power.std(ddof=1))
+    assert st.in_spec == np.count_nonzero((power >= 4.9) & (power <= 5.0))
+    for q in (0.05, 0.5, 0.95):
+        assert abs(st.quantile(q) - np.quantile(power, q)) < 2 * (st.edges[1] - st.edges[0])
+    # same seed, same result
+    again = run_tolerance_analysis(cfg, tols, n_samples=50_000, chunk_size=7_000, seed=3,
+                                   specs={"pd1": (4.9, 5.0)}, bins=400).detectors["pd1"]
+    assert (again.n, again.mean, again.std, again.in_spec) == (st.n, st.mean, st.std, st.in_spec)
+    assert np.array_equal(again.counts, st.counts)
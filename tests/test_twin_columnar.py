@@ -0,0 +1,71 @@
+import json
+
+import numpy as np
+
+from amo.twin import ColumnarTwinLogger, TwinLogger
+from amo.twin.columnar import export_jsonl, iter_chunks, read_events
+
+
+def test_record_round_trip_keeps_order_and_types(tmp_path):
+    with ColumnarTwinLogger(tmp_path, chunk_rows=4, name="t.amotwin") as log:
+        for i in range(5):
+            log.record({"evt": "update", "ch": i % 2, "freq_hz": 1e6 + i, "on": True})
+        log.record({"evt": "pol_summary", "S": [1.0, 0.1, 0.2, 0.3], "meta": {"theta": 1.5, "tag": "a"}})
+        log.record({"evt": "note", "x": None, "ragged": [1, [2, 3]]})
+    ev = list(read_events(log.path))
+    assert [e["evt"] for e in ev] == ["update"] * 5 + ["pol_summary", "note"]
+    assert ev[3]["ch"] == 1 and ev[3]["freq_hz"] == 1e6 + 3 and ev[3]["on"] is True
+    assert ev[5]["S"] == [1.0, 0.1, 0.2, 0.3]
+    assert ev[5]["meta"] == {"theta": 1.5, "tag": "a"}
+    assert ev[6]["x"] is None and ev[6]["ragged"] == [1, [2, 3]]
+    assert all("t_wall" in e for e in ev)
+
+
+def test_record_many_reads_back_as_views(tmp_path):
+    n = 100_000
+    with ColumnarTwinLogger(tmp_path, name="m.amotwin") as log:
+        log.record_many({"ch": np.arange(n) % 4, "freq_hz": np.linspace(1e6, 2e6, n),
+                         "S": np.ones((n, 4))})
+    (chunk,) = list(iter_chunks(log.path))
+    assert chunk["freq_hz"].base is not None and not chunk["freq_hz"].flags.owndata
+    assert chunk["S"].shape == (n, 4)
+    assert np.array_equal(chunk["ch"], np.arange(n) % 4)
+    assert np.array_equal(chunk["seq"], np.arange(n))
+
+
+def test_export_jsonl_matches_twin_logger_format(tmp_path):
+    with ColumnarTwinLogger(tmp_path, name="e.amotwin") as log:
+        for i in range(10):
+            log.record({"evt": "update", "ch": i})
+    out = tmp_path / "e.jsonl"
+    assert export_jsonl(log.path, out) == 10
+    rows = [json.loads(ln) for ln in out.read_text().splitlines()]
+    assert [r["ch"] for r in rows] == list(range(10))
+
+
+def test_twin_logger_context_manager_flushes(tmp_path):
+    with TwinLogger(tmp_path) as log:
+        log.record({"evt": "x", "v": 1})
+    assert log._fp.closed
+    (line,) = log.path.read_text().splitlines()
+    assert json.loads(line)["v"] == 1
+
+
+def test_round_trip_fidelity_of_keys_numbers_and_buffered_events(tmp_path):
+    ev = {"evt": "set", "laser.power": 0.5, "meta": {"a.b": 1, "c": {"d": 2}}, "back\\slash": 3}
+    mixed = [1, 2.5, True, 7]
+    with ColumnarTwinLogger(tmp_path, name="f.amotwin") as log:
+        log.record(ev)
+        for v in mixed:
+            log.record({"evt": "num", "v": v, "vs": [v, 1.5]})
+        ev["meta"]["c"]["d"] = 99                       # after record(): must not be logged
+        log.record({"evt": "flags", "v": True})
+        log.record({"evt": "flags", "v": 2})
+    got = list(read_events(log.path))
+    for e in got:
+        del e["t_wall"]
+    assert got[0] == {"evt": "set", "laser.power": 0.5, "meta": {"a.b": 1, "c": {"d": 2}}, "back\\slash": 3}
+    assert [e["v"] for e in got[1:5]] == mixed
+    assert [type(e["v"]) for e in got[1:5]] == [int, float, bool, int]
+    assert [type(e["vs"][0]) for e in got[1:5]] == [int, float, bool, int]
+    assert [e["v"] for e in got[5:]] == [True, 2] and got[5]["v"] is True
@@ -0,0 +1,41 @@
+import json
+
+from amo.twin import TwinLogger, TwinLogReader, query_events
+
+
+def _write(root, n=3000, **kw):
+    with TwinLogger(root, rotate_bytes=20_000, index_every=100, **kw) as log:
+        for i in range(n):
+            log.record({"evt": "fault" if i % 500 == 0 else "update", "i": i})
+
+
+def test_rotation_compresses_closed_segments(tmp_path):
+    _write(tmp_path)
+    names = sorted(p.name for p in tmp_path.iterdir())
+    assert len([n for n in names if n.endswith(".jsonl.gz")]) > 3
+    assert not [n for n in names if n.endswith(".jsonl")]
+    assert all(n + ".idx" in names for n in names if n.endswith(".gz"))
+    ev = list(TwinLogReader(tmp_path).events())
+    assert [e["i"] for e in ev] == list(range(3000))
+
+
+def test_time_window_and_kind_queries(tmp_path):
+    _write(tmp_path)
+    reader = TwinLogReader(tmp_path)
+    assert reader.kinds() == {"fault": 6, "update": 2994}
+    assert [e["i"] for e in reader.events(kind="fault")] == [0, 500, 1000, 1500, 2000, 2500]
+    all_ev = list(reader.events())
+    t0, t1 = all_ev[1200]["t_wall"], all_ev[1300]["t_wall"]
+    window = query_events(tmp_path, t0, t1)
+    assert window == [e for e in all_ev if t0 <= e["t_wall"] <= t1]
+
+
+def test_unindexed_tail_is_scanned(tmp_path):
+    log = TwinLogger(tmp_path, index_every=1000)
+    for i in range(10):
+        log.record({"evt": "update", "i": i})
+    log._fp.flush()  # data on disk, no index line yet (live or crashed logger)
+    assert [e["i"] for e in TwinLogReader(tmp_path).events(kind="update")] == list(range(10))
+    log.close()
+    (idx,) = tmp_path.glob("*.idx")
+    assert json.loads(idx.read_text())["n"] == 10
@@ -0,0 +1,78 @@
+import numpy as np
+
+from amo.run.chain_exec import run_chain
+from amo.run.pol_runner import run_and_log
+from amo.twin import ColumnarTwinLogger
+from amo.twin.replay import ReplayLog, replay_chain
+
+NODES = [
+    {"type": "waveplate", "theta": 22.5, "retard": 180.0},
+    {"type": "pbs", "theta": 45.0, "branch": "T"},
+    {"type": "polarizer", "theta": 0.0},
+]
+E0 = np.array([1.0, 0.0], dtype=complex)
+
+
+def _log_runs(path, thetas, chunk_rows=64):
+    with ColumnarTwinLogger(path.parent, chunk_rows=chunk_rows, name=path.name) as log:
+        for th in thetas:
+            nodes = [dict(n) for n in NODES]
+            nodes[0]["theta"] = th
+            for s in run_chain(nodes, E0):
+                log.record({"evt": "pol_step", **s})
+            log.record({"evt": "pol_summary", "n_steps": len(nodes)})
+
+
+def test_replay_matches_logged_runs_across_chunks(tmp_path):
+    path = tmp_path / "runs.amotwin"
+    _log_runs(path, np.linspace(0, 90, 101))
+    diff = replay_chain(path, NODES, E0)
+    assert diff.ok and diff.runs == 101 and diff.steps == 303
+    assert diff.max_abs_err < 1e-12
+
+
+def test_replay_reports_drift(tmp_path):
+    path = tmp_path / "runs.amotwin"
+    _log_runs(path, [22.5, 22.5])
+    nodes = [dict(n) for n in NODES]
+    nodes[2]["theta"] = 5.0  # the model changed since the log was taken
+    assert replay_chain(path, nodes, E0).ok
+    diff = replay_chain(path, nodes, E0, logged_params=False)
+    assert diff.runs == 2 and diff.n_mismatch == 2
+    assert {m["node"] for m in diff.mismatches} == {2}
+
+
+def test_jsonl_log_is_converted_once_and_mapped(tmp_path):
+    run_and_log(NODES, E0, None, log_root=str(tmp_path))
+    (jsonl,) = tmp_path.glob("dds_*.jsonl")
+    log = ReplayLog(jsonl)
+    assert log.path.suffix == ".amotwin" and ReplayLog(jsonl).path == log.path
+    batches = list(log.batches("pol_step"))
+    assert sum(len(b) for b in batches) == 3
+    assert all(not b.S.flags.owndata for b in batches if "meta.retard" in b.columns)
+    assert replay_chain(log, NODES, E0).runs == 1
+
+
+def test_replay_decodes_mixed_int_float_params(tmp_path):
+    nodes = [
+        {"type": "waveplate", "theta": 0, "retard": 180},
+        {"type": "waveplate", "theta": 22.5, "retard": 90.0},
+        {"type": "polarizer", "theta": 0},
+    ]
+    run_and_log(nodes, E0, None, log_root=str(tmp_path))
+    (jsonl,) = tmp_path.glob("dds_*.jsonl")
+    diff = replay_chain(jsonl, nodes, E0)
+    assert diff.ok and diff.runs == 1 and diff.max_abs_err < 1e-12
+
+
+def test_replay_uses_logged_pbs_branch(tmp_path):
+    nodes = [dict(n) for n in NODES]
+    del nodes[1]["branch"]
+    path = tmp_path / "runs.amotwin"
+    with ColumnarTwinLogger(tmp_path, name=path.name) as log:
+        for port in ("T", "R", "T"):
+            for s in run_chain(nodes, E0, cli_branch=port):
+                log.record({"evt": "pol_step", **s})
+    diff = replay_chain(path, nodes, E0, branch="T")
+    assert diff.ok and diff.runs == 3
+    assert replay_chain(path, nodes, E0, branch="T", logged_params=False).n_mismatch > 0